@@ -0,0 +1,83 @@
+import numpy as np
+
+STATUS_LABELS = np.array(['정상', '주의', '경고'])
+
+def classify_thresholds(values, caution, warning, direction):
+    """센서값을 임계값 기준 수준(0: 정상, 1: 주의, 2: 경고)으로 분류하는 함수 (벡터화)
+
+    direction은 센서별로 값이 클수록 나쁘면 1, 작을수록 나쁘면 -1 이다.
+    values의 마지막 축은 센서 축이다.
+    """
+    signed = np.asarray(values) * direction
+    return ((signed >= np.asarray(caution) * direction).astype(np.int8) +
+            (signed >= np.asarray(warning) * direction).astype(np.int8))
+
+class FleetAnomalyDetector:
+    """전체 설비 × 센서의 이상 상태를 틱마다 한 번의 배열 연산으로 갱신하는 스트리밍 탐지기
+
+    센서마다 EWMA 평균/분산으로 z 점수를 구하고, 나쁜 방향으로의 누적 이탈은 CUSUM으로
+    감시한다. 수준은 임계값 분류와 이상 신호(|z| 초과 또는 CUSUM 경보 시 주의) 중 큰 값이다.
+    """
+
+    def __init__(self, num_assets, caution, warning, direction, alpha=0.001, z_limit=5.0,
+                 cusum_k=1.0, cusum_h=15.0, warmup=300):
+        shape = (num_assets, len(direction))
+        self.caution = np.asarray(caution, dtype=np.float64)
+        self.warning = np.asarray(warning, dtype=np.float64)
+        self.direction = np.asarray(direction, dtype=np.float64)
+        self.alpha = alpha
+        self.z_limit = z_limit
+        self.cusum_k = cusum_k
+        self.cusum_h = cusum_h
+        self.warmup = warmup
+        self.mean = np.zeros(shape)
+        self.var = np.zeros(shape)
+        self.z = np.zeros(shape)
+        self.cusum = np.zeros(shape)
+        self.levels = np.zeros(shape, dtype=np.int8)
+        self.num_updates = 0
+
+    def update(self, values, dt=1.0):
+        """한 틱의 센서값(설비 × 센서)으로 상태를 갱신하고 센서별 수준을 반환
+
+        dt는 이전 틱 이후 경과한 틱 수로, 표본 간격이 성기면 EWMA 가중치를 그만큼 키운다.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        # 갱신 전 평균/분산 기준 z 점수
+        diff = values - self.mean
+        std = np.sqrt(self.var)
+        self.z = np.divide(diff, std, out=np.zeros_like(diff), where=std > 0)
+        # 초기에는 누적 평균과 같도록 가중치를 키워 EWMA의 초기값 편향을 없앤다
+        alpha = max(-np.expm1(dt * np.log1p(-self.alpha)), 1 / (self.num_updates + 1))
+        self.mean += alpha * diff
+        self.var = (1 - alpha) * (self.var + alpha * diff ** 2)
+        self.num_updates += 1
+
+        # 나쁜 방향으로의 이탈만 누적
+        np.maximum(self.cusum + self.direction * self.z - self.cusum_k, 0, out=self.cusum)
+        self.levels = classify_thresholds(values, self.caution, self.warning, self.direction)
+        if self.num_updates > self.warmup:
+            anomalous = (np.abs(self.z) > self.z_limit) | (self.cusum > self.cusum_h)
+            np.maximum(self.levels, anomalous.astype(np.int8), out=self.levels)
+        return self.levels
+
+    def update_many(self, block, dts=None):
+        """여러 틱(시점 × 설비 × 센서)을 순서대로 반영 (dts: 틱별 경과 틱 수)"""
+        dts = np.ones(len(block)) if dts is None else dts
+        for values, dt in zip(block, dts):
+            self.update(values, dt)
+        return self.levels
+
+    def anomalies(self):
+        """센서별 이상 신호 여부 (z 점수 또는 CUSUM 경보)"""
+        if self.num_updates <= self.warmup:
+            return np.zeros(self.levels.shape, dtype=bool)
+        return (np.abs(self.z) > self.z_limit) | (self.cusum > self.cusum_h)
+
+    def status_codes(self):
+        """설비별 상태 코드 (센서 수준의 최댓값)"""
+        return self.levels.max(axis=1)
+
+    def status_labels(self):
+        """설비별 상태 이름 ('정상', '주의', '경고')"""
+        return STATUS_LABELS[self.status_codes()]
@@ -1,6 +1,8 @@
-
 import streamlit as st
 import importlib
+import time
+import pandas as pd
+from data_cache import get_cache
 
 def import_module(module_name):
     try:
@@ -8,52 +10,80 @@ def import_module(module_name):
     except ImportError:
         return None
 
-# 모듈 임포트
-sub01 = import_module('sub01')
-sub02 = import_module('sub02')
-sub03 = import_module('sub03')
-sub04 = import_module('sub04')
-sub05 = import_module('sub05')
-sub06 = import_module('sub06')
-sub07 = import_module('sub07')
-sub08 = import_module('sub08')
-sub09 = import_module('sub09')
-sub10 = import_module('sub10')
+# 페이지 레지스트리: (메뉴 이름, 모듈 이름, 함수 이름)
+# 모듈은 메뉴에서 선택될 때 처음 임포트된다.
+PAGES = [
+    ("실시간 안전 지도", 'sub01', 'show_realtime_safety_map'),
+    ("사고 예측 시뮬레이션", 'sub02', 'show_accident_prediction'),
+    ("안전 성과 대시보드", 'sub03', 'show_safety_performance_dashboard'),
+    ("작업자 동선 분석", 'sub04', 'show_worker_movement_analysis'),
+    ("설비 상태 모니터링", 'sub05', 'show_equipment_status_dashboard'),
+    ("환경 데이터 시각화", 'sub06', 'show_environmental_data_visualization'),
+    ("안전 규정 준수율 대시보드", 'sub07', 'show_safety_compliance_dashboard'),
+    ("비상 대응 시뮬레이터", 'sub08', 'show_emergency_response_simulator'),
+    ("PPE 착용 현황 모니터링", 'sub09', 'show_ppe_monitoring_dashboard'),
+    ("안전 교육 효과성 분석", 'sub10', 'show_safety_training_effectiveness'),
+    ("위험 지역 근접 경보", 'sub11', 'show_proximity_alert_panel')
+]
+
+@st.cache_resource(show_spinner=False)
+def get_page_registry():
+    """프로세스 단위로 유지되는 페이지 모듈 레지스트리"""
+    return {'modules': {}, 'import_times': {}, 'started_at': time.time()}
+
+def load_page_module(module_name):
+    """선택된 페이지의 모듈을 필요할 때만 임포트하고 이후에는 재사용하는 함수"""
+    registry = get_page_registry()
+    if module_name not in registry['modules']:
+        start = time.perf_counter()
+        registry['modules'][module_name] = import_module(module_name)
+        registry['import_times'][module_name] = time.perf_counter() - start
+    return registry['modules'][module_name]
+
+def show_startup_report():
+    """모듈별 임포트 시간 보고서를 표시하는 함수"""
+    registry = get_page_registry()
+    import_times = registry['import_times']
+    with st.sidebar.expander("모듈 로딩 시간"):
+        if not import_times:
+            st.write("아직 로드된 모듈이 없습니다.")
+            return
+        report = pd.DataFrame({
+            '모듈': list(import_times.keys()),
+            '임포트 시간 (ms)': [t * 1000 for t in import_times.values()]
+        })
+        st.dataframe(report, hide_index=True)
+        st.write(f"총 임포트 시간: {sum(import_times.values()) * 1000:.1f} ms")
+        st.write(f"로드된 모듈: {len(import_times)}/{len(PAGES)}")
+
+def show_cache_report():
+    """데이터 캐시 적중률과 메모리 사용량을 표시하는 함수"""
+    stats = get_cache().stats()
+    with st.sidebar.expander("데이터 캐시 현황"):
+        st.write(f"캐시 항목: {stats['entries']}개")
+        st.write(f"메모리 사용량: {stats['total_bytes'] / 1024**2:.1f} / {stats['max_bytes'] / 1024**2:.0f} MB")
+        st.write(f"적중/실패: {stats['hits']} / {stats['misses']} (적중률 {stats['hit_rate'] * 100:.1f}%)")
+        st.write(f"축출된 항목: {stats['evictions']}개")
 
 def main():
     st.set_page_config(page_title="산업단지 안전 빅데이터 플랫폼", page_icon="🏭", layout="wide")
-    
+
     st.title("📋 산업단지 안전 빅데이터 플랫폼 (ISBDP)")
 
-    menu = [
-        "실시간 안전 지도",
-        "사고 예측 시뮬레이션",
-        "안전 성과 대시보드",
-        "작업자 동선 분석",
-        "설비 상태 모니터링",
-        "환경 데이터 시각화",
-        "안전 규정 준수율 대시보드",
-        "비상 대응 시뮬레이터",
-        "PPE 착용 현황 모니터링",
-        "안전 교육 효과성 분석"
-    ]
-    
-    choice = st.sidebar.selectbox("기능 선택", menu)
+    menu = [label for label, _, _ in PAGES]
 
-    modules = [sub01, sub02, sub03, sub04, sub05, sub06, sub07, sub08, sub09, sub10]
-    functions = ['show_realtime_safety_map', 'show_accident_prediction', 'show_safety_performance_dashboard',
-                 'show_worker_movement_analysis', 'show_equipment_status_dashboard', 'show_environmental_data_visualization',
-                 'show_safety_compliance_dashboard', 'show_emergency_response_simulator', 'show_ppe_monitoring_dashboard',
-                 'show_safety_training_effectiveness']
+    choice = st.sidebar.selectbox("기능 선택", menu)
 
-    for i, module in enumerate(modules):
-        if choice == menu[i]:
-            if module is not None and hasattr(module, functions[i]):
-                getattr(module, functions[i])()
-            else:
-                st.warning(f"'{choice}' 기능은 아직 구현되지 않았습니다.")
+    _, module_name, function_name = PAGES[menu.index(choice)]
+    module = load_page_module(module_name)
+    if module is not None and hasattr(module, function_name):
+        getattr(module, function_name)()
+    else:
+        st.warning(f"'{choice}' 기능은 아직 구현되지 않았습니다.")
 
     st.sidebar.markdown("---")
+    show_startup_report()
+    show_cache_report()
     st.sidebar.info("© 2024 산업단지 안전 빅데이터 플랫폼 (ISBDP: Industrial Safety Big Data Platform). All rights reserved.")
 
 if __name__ == "__main__":
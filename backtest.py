@@ -0,0 +1,112 @@
+"""사고 예측 모델 롤링 오리진 백테스트
+
+여러 사업장과 예측 기준일에 대해 sub02 예측 모델을 병렬로 평가한다.
+Streamlit 없이 명령행에서 실행할 수 있다.
+
+    python backtest.py --sites 200 --days 730 --horizon 30 --step 30 --workers 8
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from forecast_models import MODEL_FACTORIES, create_model
+from sub02 import generate_accident_data, simulate_accident_paths, summarize_paths
+
+def poisson_deviance(actual, expected):
+    """포아송 이탈도(관측값별)를 계산하는 함수"""
+    expected = np.maximum(expected, 1e-9)
+    ratio_term = np.where(actual > 0, actual * np.log(np.maximum(actual, 1) / expected), 0.0)
+    return 2 * (ratio_term - (actual - expected))
+
+def backtest_site(site, model_names, days=730, horizon=30, step=30, min_train=90, num_paths=500, seed=0):
+    """한 사업장에 대해 모든 모델의 롤링 오리진 백테스트를 수행하는 함수
+
+    모델은 기준일까지의 관측값을 하루씩 증분 학습하므로, 기준일마다 다시 학습하지 않는다.
+    반환값은 모델별 오차 합계와 예측 건수를 담은 레코드 목록이다.
+    """
+    data = generate_accident_data(days, site).sort_values('date').reset_index(drop=True)
+    dates = data['date'].tolist()
+    counts = data['accidents'].to_numpy()
+    cutoffs = range(min_train, len(data) - horizon + 1, step)
+
+    records = []
+    for model_name in model_names:
+        model = create_model(model_name)
+        rng_seed = seed
+        trained = 0
+        totals = {'abs_error': 0.0, 'deviance': 0.0, 'covered': 0, 'n': 0, 'origins': 0}
+        for cutoff in cutoffs:
+            model.update_many(dates[trained:cutoff], counts[trained:cutoff])
+            trained = cutoff
+
+            future_dates = [dates[cutoff - 1] + timedelta(days=i+1) for i in range(horizon)]
+            actual = counts[cutoff:cutoff + horizon]
+            expected = model.forecast(future_dates)
+            paths = simulate_accident_paths(expected, num_paths, rate_shape=model.rate_shape(), seed=rng_seed)
+            summary = summarize_paths(paths, threshold=0)
+            rng_seed += 1
+
+            totals['abs_error'] += np.abs(actual - expected).sum()
+            totals['deviance'] += poisson_deviance(actual, expected).sum()
+            totals['covered'] += int(((actual >= summary['p10']) & (actual <= summary['p90'])).sum())
+            totals['n'] += len(actual)
+            totals['origins'] += 1
+        records.append({'site': site, 'model': model_name, **totals})
+    return records
+
+def _backtest_site_args(args):
+    return backtest_site(*args)
+
+def run_backtest(num_sites=100, model_names=None, days=730, horizon=30, step=30, min_train=90,
+                 num_paths=500, workers=None):
+    """여러 사업장의 백테스트를 프로세스 풀에서 병렬 실행하는 함수
+
+    반환값은 (모델별 요약, 사업장·모델별 상세) DataFrame 쌍이다.
+    """
+    model_names = list(model_names or MODEL_FACTORIES)
+    sites = [f'사업장 {i+1:04d}' for i in range(num_sites)]
+    tasks = [(site, model_names, days, horizon, step, min_train, num_paths, i) for i, site in enumerate(sites)]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_backtest_site_args, tasks, chunksize=max(1, len(tasks) // 64))
+        detail = pd.DataFrame([record for records in results for record in records])
+
+    summary = detail.groupby('model', sort=False)[['abs_error', 'deviance', 'covered', 'n', 'origins']].sum()
+    summary = pd.DataFrame({
+        'MAE': summary['abs_error'] / summary['n'],
+        'poisson_deviance': summary['deviance'] / summary['n'],
+        'coverage_p10_p90': summary['covered'] / summary['n'],
+        'forecasts': summary['origins'],
+        'days_evaluated': summary['n']
+    })
+    return summary.sort_values('MAE'), detail
+
+def main():
+    parser = argparse.ArgumentParser(description="사고 예측 모델 롤링 오리진 백테스트")
+    parser.add_argument('--sites', type=int, default=100, help="평가할 사업장 수")
+    parser.add_argument('--days', type=int, default=730, help="사업장별 과거 데이터 일수")
+    parser.add_argument('--horizon', type=int, default=30, help="예측 기간 (일)")
+    parser.add_argument('--step', type=int, default=30, help="예측 기준일 간격 (일)")
+    parser.add_argument('--min-train', type=int, default=90, help="첫 기준일 이전 최소 학습 일수")
+    parser.add_argument('--paths', type=int, default=500, help="예측 구간 계산용 시뮬레이션 경로 수")
+    parser.add_argument('--models', nargs='+', choices=list(MODEL_FACTORIES), help="평가할 모델 (기본: 전체)")
+    parser.add_argument('--workers', type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument('--output', help="사업장·모델별 상세 결과를 저장할 CSV 경로")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    summary, detail = run_backtest(args.sites, args.models, args.days, args.horizon, args.step,
+                                   args.min_train, args.paths, args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(summary.to_string(float_format=lambda v: f'{v:.4f}'))
+    print(f"\n{args.sites}개 사업장, {elapsed:.1f}초 소요")
+    if args.output:
+        detail.to_csv(args.output, index=False)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+WORD_DAYS = 64  # uint64 단어 하나에 담는 일수
+# 바이트 값별 1인 비트 수 (NumPy에 bitwise_count가 없을 때 사용)
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+def popcount(words, axis=-1):
+    """uint64 단어 배열의 축 방향 1 비트 수를 세는 함수 (NumPy 2의 bitwise_count, 없으면 바이트 조회표)"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=axis, dtype=np.int64)
+    return POPCOUNT[np.ascontiguousarray(words).view(np.uint8)].sum(axis=axis, dtype=np.int64)
+
+def pack_days(flags):
+    """일자 축(마지막 축) bool 배열을 64일씩 uint64 단어로 압축하는 함수 (일자 d는 단어 d // 64의 d % 64번 비트)"""
+    packed = np.packbits(flags, axis=-1, bitorder='little')
+    padding = -packed.shape[-1] % 8
+    if padding:
+        packed = np.concatenate([packed, np.zeros(packed.shape[:-1] + (padding,), dtype=np.uint8)], axis=-1)
+    return packed.view('<u8')
+
+def day_mask(start, end, first_word, num_words):
+    """[start, end) 일자만 1인 비트 마스크를 first_word부터 num_words 단어로 만드는 함수"""
+    days = np.arange(first_word * WORD_DAYS, (first_word + num_words) * WORD_DAYS)
+    return pack_days((days >= start) & (days < end))
+
+class ComplianceTensor:
+    """부서 × 규정 × 일자의 일일 점검 준수 여부를 비트 단위로 압축 보관하는 텐서
+
+    words[d, r]는 일자 축을 64일씩 uint64 단어로 묶은 배열이고,
+    last_checked[d, r]는 마지막 점검 일자 번호다. 마지막 점검 이후 일자는 점검 전이므로
+    비트가 0이며 집계의 분모에서도 빠진다. 기간 집계는 기간과 겹치는 단어만 잘라
+    마스크 AND 후 popcount로 세므로 객체 행을 만들지 않는다.
+    """
+
+    def __init__(self, departments, rules, start_date, num_days, words, last_checked):
+        self.departments = pd.Index(departments)
+        self.rules = pd.Index(rules)
+        self.start_date = pd.Timestamp(start_date).normalize()
+        self.num_days = num_days
+        self.words = np.asarray(words, dtype='<u8')
+        self.last_checked = np.asarray(last_checked, dtype=np.int32)
+
+    @classmethod
+    def from_dense(cls, departments, rules, start_date, compliance, last_checked):
+        """(부서 × 규정 × 일자) bool 배열로 생성 (마지막 점검 이후 일자는 0으로 지움)"""
+        compliance = np.asarray(compliance, dtype=bool)
+        num_days = compliance.shape[-1]
+        checked = np.arange(num_days) <= np.asarray(last_checked)[..., None]
+        return cls(departments, rules, start_date, num_days,
+                   pack_days(compliance & checked), last_checked)
+
+    @property
+    def shape(self):
+        return (len(self.departments), len(self.rules), self.num_days)
+
+    @property
+    def nbytes(self):
+        return int(self.words.nbytes + self.last_checked.nbytes)
+
+    def day_index(self, date):
+        """날짜의 일자 번호"""
+        return (pd.Timestamp(date).normalize() - self.start_date).days
+
+    def last_checked_dates(self):
+        """부서 × 규정별 마지막 점검일 (datetime64 배열)"""
+        return (self.start_date + pd.to_timedelta(self.last_checked.ravel(), unit='D')).to_numpy().reshape(
+            self.last_checked.shape)
+
+    def status_on(self, day):
+        """day 일자의 부서 × 규정 준수 여부 (bool)"""
+        return ((self.words[:, :, day // WORD_DAYS] >> np.uint64(day % WORD_DAYS)) & np.uint64(1)).astype(bool)
+
+    def latest_status(self):
+        """부서 × 규정별 마지막 점검 결과 (bool)"""
+        word = np.take_along_axis(self.words, (self.last_checked // WORD_DAYS)[..., None], axis=-1)[..., 0]
+        return ((word >> (self.last_checked % WORD_DAYS).astype(np.uint64)) & np.uint64(1)).astype(bool)
+
+    def window_counts(self, start, end):
+        """[start, end) 일자 동안의 부서 × 규정별 (준수 일수, 점검 일수)
+
+        기간과 겹치는 단어만 잘라 계산하므로 비용은 기간 길이에 비례한다.
+        """
+        start, end = max(start, 0), min(end, self.num_days)
+        first_word, last_word = start // WORD_DAYS, -(-end // WORD_DAYS)
+        mask = day_mask(start, end, first_word, last_word - first_word)
+        compliant = popcount(self.words[:, :, first_word:last_word] & mask)
+        checked = np.clip(np.minimum(self.last_checked + 1, end) - start, 0, None)
+        return compliant, checked
+
+    def recent_counts(self, days=None):
+        """최근 days일(None이면 마지막 점검 결과 하나)의 (준수 수, 점검 수)"""
+        if days is None:
+            return self.latest_status().astype(np.int64), np.ones(self.last_checked.shape, dtype=np.int64)
+        return self.window_counts(self.num_days - days, self.num_days)
+
+    @staticmethod
+    def rates(compliant, checked, axis=None):
+        """준수 수와 점검 수를 축 방향으로 합쳐 준수율을 계산 (axis=1: 부서별, 0: 규정별, None: 전체)"""
+        total = checked.sum(axis=axis)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return compliant.sum(axis=axis) / total
+
+    def to_frame(self, departments=None):
+        """부서(번호 목록)별 마지막 점검 현황을 Department, Rule, Compliance, LastChecked 행으로 펼침"""
+        departments = np.arange(len(self.departments)) if departments is None else np.asarray(departments)
+        status = self.latest_status()[departments]
+        dates = self.last_checked_dates()[departments]
+        return pd.DataFrame({
+            'Department': np.repeat(self.departments[departments], len(self.rules)),
+            'Rule': np.tile(self.rules, len(departments)),
+            'Compliance': status.ravel().astype(np.int64),
+            'LastChecked': dates.ravel()
+        })
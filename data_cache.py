@@ -0,0 +1,201 @@
+import functools
+import hashlib
+import inspect
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 전체 캐시 메모리 한도 (512MB)
+DEFAULT_TTL = 300  # 항목별 기본 유효 시간 (초)
+
+def estimate_size(value):
+    """캐시 항목의 메모리 사용량(바이트)을 추정하는 함수"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+def _copy_value(value):
+    """호출자가 캐시된 데이터를 수정하지 못하도록 복사본을 반환하는 함수
+
+    튜플, 리스트, 딕셔너리 안의 DataFrame/Series/ndarray도 복사한다.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return value.copy()
+    if isinstance(value, dict):
+        return type(value)((k, _copy_value(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return [_copy_value(v) for v in value]
+    if isinstance(value, tuple):
+        items = [_copy_value(v) for v in value]
+        return type(value)(*items) if hasattr(value, '_fields') else tuple(items)
+    return value
+
+def _freeze(value, seen=None):
+    """캐시에 보관하는 값 안의 ndarray를 읽기 전용으로 만드는 함수
+
+    컨테이너와 사용자 객체(속성)를 따라 내려가며 배열의 쓰기를 막는다. 복사하지 않고 공유되는
+    값을 호출자가 제자리에서 수정하면 ValueError가 나므로 캐시 원본이 바뀌지 않는다.
+    DataFrame/Series는 읽기 전용으로 만들 수 없어 그대로 둔다.
+    """
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        return
+    elif isinstance(value, dict):
+        for v in value.values():
+            _freeze(v, seen)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _freeze(v, seen)
+    elif hasattr(value, '__dict__') and not isinstance(value, type):
+        for v in vars(value).values():
+            _freeze(v, seen)
+
+class DataCache:
+    """TTL, 메모리 한도, LRU 축출을 지원하는 프로세스 공용 데이터 캐시"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._lock = threading.RLock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """키에 해당하는 값을 반환하고, 없거나 만료되었으면 (False, None)을 반환"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            value, size, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def put(self, key, value, ttl=None):
+        """값을 저장하고 메모리 한도를 넘으면 가장 오래 사용되지 않은 항목부터 축출"""
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.total_bytes -= size
+
+    def clear(self):
+        """모든 캐시 항목을 삭제"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        """캐시 적중/실패 횟수와 메모리 사용량을 반환"""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'total_bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / requests if requests else 0.0
+            }
+
+_cache = DataCache()
+
+def get_cache():
+    """프로세스 공용 데이터 캐시를 반환"""
+    return _cache
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def _key_part(value):
+    """인자 하나를 캐시 키에 넣을 값으로 변환하는 함수
+
+    repr은 큰 배열을 생략(...)하여 출력하므로 다른 배열이 같은 키가 될 수 있다.
+    배열과 DataFrame/Series는 dtype, 모양과 내용 바이트의 해시로 키를 만들고,
+    컨테이너는 원소별로 변환한다.
+    """
+    if isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            raise TypeError("object dtype 배열은 캐시 키로 사용할 수 없습니다")
+        return ('ndarray', value.dtype.str, value.shape, _digest(np.ascontiguousarray(value).tobytes()))
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        columns = tuple(value.columns) if isinstance(value, pd.DataFrame) else value.name
+        dtypes = tuple(map(str, value.dtypes)) if isinstance(value, pd.DataFrame) else str(value.dtype)
+        rows = pd.util.hash_pandas_object(value, index=True).to_numpy()
+        return (type(value).__name__, repr(columns), dtypes, value.shape, _digest(rows.tobytes()))
+    if isinstance(value, dict):
+        return ('dict', tuple((_key_part(k), _key_part(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(_key_part(v) for v in value))
+    return repr(value)
+
+def _make_key(func, signature, args, kwargs):
+    """함수와 (기본값이 채워진) 인자로 캐시 키를 생성"""
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return (func.__module__, func.__qualname__,
+            tuple((name, _key_part(value)) for name, value in bound.arguments.items()))
+
+def cached_data(ttl=DEFAULT_TTL, copy=True):
+    """generate_* 함수의 결과를 인자 기준으로 캐시하는 데코레이터
+
+    copy=True이면 DataFrame/ndarray는 (컨테이너 안의 것도) 복사본을 반환하여
+    페이지에서 열을 추가해도 캐시된 원본이 바뀌지 않는다. 그 밖의 객체(저장소, 텐서 등)와
+    copy=False의 결과는 모든 호출자가 같은 캐시 객체를 공유하므로 읽기 전용으로만 써야 하며,
+    이를 위해 캐시에 넣을 때 객체 안의 ndarray를 읽기 전용으로 만든다.
+    배열/DataFrame 인자는 내용 해시로 키를 만든다.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = _make_key(func, signature, args, kwargs)
+            found, value = _cache.get(key)
+            if not found:
+                value = func(*args, **kwargs)
+                _freeze(value)
+                _cache.put(key, value, ttl=ttl)
+            return _copy_value(value) if copy else value
+
+        wrapper.uncached = func
+        return wrapper
+    return decorator
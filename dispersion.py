@@ -0,0 +1,64 @@
+import numpy as np
+
+STABILITY_CLASSES = ['A', 'B', 'C', 'D', 'E', 'F']
+# Briggs 개활지 확산 계수: σy = a·x·(1 + b·x)^-0.5, σz = c·x·(1 + d·x)^e
+BRIGGS_Y = np.array([[0.22, 1e-4], [0.16, 1e-4], [0.11, 1e-4], [0.08, 1e-4], [0.06, 1e-4], [0.04, 1e-4]],
+                    dtype=np.float32)
+BRIGGS_Z = np.array([[0.20, 0.0, 0.0], [0.12, 0.0, 0.0], [0.08, 2e-4, -0.5],
+                     [0.06, 1.5e-3, -0.5], [0.03, 3e-4, -1.0], [0.016, 3e-4, -1.0]], dtype=np.float32)
+MIN_DISTANCE = 1.0  # 풍하 거리 하한 (m) - 누출원 바로 위 셀의 발산 방지
+MAX_CHUNK_ELEMENTS = 8_000_000  # 한 번에 계산할 (누출원 × 시나리오 × 셀) 원소 수 상한
+
+def briggs_sigmas(distance, stability):
+    """풍하 거리(m)와 대기 안정도 등급 번호(0=A … 5=F)로 수평/수직 확산 폭 σy, σz(m)를 계산하는 함수
+
+    stability는 distance와 브로드캐스트 가능한 모양이면 된다.
+    """
+    a, b = BRIGGS_Y[stability, 0], BRIGGS_Y[stability, 1]
+    c, d, e = BRIGGS_Z[stability, 0], BRIGGS_Z[stability, 1], BRIGGS_Z[stability, 2]
+    sigma_y = a * distance / np.sqrt(1 + b * distance)
+    sigma_z = c * distance * (1 + d * distance) ** e
+    return sigma_y, sigma_z
+
+def plume_concentration(grid_x, grid_y, sources, wind_speed, wind_direction, stability):
+    """여러 누출원과 기상 시나리오에 대한 지표면 농도장(g/m³)을 한 번에 계산하는 함수
+
+    grid_x, grid_y는 격자 좌표축(m, y는 북쪽), sources는 (누출원 수 × 4: x, y, 배출률 g/s, 높이 m) 배열이다.
+    wind_speed(m/s), wind_direction(바람이 불어오는 방향, 북쪽 기준 시계방향 도), stability(등급 번호)는
+    시나리오 수 길이의 배열이다. 결과는 (시나리오 수, len(grid_y), len(grid_x))이며 누출원별 농도의 합이다.
+    누출원 × 시나리오 × 격자를 브로드캐스트로 계산하되, 메모리를 넘지 않도록 누출원을 나누어 더한다.
+    """
+    grid_x = np.asarray(grid_x, dtype=np.float32)
+    grid_y = np.asarray(grid_y, dtype=np.float32)
+    sources = np.atleast_2d(np.asarray(sources, dtype=np.float32))
+    wind_speed = np.atleast_1d(np.asarray(wind_speed, dtype=np.float32))
+    stability = np.atleast_1d(np.asarray(stability))
+    # 바람이 불어가는 방향의 단위 벡터 (시나리오 축, 격자 축 두 개로 브로드캐스트)
+    heading = np.deg2rad(np.atleast_1d(np.asarray(wind_direction, dtype=np.float32)) + 180)
+    sin_h = np.sin(heading).astype(np.float32)[:, None, None]
+    cos_h = np.cos(heading).astype(np.float32)[:, None, None]
+    u = np.maximum(wind_speed, 0.5)[:, None, None]
+
+    num_scenarios = len(wind_speed)
+    total = np.zeros((num_scenarios, len(grid_y), len(grid_x)), dtype=np.float32)
+    chunk = max(1, MAX_CHUNK_ELEMENTS // (num_scenarios * len(grid_y) * len(grid_x)))
+    for i in range(0, len(sources), chunk):
+        src = sources[i:i + chunk]
+        dx = (grid_x[None, :] - src[:, 0, None])[:, None, None, :]  # (누출원, 1, 1, x)
+        dy = (grid_y[None, :] - src[:, 1, None])[:, None, :, None]  # (누출원, 1, y, 1)
+        downwind = dx * sin_h + dy * cos_h  # (누출원, 시나리오, y, x)
+        crosswind = dx * cos_h - dy * sin_h
+        x = np.maximum(downwind, MIN_DISTANCE)
+        sigma_y, sigma_z = briggs_sigmas(x, stability[:, None, None])
+        rate = src[:, 2, None, None, None]
+        height = src[:, 3, None, None, None]
+        # 지면 반사를 포함한 지표면(z=0) 가우시안 플룸
+        concentration = (rate / (np.pi * u * sigma_y * sigma_z) *
+                         np.exp(-0.5 * (crosswind / sigma_y) ** 2 - 0.5 * (height / sigma_z) ** 2))
+        total += np.where(downwind > 0, concentration, 0).sum(axis=0)
+    return total
+
+def exceedance_areas(concentration, thresholds, cell_area):
+    """시나리오별로 농도가 각 기준을 넘는 면적(m²)을 (시나리오 수 × 기준 수) 배열로 반환하는 함수"""
+    flat = concentration.reshape(len(concentration), -1)
+    return np.stack([(flat >= t).sum(axis=1) * cell_area for t in thresholds], axis=1)
@@ -0,0 +1,61 @@
+import numpy as np
+
+def lttb_indices(x, y, threshold):
+    """LTTB(Largest-Triangle-Three-Buckets) 알고리즘으로 남길 지점의 인덱스를 선택하는 함수
+
+    x는 단조 증가하는 숫자 배열이어야 하며, 첫 지점과 마지막 지점은 항상 포함된다.
+    """
+    return lttb_indices_rows(x, np.asarray(y)[None, :], threshold)[0]
+
+def lttb_indices_rows(x, y, threshold):
+    """같은 x를 공유하는 여러 계열(y의 행)에 대해 계열별 LTTB 인덱스를 한 번에 선택하는 함수
+
+    버킷 순회만 파이썬 루프이고 계열 축은 배열 연산이다. 결과는 (계열 수 × 선택 지점 수) 배열이다.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    num_rows, n = y.shape
+    if threshold >= n or threshold < 3:
+        return np.tile(np.arange(n), (num_rows, 1))
+
+    # 첫/마지막 지점을 제외한 구간을 threshold - 2개 버킷으로 나눔
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty((num_rows, threshold), dtype=np.int64)
+    selected[:, 0] = 0
+    selected[:, -1] = n - 1
+    rows = np.arange(num_rows)
+    previous = np.zeros(num_rows, dtype=np.int64)
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # 다음 버킷의 평균 지점 (마지막 버킷은 마지막 지점)
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[:, next_start:next_end].mean(axis=1)
+        # 이전 선택 지점, 현재 후보, 다음 버킷 평균으로 이루어진 삼각형 넓이가 최대인 후보 선택
+        prev_x, prev_y = x[previous][:, None], y[rows, previous][:, None]
+        area = np.abs((prev_x - avg_x) * (y[:, start:end] - prev_y) -
+                      (prev_x - x[start:end]) * (avg_y[:, None] - prev_y))
+        previous = start + np.argmax(area, axis=1)
+        selected[:, i + 1] = previous
+    return selected
+
+def downsample(x, y, threshold):
+    """x, y 배열을 최대 threshold개 지점으로 다운샘플링하는 함수
+
+    x가 datetime64이면 정수로 변환하여 계산하고 원래 값을 반환한다.
+    """
+    x = np.asarray(x)
+    numeric_x = x.astype('datetime64[ns]').astype(np.int64) if np.issubdtype(x.dtype, np.datetime64) else x
+    idx = lttb_indices(numeric_x, y, threshold)
+    return x[idx], np.asarray(y)[idx]
+
+def downsample_rows(x, y, threshold):
+    """공통 x와 (계열 수 × 지점 수) y를 계열별 최대 threshold개 지점으로 다운샘플링하는 함수
+
+    (계열 수 × 선택 지점 수) 모양의 x, y 배열을 반환한다. x가 datetime64이면 downsample과 같이 처리한다.
+    """
+    x = np.asarray(x)
+    numeric_x = x.astype('datetime64[ns]').astype(np.int64) if np.issubdtype(x.dtype, np.datetime64) else x
+    y = np.asarray(y)
+    idx = lttb_indices_rows(numeric_x, y, threshold)
+    return x[idx], np.take_along_axis(y, idx, axis=1)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+PYRAMID_MIN_SIZE = 16  # 피라미드 최상위(가장 성긴) 단계의 최대 격자 크기
+
+def block_mean(values, factor):
+    """2차원 배열을 factor × factor 블록 평균으로 줄이는 함수 (나누어떨어지지 않는 가장자리 블록은 남은 셀로 평균)"""
+    rows = np.arange(0, values.shape[0], factor)
+    cols = np.arange(0, values.shape[1], factor)
+    sums = np.add.reduceat(np.add.reduceat(values, rows, axis=0, dtype=np.float64), cols, axis=1)
+    counts = np.outer(np.diff(np.r_[rows, values.shape[0]]), np.diff(np.r_[cols, values.shape[1]]))
+    return (sums / counts).astype(values.dtype)
+
+def block_axis(axis, factor):
+    """블록 평균 격자의 좌표축 (블록에 속한 좌표의 평균)"""
+    starts = np.arange(0, len(axis), factor)
+    return np.add.reduceat(axis, starts) / np.diff(np.r_[starts, len(axis)])
+
+class EnvironmentalField:
+    """같은 격자 위의 여러 환경 변수를 2차원 배열과 좌표축으로 보관하는 격자 자료형
+
+    layers의 각 배열은 (len(y), len(x)) 모양이며 행은 y, 열은 x 좌표다.
+    화면 표시용으로는 블록 평균으로 절반씩 줄인 피라미드 단계를 골라 쓰므로
+    격자가 커져도 셀 단위 DataFrame을 만들지 않는다.
+    """
+
+    def __init__(self, x, y, layers):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.layers = {name: np.asarray(values, dtype=np.float32) for name, values in layers.items()}
+        self._pyramid = None
+
+    @property
+    def shape(self):
+        return (len(self.y), len(self.x))
+
+    @property
+    def names(self):
+        return list(self.layers)
+
+    @property
+    def nbytes(self):
+        levels = self._pyramid[1:] if self._pyramid else []
+        return int(self.x.nbytes + self.y.nbytes + sum(v.nbytes for v in self.layers.values()) +
+                   sum(level.nbytes for level in levels))
+
+    def __getitem__(self, name):
+        return self.layers[name]
+
+    def downsample(self, factor):
+        """factor × factor 블록 평균으로 줄인 새 격자"""
+        if factor <= 1:
+            return self
+        return EnvironmentalField(block_axis(self.x, factor), block_axis(self.y, factor),
+                                  {name: block_mean(values, factor) for name, values in self.layers.items()})
+
+    def pyramid(self, min_size=PYRAMID_MIN_SIZE):
+        """원본부터 가로세로를 절반씩 줄인 단계 목록 (처음 호출할 때 한 번만 계산)"""
+        if self._pyramid is None:
+            levels = [self]
+            while max(levels[-1].shape) > min_size:
+                levels.append(levels[-1].downsample(2))
+            self._pyramid = levels
+        return self._pyramid
+
+    def level_for(self, max_points):
+        """가로세로 격자 수가 max_points 이하인 가장 세밀한 피라미드 단계"""
+        return next((level for level in self.pyramid() if max(level.shape) <= max_points), self.pyramid()[-1])
+
+    def to_frame(self):
+        """셀마다 한 행인 긴 형식 DataFrame (x, y, 변수들) - 작은 격자의 원본 보기용"""
+        x, y = np.meshgrid(self.x, self.y)
+        return pd.DataFrame({'x': x.ravel(), 'y': y.ravel(),
+                             **{name: values.ravel() for name, values in self.layers.items()}})
@@ -0,0 +1,228 @@
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+
+# 양력 고정 공휴일 (월, 일). 음력 공휴일(설날, 추석, 부처님오신날)은 포함하지 않는다.
+KOREAN_FIXED_HOLIDAYS = {(1, 1), (3, 1), (5, 5), (6, 6), (8, 15), (10, 3), (10, 9), (12, 25)}
+
+def is_holiday(date):
+    """날짜가 주말 외 고정 공휴일인지 확인하는 함수"""
+    return (date.month, date.day) in KOREAN_FIXED_HOLIDAYS
+
+class ForecastModel:
+    """일별 사고 건수를 하루씩 증분 학습하는 예측 모델의 공통 인터페이스"""
+
+    def __init__(self):
+        self.last_date = None
+        self.num_observations = 0
+
+    def update(self, date, count):
+        """하루치 관측값으로 모델 상태를 갱신"""
+        self._update(date, float(count))
+        self.last_date = date
+        self.num_observations += 1
+
+    def update_many(self, dates, counts):
+        """여러 날의 관측값을 날짜 순서대로 반영"""
+        for date, count in zip(dates, counts):
+            self.update(date, count)
+        return self
+
+    def forecast(self, dates):
+        """미래 날짜별 기대 사고 건수를 반환"""
+        return np.maximum(np.array([self._forecast(date) for date in dates], dtype=np.float64), 0)
+
+    def rate_shape(self):
+        """발생률 추정의 불확실성을 나타내는 감마 분포 형상 모수 (유효 관측 사고 건수)"""
+        return None
+
+    def _update(self, date, count):
+        raise NotImplementedError
+
+    def _forecast(self, date):
+        raise NotImplementedError
+
+class MovingAverageModel(ForecastModel):
+    """최근 window일 이동 평균을 발생률로 사용하는 기준 모델"""
+
+    def __init__(self, window=7):
+        super().__init__()
+        self.window = window
+        self._recent = deque(maxlen=window)
+
+    def _update(self, date, count):
+        self._recent.append(count)
+
+    def _forecast(self, date):
+        return np.mean(self._recent) if self._recent else 0.0
+
+    def rate_shape(self):
+        return max(sum(self._recent), 1)
+
+class EWMAModel(ForecastModel):
+    """지수가중 이동 평균(EWMA) 수준 모델"""
+
+    def __init__(self, alpha=0.1):
+        super().__init__()
+        self.alpha = alpha
+        self.level = None
+
+    def _update(self, date, count):
+        self.level = count if self.level is None else self.alpha * count + (1 - self.alpha) * self.level
+
+    def _forecast(self, date):
+        return self.level if self.level is not None else 0.0
+
+    def rate_shape(self):
+        # EWMA의 유효 관측 일수 (2 - alpha) / alpha
+        if self.level is None:
+            return None
+        effective_days = min((2 - self.alpha) / self.alpha, self.num_observations)
+        return max(self.level * effective_days, 1)
+
+class HoltWintersModel(ForecastModel):
+    """요일 계절성을 가진 가법 Holt-Winters 모델
+
+    상태는 수준, 추세, 요일별 계절 성분(7개)뿐이며 관측 하나당 O(1)로 갱신된다.
+    첫 주는 초기 수준 추정에 사용한다.
+    """
+
+    def __init__(self, alpha=0.1, beta=0.01, gamma=0.1, season_length=7):
+        super().__init__()
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.season_length = season_length
+        self.level = None
+        self.trend = 0.0
+        self.season = np.zeros(season_length)
+        self._warmup = []
+
+    def _update(self, date, count):
+        position = date.weekday() % self.season_length
+        if self.level is None:
+            self._warmup.append((position, count))
+            if len(self._warmup) == self.season_length:
+                self.level = np.mean([c for _, c in self._warmup])
+                for p, c in self._warmup:
+                    self.season[p] = c - self.level
+                self._warmup = []
+            return
+        previous_level = self.level
+        self.level = self.alpha * (count - self.season[position]) + (1 - self.alpha) * (self.level + self.trend)
+        self.trend = self.beta * (self.level - previous_level) + (1 - self.beta) * self.trend
+        self.season[position] = self.gamma * (count - self.level) + (1 - self.gamma) * self.season[position]
+
+    def _forecast(self, date):
+        if self.level is None:
+            return np.mean([c for _, c in self._warmup]) if self._warmup else 0.0
+        horizon = (date - self.last_date).days
+        return self.level + horizon * self.trend + self.season[date.weekday() % self.season_length]
+
+    def rate_shape(self):
+        if self.level is None:
+            return None
+        effective_days = min((2 - self.alpha) / self.alpha, self.num_observations)
+        return max(self.level * effective_days, 1)
+
+class SeasonalPoissonModel(ForecastModel):
+    """요일·공휴일 효과를 가진 포아송 로그선형 모델
+
+    log(λ) = 요일 효과 + 공휴일 효과 형태이며, 감쇠 가중 충분통계량(요일별 사고 건수와
+    노출 일수, 공휴일 관측/기대 건수)만 보관하여 하루씩 증분 갱신한다.
+    """
+
+    def __init__(self, decay=0.995, prior_days=2.0):
+        super().__init__()
+        self.decay = decay
+        self.prior_days = prior_days
+        self.weekday_counts = np.zeros(7)
+        self.weekday_exposure = np.zeros(7)
+        self.holiday_counts = 0.0
+        self.holiday_expected = 0.0
+
+    def _overall_rate(self):
+        exposure = self.weekday_exposure.sum()
+        return self.weekday_counts.sum() / exposure if exposure > 0 else 0.0
+
+    def _weekday_rates(self):
+        # 전체 평균 발생률을 사전값으로 한 요일별 발생률 (관측이 적은 요일의 과적합 방지)
+        overall = self._overall_rate()
+        return (self.weekday_counts + self.prior_days * overall) / (self.weekday_exposure + self.prior_days)
+
+    def _holiday_multiplier(self):
+        return (self.holiday_counts + self.prior_days) / (self.holiday_expected + self.prior_days)
+
+    def _update(self, date, count):
+        self.weekday_counts *= self.decay
+        self.weekday_exposure *= self.decay
+        self.holiday_counts *= self.decay
+        self.holiday_expected *= self.decay
+        weekday = date.weekday()
+        if is_holiday(date):
+            self.holiday_counts += count
+            self.holiday_expected += self._weekday_rates()[weekday]
+        else:
+            self.weekday_counts[weekday] += count
+            self.weekday_exposure[weekday] += 1
+
+    def _forecast(self, date):
+        rate = self._weekday_rates()[date.weekday()]
+        return rate * self._holiday_multiplier() if is_holiday(date) else rate
+
+    def rate_shape(self):
+        return max(self.weekday_counts.sum(), 1)
+
+MODEL_FACTORIES = {
+    'moving_average': MovingAverageModel,
+    'ewma': EWMAModel,
+    'holt_winters': HoltWintersModel,
+    'seasonal_poisson': SeasonalPoissonModel
+}
+
+MODEL_LABELS = {
+    'moving_average': '7일 이동 평균',
+    'ewma': 'EWMA',
+    'holt_winters': 'Holt-Winters (요일 계절성)',
+    'seasonal_poisson': '계절성 포아송 (요일/공휴일)'
+}
+
+def create_model(model_name):
+    """모델 이름으로 새 예측 모델을 생성"""
+    return MODEL_FACTORIES[model_name]()
+
+class FittedModelStore:
+    """사업장·모델별로 학습된 예측 모델을 보관하는 캐시
+
+    같은 데이터 버전에 새 날짜가 추가되었으면 추가된 날짜만 증분 반영하고,
+    데이터 버전이 바뀌었거나 과거 구간이 달라졌으면 처음부터 다시 학습한다.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (site, model_name) -> (data_version, model)
+        self._lock = threading.Lock()
+
+    def get(self, site, model_name, data, data_version=None):
+        """data(date, accidents)에 맞춰 학습된 모델과 갱신 방식('cached'/'updated'/'fitted')을 반환"""
+        data = data.sort_values('date')
+        last_date = data['date'].iloc[-1]
+        key = (site, model_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                version, model = entry
+                if version == data_version and model.last_date is not None and model.last_date <= last_date:
+                    new_rows = data[data['date'] > model.last_date]
+                    if new_rows.empty:
+                        return model, 'cached'
+                    model.update_many(new_rows['date'], new_rows['accidents'])
+                    return model, 'updated'
+
+            model = create_model(model_name).update_many(data['date'], data['accidents'])
+            self._entries[key] = (data_version, model)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return model, 'fitted'
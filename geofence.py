@@ -0,0 +1,147 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_ZONES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'hazard_zones.geojson')
+
+def load_zones(path=DEFAULT_ZONES_PATH):
+    """GeoJSON 파일에서 구역 목록(name, category, polygons, rings)을 읽는 함수
+
+    Polygon과 MultiPolygon을 지원하며, 판정용으로 각 구역의 모든 고리(외곽/구멍)를 한 목록에,
+    지도 표시용으로 원래 다각형 좌표(polygons)를 함께 보관한다.
+    """
+    with open(path, encoding='utf-8') as f:
+        collection = json.load(f)
+
+    zones = []
+    for i, feature in enumerate(collection.get('features', [])):
+        geometry = feature['geometry']
+        if geometry['type'] == 'Polygon':
+            polygons = [geometry['coordinates']]
+        elif geometry['type'] == 'MultiPolygon':
+            polygons = geometry['coordinates']
+        else:
+            raise ValueError(f"지원하지 않는 도형 유형입니다: {geometry['type']}")
+        properties = feature.get('properties') or {}
+        zones.append({
+            'name': properties.get('name', f'구역 {i+1}'),
+            'category': properties.get('category', ''),
+            'polygons': polygons,
+            'rings': [np.asarray(ring, dtype=np.float64) for polygon in polygons for ring in polygon]
+        })
+    return zones
+
+def points_in_rings(x, y, rings):
+    """광선 투사(짝수-홀수 규칙)로 점들이 고리 집합 내부에 있는지 판정하는 함수
+
+    간선마다 모든 점에 대해 한 번에 교차 여부를 계산하므로 비용은 점 수 × 간선 수이다.
+    """
+    inside = np.zeros(len(x), dtype=bool)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for ring in rings:
+            x1, y1 = ring[:-1, 0], ring[:-1, 1]
+            x2, y2 = ring[1:, 0], ring[1:, 1]
+            for ax, ay, bx, by in zip(x1, y1, x2, y2):
+                crosses = (ay > y) != (by > y)
+                x_cross = ax + (y - ay) * (bx - ax) / (by - ay)
+                inside ^= crosses & (x < x_cross)
+    return inside
+
+class GeofenceIndex:
+    """구역 경계 상자와 경도순 정렬을 이용한 점-다각형 포함 판정 인덱스"""
+
+    def __init__(self, zones):
+        self.zones = zones
+        self.names = pd.Index([zone['name'] for zone in zones])
+        self.bounds = np.array([
+            [min(r[:, 0].min() for r in z['rings']), min(r[:, 1].min() for r in z['rings']),
+             max(r[:, 0].max() for r in z['rings']), max(r[:, 1].max() for r in z['rings'])]
+            for z in zones
+        ]).reshape(-1, 4)
+
+    def __len__(self):
+        return len(self.zones)
+
+    def locate(self, lat, lon):
+        """구역 내부에 있는 (표본 인덱스, 구역 인덱스) 쌍을 표본 순으로 반환하는 함수
+
+        표본을 경도순으로 정렬해 두고, 구역마다 경계 상자의 경도 범위를 이진 탐색으로 잘라낸 뒤
+        위도 범위로 다시 걸러낸 후보에 대해서만 다각형 판정을 수행한다.
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        order = np.argsort(lon, kind='stable')
+        sorted_lon = lon[order]
+
+        sample_idx, zone_idx = [], []
+        for z, (min_x, min_y, max_x, max_y) in enumerate(self.bounds):
+            lo = np.searchsorted(sorted_lon, min_x, side='left')
+            hi = np.searchsorted(sorted_lon, max_x, side='right')
+            candidates = order[lo:hi]
+            candidates = candidates[(lat[candidates] >= min_y) & (lat[candidates] <= max_y)]
+            if len(candidates) == 0:
+                continue
+            inside = candidates[points_in_rings(lon[candidates], lat[candidates], self.zones[z]['rings'])]
+            sample_idx.append(inside)
+            zone_idx.append(np.full(len(inside), z, dtype=np.int64))
+
+        if not sample_idx:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        sample_idx, zone_idx = np.concatenate(sample_idx), np.concatenate(zone_idx)
+        sort = np.lexsort((zone_idx, sample_idx))
+        return sample_idx[sort], zone_idx[sort]
+
+def sample_durations(store):
+    """각 표본이 다음 표본까지 유지되는 시간(초). 작업자의 마지막 표본은 0"""
+    durations = np.zeros(len(store))
+    if len(store) > 1:
+        durations[:-1] = np.diff(store.timestamps) / 1e9
+    last = store.offsets[1:][store.counts() > 0] - 1
+    durations[last] = 0
+    return durations
+
+def compute_zone_dwell(store, index, bucket='1h', pairs=None):
+    """구역 × 작업자 × 시간 구간별 체류 시간(분)과 표본 수를 집계하는 함수"""
+    sample_idx, zone_idx = pairs if pairs is not None else index.locate(store.latitude, store.longitude)
+    bucket_ns = pd.Timedelta(bucket).value
+    minutes = sample_durations(store)[sample_idx] / 60
+    frame = pd.DataFrame({
+        'zone': pd.Categorical.from_codes(zone_idx, categories=index.names),
+        'worker_id': pd.Categorical.from_codes(store.worker_codes()[sample_idx], categories=store.workers),
+        'bucket': (store.timestamps[sample_idx] // bucket_ns * bucket_ns).view('datetime64[ns]'),
+        'minutes': minutes
+    })
+    return frame.groupby(['zone', 'worker_id', 'bucket'], observed=True).agg(
+        minutes=('minutes', 'sum'), samples=('minutes', 'size')
+    ).reset_index()
+
+def find_zone_events(store, index, pairs=None):
+    """작업자의 구역 진입/이탈 이벤트를 시간순으로 반환하는 함수
+
+    같은 작업자의 바로 앞 표본이 같은 구역에 없으면 진입, 바로 다음 표본이 같은 구역에
+    없으면 그 다음 표본 시각에 이탈로 기록한다. 마지막 표본까지 구역에 있으면 이탈은 없다.
+    """
+    sample_idx, zone_idx = pairs if pairs is not None else index.locate(store.latitude, store.longitude)
+    order = np.lexsort((sample_idx, zone_idx))
+    sample_idx, zone_idx = sample_idx[order], zone_idx[order]
+    codes = store.worker_codes()
+    workers = codes[sample_idx]
+
+    # 같은 구역·작업자 안에서 연속된 표본이면 체류가 이어지는 것으로 본다
+    continues = np.zeros(len(sample_idx), dtype=bool)
+    continues[1:] = ((zone_idx[1:] == zone_idx[:-1]) & (workers[1:] == workers[:-1]) &
+                     (sample_idx[1:] == sample_idx[:-1] + 1))
+    entries = ~continues
+    last_sample = store.offsets[1:][codes[sample_idx]] - 1
+    exits = np.append(~continues[1:], True) & (sample_idx < last_sample)
+
+    event_samples = np.concatenate([sample_idx[entries], sample_idx[exits] + 1])
+    events = pd.DataFrame({
+        'timestamp': store.timestamps[event_samples].view('datetime64[ns]'),
+        'worker_id': store.workers[codes[event_samples]],
+        'zone': index.names[np.concatenate([zone_idx[entries], zone_idx[exits]])],
+        'event': np.repeat(['진입', '이탈'], [entries.sum(), exits.sum()])
+    })
+    return events.sort_values(['timestamp', 'worker_id'], kind='stable').reset_index(drop=True)
@@ -0,0 +1,170 @@
+import heapq
+import threading
+
+import numpy as np
+import pandas as pd
+
+# 열화 점수 가중치와 정규화 기준 (기준값에서 각 항이 1이 됨)
+DEGRADATION_WEIGHTS = {'vibration_trend': 0.3, 'efficiency_loss': 0.3, 'age': 0.25, 'status': 0.15}
+VIBRATION_TREND_SCALE = 0.3  # 진동 증가 속도 (mm/s per 시간)
+EFFICIENCY_LOSS_SCALE = 10.0  # 효율 손실 (%p)
+AGE_SCALE = 180.0  # 마지막 정비 후 경과 일수
+REBUILD_FRACTION = 0.25  # 점수가 바뀐 설비가 이 비율을 넘으면 증분 대신 전체 재구성
+
+def linear_slopes(times, values):
+    """시점 축(0번 축)을 따라 최소제곱 기울기를 한 번에 계산하는 함수 (NaN 행은 제외)"""
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    t = np.where(valid, times.reshape((-1,) + (1,) * (values.ndim - 1)), 0)
+    n = valid.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t_mean = t.sum(axis=0) / n
+        y_mean = np.where(valid, values, 0).sum(axis=0) / n
+        dt = np.where(valid, t - t_mean, 0)
+        slope = (dt * np.where(valid, values - y_mean, 0)).sum(axis=0) / (dt ** 2).sum(axis=0)
+    return np.nan_to_num(slope)
+
+def degradation_scores(vibration_trend, efficiency_loss, days_since_maintenance, status_level,
+                       weights=DEGRADATION_WEIGHTS):
+    """설비별 열화 점수를 계산하는 함수 (각 항을 0~1로 정규화한 가중합, 경과 일수만 1.5까지 허용)"""
+    terms = {
+        'vibration_trend': np.clip(np.asarray(vibration_trend) / VIBRATION_TREND_SCALE, 0, 1),
+        'efficiency_loss': np.clip(np.asarray(efficiency_loss) / EFFICIENCY_LOSS_SCALE, 0, 1),
+        'age': np.clip(np.asarray(days_since_maintenance) / AGE_SCALE, 0, 1.5),
+        'status': np.asarray(status_level) / 2
+    }
+    return sum(weights[name] * term for name, term in terms.items())
+
+class MaintenanceScheduler:
+    """열화 점수가 높은 설비부터 일별 정비 인원 한도 안에서 배정하는 정비 일정 계획기
+
+    날짜마다 배정된 작업을 최소 힙(점수, 설비)으로 보관하므로, 앞선 날짜의 모든 점수는
+    뒤 날짜의 점수 이상이라는 순서가 유지된다. 설비 하나의 점수가 바뀌면 그 설비만 빼고
+    다시 넣으며, 밀려난 작업과 빈자리 채우기는 인접한 날짜로만 연쇄적으로 전파된다.
+    계획 기간에 들어가지 못한 설비는 최대 힙(대기열)에 보관한다.
+    """
+
+    def __init__(self, start_date, num_days, crew_capacity, workdays_only=True):
+        self.dates = pd.date_range(pd.Timestamp(start_date).normalize(), periods=num_days, freq='D')
+        capacity = np.full(num_days, crew_capacity, dtype=np.int64)
+        if workdays_only:
+            capacity[self.dates.dayofweek >= 5] = 0
+        self.capacity = capacity
+        self.days = [[] for _ in range(num_days)]  # 날짜별 최소 힙 [(점수, 설비)]
+        self.backlog = []  # 계획 기간 밖 최대 힙 [(-점수, 설비)]
+        self.scores = {}
+        self.location = {}  # 설비 -> 날짜 인덱스 (대기열이면 None)
+        self._lock = threading.RLock()
+
+    def build(self, scores):
+        """전체 설비 점수로 일정을 새로 만듦 (우선순위 큐에서 점수 순으로 꺼내 앞 날짜부터 채움)"""
+        with self._lock:
+            self.days = [[] for _ in self.days]
+            self.scores = dict(scores)
+            self.location = {}
+            queue = [(-score, asset) for asset, score in self.scores.items()]
+            heapq.heapify(queue)
+            for day, capacity in enumerate(self.capacity):
+                for _ in range(min(capacity, len(queue))):
+                    score, asset = heapq.heappop(queue)
+                    self.days[day].append((-score, asset))
+                    self.location[asset] = day
+                heapq.heapify(self.days[day])
+            self.backlog = queue
+            for _, asset in queue:
+                self.location[asset] = None
+        return self
+
+    def update(self, asset, score):
+        """설비 하나의 점수를 바꾸고 그 설비만 일정에서 빼고 다시 넣음. 새 날짜 인덱스를 반환"""
+        with self._lock:
+            if asset in self.scores:
+                self._remove(asset)
+            self.scores[asset] = score
+            return self._insert(asset, score)
+
+    def replan(self, scores, tolerance=0.0):
+        """점수가 tolerance 넘게 바뀐 설비만 다시 배치하고 다시 배치한 설비 수를 반환
+
+        처음 호출하거나 바뀐 설비가 많으면 (REBUILD_FRACTION 초과) 전체를 다시 구성한다.
+        """
+        with self._lock:
+            changed = [asset for asset, score in scores.items()
+                       if asset not in self.scores or abs(score - self.scores[asset]) > tolerance]
+            if not self.scores or len(changed) > REBUILD_FRACTION * len(scores):
+                self.build(scores)
+                return len(scores)
+            for asset in changed:
+                self.update(asset, scores[asset])
+            return len(changed)
+
+    def remove(self, asset):
+        """설비를 일정에서 제거 (예: 정비 완료)"""
+        with self._lock:
+            self._remove(asset)
+            del self.scores[asset]
+            del self.location[asset]
+
+    def _insert(self, asset, score):
+        entry = (score, asset)
+        placed_day = None
+        for day, heap in enumerate(self.days):
+            if self.capacity[day] == 0:
+                continue
+            if len(heap) < self.capacity[day]:
+                heapq.heappush(heap, entry)
+                self.location[entry[1]] = day
+                return day if placed_day is None else placed_day
+            if heap[0] < entry:
+                # 이 날짜의 최저 점수 작업을 밀어내고, 밀려난 작업을 다음 날짜에 넣음
+                bumped = heapq.heapreplace(heap, entry)
+                self.location[entry[1]] = day
+                placed_day = day if placed_day is None else placed_day
+                entry = bumped
+        heapq.heappush(self.backlog, (-entry[0], entry[1]))
+        self.location[entry[1]] = None
+        return placed_day
+
+    def _remove(self, asset):
+        day = self.location.get(asset)
+        if day is None:
+            self.backlog = [item for item in self.backlog if item[1] != asset]
+            heapq.heapify(self.backlog)
+            return
+        heap = self.days[day]
+        heap.remove((self.scores[asset], asset))
+        heapq.heapify(heap)
+        # 빈자리는 다음 근무일의 최고 점수 작업으로 채우고, 그 빈자리는 다시 다음 날짜로 전파
+        for next_day in range(day + 1, len(self.days)):
+            if self.capacity[next_day] == 0:
+                continue
+            following = self.days[next_day]
+            if not following:
+                break
+            best = max(following)
+            following.remove(best)
+            heapq.heapify(following)
+            heapq.heappush(heap, best)
+            self.location[best[1]] = day
+            day, heap = next_day, following
+        else:
+            if self.backlog:
+                score, moved = heapq.heappop(self.backlog)
+                heapq.heappush(heap, (-score, moved))
+                self.location[moved] = day
+
+    def scheduled_date(self, asset):
+        """설비의 예정 정비일 (계획 기간 밖이면 None)"""
+        day = self.location.get(asset)
+        return None if day is None else self.dates[day]
+
+    def schedule(self):
+        """날짜순 정비 일정 DataFrame (date, asset, score)"""
+        rows = [(self.dates[day], asset, score)
+                for day, heap in enumerate(self.days) for score, asset in sorted(heap, reverse=True)]
+        return pd.DataFrame(rows, columns=['date', 'asset', 'score'])
+
+    def unscheduled(self):
+        """계획 기간에 배정되지 못한 설비 수"""
+        return len(self.backlog)
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+from spatial_index import haversine_distance
+
+IDLE_SPEED = 0.02  # 이 속도(m/s) 이하로 움직인 구간은 정지로 간주
+MIN_DWELL_SECONDS = 600  # 체류로 인정하는 최소 연속 정지 시간 (초)
+HIGH_ALTITUDE = 2.0  # 고소 작업 기준 고도 (미터)
+
+def compute_steps(store):
+    """연속한 두 표본 사이의 3차원 이동 거리(m), 경과 시간(s), 속도(m/s)를 계산하는 함수
+
+    결과 배열은 표본 수와 길이가 같고, i번째 값은 (i-1)→i 구간이다.
+    각 작업자의 첫 표본은 이전 구간이 없으므로 거리와 시간이 0이다.
+    """
+    n = len(store)
+    first = np.zeros(n, dtype=bool)
+    first[store.offsets[:-1][store.counts() > 0]] = True
+
+    lat = store.latitude.astype(np.float64)
+    lon = store.longitude.astype(np.float64)
+    alt = store.altitude.astype(np.float64)
+    distance = np.zeros(n)
+    seconds = np.zeros(n)
+    if n > 1:
+        horizontal = haversine_distance(lat[:-1], lon[:-1], lat[1:], lon[1:])
+        distance[1:] = np.hypot(horizontal, np.diff(alt))
+        seconds[1:] = np.diff(store.timestamps) / 1e9
+    distance[first] = 0
+    seconds[first] = 0
+    speed = np.divide(distance, seconds, out=np.zeros(n), where=seconds > 0)
+    return distance, seconds, speed, first
+
+def find_idle_runs(store, seconds, speed, first, idle_speed=IDLE_SPEED):
+    """연속 정지 구간을 찾아 (작업자 번호, 시작 표본, 끝 표본, 지속 시간) 배열을 반환하는 함수"""
+    idle = ~first & (seconds > 0) & (speed <= idle_speed)
+    previous = np.zeros_like(idle)
+    previous[1:] = idle[:-1]
+    run_starts = np.flatnonzero(idle & ~previous)
+    # 작업자의 첫 표본은 정지 구간이 될 수 없으므로 구간이 작업자 경계를 넘지 않음
+    run_id = np.cumsum(idle & ~previous) * idle
+    durations = np.bincount(run_id, weights=seconds, minlength=len(run_starts) + 1)[1:]
+    run_ends = run_starts + np.bincount(run_id, minlength=len(run_starts) + 1)[1:]
+    workers = store.worker_codes()[run_starts]
+    # 구간 i는 표본 i-1에서 시작하므로 정지 시작 지점은 run_starts - 1
+    return workers, run_starts - 1, run_ends - 1, durations
+
+def compute_movement_metrics(store, idle_speed=IDLE_SPEED, min_dwell=MIN_DWELL_SECONDS,
+                             high_altitude=HIGH_ALTITUDE):
+    """전체 작업자의 이동 거리, 속도, 정지/체류, 고소 노출 지표를 한 번에 계산하는 함수
+
+    작업자별로 정렬된 연속 배열에서 구간 값을 구한 뒤 작업자 번호로 묶어 합산하므로
+    작업자 수와 관계없이 배열 연산 몇 번으로 끝난다.
+    """
+    num_workers = store.num_workers
+    codes = store.worker_codes()
+    counts = store.counts()
+    distance, seconds, speed, first = compute_steps(store)
+    alt = store.altitude.astype(np.float64)
+
+    def per_worker(weights):
+        return np.bincount(codes, weights=weights, minlength=num_workers)
+
+    total_distance = per_worker(distance)
+    total_seconds = per_worker(seconds)
+    max_speed = np.zeros(num_workers)
+    max_altitude = np.full(num_workers, np.nan)
+    nonempty = counts > 0
+    if nonempty.any():
+        starts = store.offsets[:-1][nonempty]
+        max_speed[nonempty] = np.maximum.reduceat(speed, starts)
+        max_altitude[nonempty] = np.maximum.reduceat(alt, starts)
+
+    idle_seconds = per_worker(np.where(~first & (speed <= idle_speed), seconds, 0))
+    high_altitude_seconds = per_worker(np.where(alt >= high_altitude, seconds, 0))
+
+    run_workers, _, _, durations = find_idle_runs(store, seconds, speed, first, idle_speed)
+    dwell = durations >= min_dwell
+    dwell_count = np.bincount(run_workers[dwell], minlength=num_workers)
+    dwell_seconds = np.bincount(run_workers[dwell], weights=durations[dwell], minlength=num_workers)
+    longest_dwell = np.zeros(num_workers)
+    np.maximum.at(longest_dwell, run_workers[dwell], durations[dwell])
+
+    return pd.DataFrame({
+        'samples': counts,
+        'total_distance_m': total_distance,
+        'avg_speed_mps': np.divide(total_distance, total_seconds, out=np.zeros(num_workers),
+                                   where=total_seconds > 0),
+        'max_speed_mps': max_speed,
+        'idle_ratio': np.divide(idle_seconds, total_seconds, out=np.zeros(num_workers),
+                                where=total_seconds > 0),
+        'dwell_count': dwell_count,
+        'dwell_minutes': dwell_seconds / 60,
+        'longest_dwell_minutes': longest_dwell / 60,
+        'max_altitude_m': max_altitude,
+        'high_altitude_minutes': high_altitude_seconds / 60
+    }, index=pd.Index(store.workers, name='worker_id'))
+
+def find_dwell_segments(store, idle_speed=IDLE_SPEED, min_dwell=MIN_DWELL_SECONDS):
+    """체류 구간 목록(작업자, 시작/종료 시각, 지속 시간, 위치)을 반환하는 함수"""
+    distance, seconds, speed, first = compute_steps(store)
+    run_workers, start, end, durations = find_idle_runs(store, seconds, speed, first, idle_speed)
+    dwell = durations >= min_dwell
+    start, end = start[dwell], end[dwell]
+    return pd.DataFrame({
+        'worker_id': store.workers[run_workers[dwell]],
+        'start': store.timestamps[start].view('datetime64[ns]'),
+        'end': store.timestamps[end].view('datetime64[ns]'),
+        'minutes': durations[dwell] / 60,
+        'latitude': store.latitude[start],
+        'longitude': store.longitude[start]
+    })
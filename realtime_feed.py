@@ -0,0 +1,119 @@
+import threading
+import time
+
+import numpy as np
+
+class ChangeRingBuffer:
+    """센서 상태 변경 이력을 보관하는 고정 크기 링 버퍼
+
+    각 변경에는 전역 순번(seq)이 매겨지며, 버퍼가 가득 차면 가장 오래된 변경부터 덮어쓴다.
+    """
+
+    def __init__(self, capacity=100000):
+        self.capacity = capacity
+        self.sensor = np.empty(capacity, dtype=np.int64)
+        self.old_level = np.empty(capacity, dtype=np.int8)
+        self.new_level = np.empty(capacity, dtype=np.int8)
+        self.tick = np.empty(capacity, dtype=np.int64)
+        self.head = 0  # 다음에 기록될 변경의 순번
+
+    @property
+    def oldest_seq(self):
+        """버퍼에 남아 있는 가장 오래된 변경의 순번"""
+        return max(0, self.head - self.capacity)
+
+    def extend(self, sensor, old_level, new_level, tick):
+        """여러 변경을 한 번에 기록"""
+        n = len(sensor)
+        if n > self.capacity:
+            # 버퍼보다 많은 변경은 마지막 capacity개만 보관
+            skip = n - self.capacity
+            sensor, old_level, new_level = sensor[skip:], old_level[skip:], new_level[skip:]
+            self.head += skip
+            n = self.capacity
+        idx = (self.head + np.arange(n)) % self.capacity
+        self.sensor[idx] = sensor
+        self.old_level[idx] = old_level
+        self.new_level[idx] = new_level
+        self.tick[idx] = tick
+        self.head += n
+
+    def read_since(self, seq):
+        """seq 이후의 변경 이력을 반환하고, 이미 덮어써졌으면 None을 반환"""
+        if seq < self.oldest_seq:
+            return None
+        idx = np.arange(seq, self.head) % self.capacity
+        return self.sensor[idx], self.old_level[idx], self.new_level[idx], self.tick[idx]
+
+class SafetySensorFeed:
+    """센서 안전 수준 변화를 시뮬레이션하고 변경 이력과 수준별 집계를 증분 갱신하는 피드
+
+    여러 세션이 같은 피드를 공유하며, 틱은 실제 경과 시간 기준으로 한 번만 진행된다.
+    """
+
+    def __init__(self, lat, lon, levels, num_levels=3, change_rate=0.01, tick_seconds=2.0,
+                 buffer_capacity=100000, seed=None):
+        self.lat = np.asarray(lat)
+        self.lon = np.asarray(lon)
+        self.levels = np.asarray(levels, dtype=np.int8).copy()
+        self.num_levels = num_levels
+        self.change_rate = change_rate
+        self.tick_seconds = tick_seconds
+        self.counts = np.bincount(self.levels, minlength=num_levels).astype(np.int64)
+        self.changes = ChangeRingBuffer(buffer_capacity)
+        self.tick = 0
+        self._rng = np.random.default_rng(seed)
+        self._last_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def advance(self, max_ticks=10):
+        """마지막 갱신 이후 경과한 시간만큼 틱을 진행"""
+        with self._lock:
+            elapsed = time.monotonic() - self._last_time
+            ticks = int(elapsed // self.tick_seconds)
+            if ticks <= 0:
+                return 0
+            self._last_time += ticks * self.tick_seconds
+            ticks = min(ticks, max_ticks)
+            for _ in range(ticks):
+                self._step()
+            return ticks
+
+    def _step(self):
+        """한 틱 동안 일부 센서의 안전 수준을 무작위로 변경"""
+        num_sensors = len(self.levels)
+        num_changes = self._rng.binomial(num_sensors, self.change_rate)
+        sensors = np.unique(self._rng.integers(0, num_sensors, num_changes))
+        new_level = self._rng.integers(0, self.num_levels, len(sensors)).astype(np.int8)
+        old_level = self.levels[sensors]
+        changed = new_level != old_level
+        sensors, old_level, new_level = sensors[changed], old_level[changed], new_level[changed]
+
+        # 수준별 집계를 변경분만으로 갱신
+        self.counts -= np.bincount(old_level, minlength=self.num_levels)
+        self.counts += np.bincount(new_level, minlength=self.num_levels)
+        self.levels[sensors] = new_level
+        self.tick += 1
+        self.changes.extend(sensors, old_level, new_level, self.tick)
+
+    def snapshot(self):
+        """현재 순번, 안전 수준 배열 복사본, 수준별 집계를 반환"""
+        with self._lock:
+            return self.changes.head, self.levels.copy(), self.counts.copy()
+
+    def current_counts(self):
+        """증분 갱신된 수준별 집계를 반환"""
+        with self._lock:
+            return self.counts.copy()
+
+    def changed_since(self, seq):
+        """seq 이후 수준이 바뀐 센서와 그 현재 수준을 반환
+
+        반환값은 (새 순번, 센서 인덱스, 현재 수준)이며, 변경 이력이 유실되었으면 None이다.
+        """
+        with self._lock:
+            changes = self.changes.read_since(seq)
+            if changes is None:
+                return None
+            sensors = np.unique(changes[0])
+            return self.changes.head, sensors, self.levels[sensors]
@@ -0,0 +1,216 @@
+import numpy as np
+import pandas as pd
+
+# (계층 이름, 구간 길이(초), 보관 구간 수)
+DEFAULT_TIERS = (('1min', 60, 360), ('1h', 3600, 168))
+DEFAULT_RAW_CAPACITY = 600  # 원본(1초) 보관 표본 수
+MAX_POINTS = 600  # 추세 조회 시 반환할 최대 시점 수
+
+def _ring_order(count, capacity):
+    """링 버퍼에 기록된 행의 슬롯 번호를 오래된 순서로 반환"""
+    n = min(count, capacity)
+    return (count - n + np.arange(n)) % capacity
+
+class RingTier:
+    """고정 길이 링 버퍼에 시간 구간별 최솟값/최댓값/평균을 보관하는 집계 계층
+
+    입력 행들을 구간 길이(period) 단위로 묶어 누적하다가 다음 구간의 행이 들어오면
+    완료된 구간을 링 버퍼에 기록한다. 완료된 구간은 반환되어 상위 계층의 입력이 된다.
+    """
+
+    def __init__(self, name, period, capacity, shape):
+        self.name = name
+        self.period = period
+        self.capacity = capacity
+        self.times = np.full(capacity, -1, dtype=np.int64)  # 구간 시작 시각 (epoch 초)
+        self.counts = np.zeros(capacity, dtype=np.int32)  # 구간에 포함된 원본 표본 수
+        self.mins = np.full((capacity,) + shape, np.nan, dtype=np.float32)
+        self.maxs = np.full((capacity,) + shape, np.nan, dtype=np.float32)
+        self.means = np.full((capacity,) + shape, np.nan, dtype=np.float32)
+        self.written = 0
+        # 진행 중인 구간의 누적값
+        self._key = None
+        self._min = self._max = self._sum = None
+        self._n = 0
+
+    @property
+    def nbytes(self):
+        return int(self.times.nbytes + self.counts.nbytes + self.mins.nbytes + self.maxs.nbytes + self.means.nbytes)
+
+    def oldest_time(self):
+        """보관 중인 가장 오래된 구간의 시작 시각 (없으면 진행 중 구간)"""
+        if self.written:
+            return int(self.times[_ring_order(self.written, self.capacity)[0]])
+        return None if self._key is None else self._key * self.period
+
+    def ingest(self, times, mins, maxs, means, counts):
+        """시간순 입력 행을 누적하고 완료된 구간을 (시각, 최솟값, 최댓값, 평균, 개수)로 반환"""
+        keys = np.asarray(times, dtype=np.int64) // self.period
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        seg_keys = keys[starts]
+        if len(starts) == len(keys):
+            # 입력 행마다 구간이 다르면 (성긴 간격 입력) 묶을 필요가 없다
+            seg_min = mins.astype(np.float64)
+            seg_max = maxs.astype(np.float64)
+            seg_sum = means * np.asarray(counts, dtype=np.float64)[:, None, None]
+            seg_n = np.asarray(counts)
+        else:
+            seg_min = np.minimum.reduceat(mins, starts, axis=0).astype(np.float64)
+            seg_max = np.maximum.reduceat(maxs, starts, axis=0).astype(np.float64)
+            seg_sum = np.add.reduceat(means * counts[:, None, None], starts, axis=0, dtype=np.float64)
+            seg_n = np.add.reduceat(counts, starts)
+
+        if self._key is not None:
+            if seg_keys[0] == self._key:
+                seg_min[0] = np.minimum(seg_min[0], self._min)
+                seg_max[0] = np.maximum(seg_max[0], self._max)
+                seg_sum[0] += self._sum
+                seg_n[0] += self._n
+            else:
+                seg_keys = np.r_[self._key, seg_keys]
+                seg_min = np.concatenate([self._min[None], seg_min])
+                seg_max = np.concatenate([self._max[None], seg_max])
+                seg_sum = np.concatenate([self._sum[None], seg_sum])
+                seg_n = np.r_[self._n, seg_n]
+
+        # 마지막 구간은 아직 진행 중이므로 누적값으로 남긴다
+        self._key, self._min, self._max, self._sum, self._n = (
+            seg_keys[-1], seg_min[-1], seg_max[-1], seg_sum[-1], int(seg_n[-1]))
+        done = (seg_keys[:-1] * self.period, seg_min[:-1], seg_max[:-1],
+                seg_sum[:-1] / seg_n[:-1, None, None], seg_n[:-1])
+        self._write(*done)
+        return done
+
+    def _write(self, times, mins, maxs, means, counts):
+        k = len(times)
+        if k == 0:
+            return
+        if k > self.capacity:
+            times, mins, maxs, means, counts = (a[-self.capacity:] for a in (times, mins, maxs, means, counts))
+            self.written += k - self.capacity
+            k = self.capacity
+        slots = (self.written + np.arange(k)) % self.capacity
+        self.times[slots] = times
+        self.mins[slots] = mins
+        self.maxs[slots] = maxs
+        self.means[slots] = means
+        self.counts[slots] = counts
+        self.written += k
+
+    def read(self, asset, start, end):
+        """한 설비의 [start, end) 구간 행을 (시각, 최솟값, 최댓값, 평균)으로 반환
+
+        마지막 행은 진행 중인 구간이며, 하위 계층에서 이미 완료된 구간까지만 반영되어 있다.
+        """
+        slots = _ring_order(self.written, self.capacity)
+        times, mins, maxs, means = self.times[slots], self.mins[slots, asset], self.maxs[slots, asset], self.means[slots, asset]
+        if self._key is not None:
+            times = np.r_[times, self._key * self.period]
+            mins = np.concatenate([mins, self._min[None, asset]])
+            maxs = np.concatenate([maxs, self._max[None, asset]])
+            means = np.concatenate([means, (self._sum[asset] / self._n)[None]])
+        mask = (times >= start // self.period * self.period) & (times < end)
+        return times[mask], mins[mask], maxs[mask], means[mask]
+
+class SensorHistoryStore:
+    """설비 × 센서 시계열을 미리 할당한 링 버퍼에 다중 해상도로 보관하는 저장소
+
+    원본 표본은 최근 raw_capacity개만 보관하고, 1분/1시간 계층은 최솟값·최댓값·평균만
+    보관하므로 메모리 사용량은 설비 수에 비례하는 고정 크기로 제한된다.
+    """
+
+    def __init__(self, num_assets, sensors, raw_capacity=DEFAULT_RAW_CAPACITY, tiers=DEFAULT_TIERS):
+        self.sensors = list(sensors)
+        self.shape = (num_assets, len(self.sensors))
+        self.raw_capacity = raw_capacity
+        self.raw_times = np.full(raw_capacity, -1, dtype=np.int64)
+        self.raw_values = np.full((raw_capacity,) + self.shape, np.nan, dtype=np.float32)
+        self.raw_written = 0
+        self.tiers = [RingTier(name, period, capacity, self.shape) for name, period, capacity in tiers]
+
+    @property
+    def num_assets(self):
+        return self.shape[0]
+
+    @property
+    def nbytes(self):
+        return int(self.raw_times.nbytes + self.raw_values.nbytes + sum(t.nbytes for t in self.tiers))
+
+    @property
+    def last_time(self):
+        if self.raw_written == 0:
+            return None
+        return int(self.raw_times[(self.raw_written - 1) % self.raw_capacity])
+
+    def latest(self):
+        """가장 최근 표본 (설비 × 센서)"""
+        return self.raw_values[(self.raw_written - 1) % self.raw_capacity]
+
+    def extend(self, times, values):
+        """시간순 표본 블록(times: epoch 초, values: 시점 × 설비 × 센서)을 모든 계층에 반영"""
+        times = np.asarray(times, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float32)
+        if len(times) == 0:
+            return self
+        recent = slice(max(0, len(times) - self.raw_capacity), len(times))
+        skipped = recent.start
+        slots = (self.raw_written + skipped + np.arange(len(times) - skipped)) % self.raw_capacity
+        self.raw_times[slots] = times[recent]
+        self.raw_values[slots] = values[recent]
+        self.raw_written += len(times)
+
+        rows = (times, values, values, values, np.ones(len(times), dtype=np.int64))
+        for tier in self.tiers:
+            rows = tier.ingest(*rows)
+            if len(rows[0]) == 0:
+                break
+        return self
+
+    def append(self, timestamp, values):
+        """한 시점의 표본(설비 × 센서)을 추가"""
+        return self.extend([timestamp], np.asarray(values)[None])
+
+    def tier(self, name):
+        """이름으로 집계 계층을 반환 (RingTier.read에 slice(None)을 주면 전체 설비를 한 번에 읽음)"""
+        return next(t for t in self.tiers if t.name == name)
+
+    def _raw_oldest(self):
+        if self.raw_written == 0:
+            return None
+        return int(self.raw_times[_ring_order(self.raw_written, self.raw_capacity)[0]])
+
+    def select_tier(self, start, end, max_points=MAX_POINTS):
+        """구간을 덮으면서 시점 수가 max_points 이하인 가장 세밀한 계층 이름을 반환 ('raw' 포함)"""
+        candidates = [('raw', 1, self._raw_oldest())] + [(t.name, t.period, t.oldest_time()) for t in self.tiers]
+        for name, period, oldest in candidates:
+            if oldest is not None and oldest <= start and (end - start) / period <= max_points:
+                return name
+        # 어느 계층도 구간 전체를 덮지 못하면 시점 수 조건만 만족하는 가장 세밀한 계층
+        for name, period, _ in candidates:
+            if (end - start) / period <= max_points:
+                return name
+        return candidates[-1][0]
+
+    def read(self, asset, start, end, tier=None, max_points=MAX_POINTS):
+        """한 설비의 [start, end) 구간 시계열을 (계층 이름, 긴 형식 DataFrame)으로 반환
+
+        DataFrame 열은 time, sensor, mean, min, max 이며 원본 계층은 min = max = mean 이다.
+        """
+        tier = tier or self.select_tier(start, end, max_points)
+        if tier == 'raw':
+            slots = _ring_order(self.raw_written, self.raw_capacity)
+            times, values = self.raw_times[slots], self.raw_values[slots, asset]
+            mask = (times >= start) & (times < end)
+            times, mins = times[mask], values[mask]
+            maxs = means = mins
+        else:
+            times, mins, maxs, means = self.tier(tier).read(asset, start, end)
+
+        num_sensors = len(self.sensors)
+        return tier, pd.DataFrame({
+            'time': np.repeat(pd.to_datetime(times, unit='s'), num_sensors),
+            'sensor': np.tile(self.sensors, len(times)),
+            'mean': means.ravel(),
+            'min': mins.ravel(),
+            'max': maxs.ravel()
+        })
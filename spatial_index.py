@@ -0,0 +1,69 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+EARTH_RADIUS = 6371008.8  # 지구 평균 반지름 (미터)
+
+def haversine_distance(lat1, lon1, lat2, lon2):
+    """두 위경도 지점 사이의 대원 거리(미터)를 계산하는 함수 (벡터화)"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2 +
+         np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+def to_unit_vectors(lat, lon):
+    """위경도를 단위 구 위의 3차원 좌표로 변환하는 함수"""
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+def arc_to_chord(distance):
+    """대원 거리(미터)를 단위 구 위의 현 길이로 변환"""
+    return 2 * np.sin(np.minimum(np.asarray(distance) / EARTH_RADIUS, np.pi) / 2)
+
+def chord_to_arc(chord):
+    """단위 구 위의 현 길이를 대원 거리(미터)로 변환"""
+    return 2 * EARTH_RADIUS * np.arcsin(np.clip(np.asarray(chord) / 2, 0, 1))
+
+class SpatialIndex:
+    """위경도 지점에 대한 KD-트리 공간 인덱스
+
+    지점을 단위 구 위의 3차원 좌표로 저장한다. 현 길이는 대원 거리에 대해 단조
+    증가하므로, 반경 및 최근접 질의 결과가 하버사인 거리 기준과 정확히 일치한다.
+    """
+
+    def __init__(self, lat, lon, leafsize=16):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.tree = cKDTree(to_unit_vectors(self.lat, self.lon), leafsize=leafsize)
+
+    def __len__(self):
+        return len(self.lat)
+
+    def query_radius(self, lat, lon, radius):
+        """각 질의 지점에서 radius 미터 이내에 있는 지점 인덱스 목록을 반환"""
+        points = to_unit_vectors(np.atleast_1d(lat), np.atleast_1d(lon))
+        return self.tree.query_ball_point(points, arc_to_chord(radius), workers=-1)
+
+    def query_radius_pairs(self, lat, lon, radius):
+        """반경 질의 결과를 (질의 인덱스, 지점 인덱스, 거리) 배열로 반환
+
+        모든 질의 지점을 한 번에 처리하며, 거리는 미터 단위 대원 거리이다.
+        """
+        lat = np.atleast_1d(np.asarray(lat, dtype=np.float64))
+        lon = np.atleast_1d(np.asarray(lon, dtype=np.float64))
+        matches = self.query_radius(lat, lon, radius)
+        lengths = np.fromiter((len(m) for m in matches), dtype=np.int64, count=len(matches))
+        query_idx = np.repeat(np.arange(len(matches)), lengths)
+        if lengths.sum():
+            point_idx = np.concatenate([np.asarray(m, dtype=np.int64) for m in matches])
+        else:
+            point_idx = np.empty(0, dtype=np.int64)
+        distance = haversine_distance(lat[query_idx], lon[query_idx], self.lat[point_idx], self.lon[point_idx])
+        return query_idx, point_idx, distance
+
+    def query_knn(self, lat, lon, k=1):
+        """각 질의 지점에서 가장 가까운 k개 지점의 거리(미터)와 인덱스를 반환"""
+        points = to_unit_vectors(np.atleast_1d(lat), np.atleast_1d(lon))
+        chord, idx = self.tree.query(points, k=min(k, len(self)), workers=-1)
+        return chord_to_arc(chord), idx
@@ -0,0 +1,63 @@
+import numpy as np
+from scipy import sparse
+from scipy.spatial import cKDTree
+
+DEFAULT_NEIGHBORS = 8  # 격자 셀마다 사용할 가장 가까운 센서 수
+DEFAULT_POWER = 2.0  # 역거리 가중 지수
+
+class IDWInterpolator:
+    """고정된 센서 배치에서 격자로의 역거리 가중(IDW) 보간 가중치를 미리 계산해 두는 보간기
+
+    격자 셀마다 가장 가까운 neighbors개 센서와 가중치를 KD 트리로 한 번만 구해
+    (셀 수 × 센서 수) 희소 행렬로 보관한다. 측정 주기마다의 보간은 희소 행렬-벡터 곱 한 번이다.
+    """
+
+    def __init__(self, sensor_x, sensor_y, grid_x, grid_y, neighbors=DEFAULT_NEIGHBORS, power=DEFAULT_POWER):
+        self.sensor_x = np.asarray(sensor_x, dtype=np.float64)
+        self.sensor_y = np.asarray(sensor_y, dtype=np.float64)
+        self.grid_x = np.asarray(grid_x, dtype=np.float64)
+        self.grid_y = np.asarray(grid_y, dtype=np.float64)
+        num_sensors = len(self.sensor_x)
+        k = min(neighbors, num_sensors)
+
+        # 격자 셀 중심 좌표 (행은 y, 열은 x)
+        cell_x, cell_y = np.meshgrid(self.grid_x, self.grid_y)
+        tree = cKDTree(np.column_stack([self.sensor_x, self.sensor_y]))
+        distance, index = tree.query(np.column_stack([cell_x.ravel(), cell_y.ravel()]), k=k)
+        distance, index = distance.reshape(-1, k), index.reshape(-1, k)
+
+        # 센서와 위치가 같은 셀은 그 센서값을 그대로 사용
+        with np.errstate(divide='ignore'):
+            weights = distance ** -power
+        exact = distance[:, 0] == 0
+        weights[exact] = 0
+        weights[exact, 0] = 1
+        weights /= weights.sum(axis=1, keepdims=True)
+
+        num_cells = len(distance)
+        self.weights = sparse.csr_matrix(
+            (weights.ravel().astype(np.float32), index.ravel(), np.arange(0, num_cells * k + 1, k)),
+            shape=(num_cells, num_sensors))
+
+    @property
+    def shape(self):
+        return (len(self.grid_y), len(self.grid_x))
+
+    @property
+    def nbytes(self):
+        return int(self.weights.data.nbytes + self.weights.indices.nbytes + self.weights.indptr.nbytes)
+
+    def interpolate(self, values):
+        """센서값(센서 수,) 또는 (센서 수, 변수 수)를 격자 배열 (y, x[, 변수])로 보간
+
+        NaN인 센서는 제외하고 나머지 이웃 가중치로 다시 정규화한다 (행렬-벡터 곱 두 번).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        missing = np.isnan(values)
+        if missing.any():
+            valid = (~missing).astype(np.float64)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result = (self.weights @ np.where(missing, 0, values)) / (self.weights @ valid)
+        else:
+            result = self.weights @ values
+        return result.reshape(self.shape + values.shape[1:])
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+def group_moments(values, pairs):
+    """표본 묶음((n,) + shape + (변수 수,))의 (표본 수, 평균, 편차 제곱합, 변수 쌍별 교차 편차곱 합)을 계산하는 함수"""
+    group_mean = values.mean(axis=0)
+    centered = values - group_mean
+    if values.ndim == 2:
+        # 위치 축이 없으면 편차 곱의 합 전체를 행렬 곱 한 번으로 계산
+        gram = centered.T @ centered
+        return len(values), group_mean, np.diagonal(gram).copy(), gram[pairs]
+    i, j = pairs
+    return len(values), group_mean, (centered ** 2).sum(axis=0), (centered[..., i] * centered[..., j]).sum(axis=0)
+
+class StreamingMoments:
+    """여러 변수의 평균, 분산, 공분산을 표본이 들어올 때마다 갱신하는 스트리밍 통계
+
+    shape 모양의 위치(예: 격자 셀)마다 num_vars개 변수의 모멘트를 보관한다. 갱신은
+    Welford 방식이며, halflife(갱신 횟수)를 주면 이전 모멘트에 감쇠 가중치를 곱해
+    최근 구간의 지수 가중 통계(EWMA)가 되고, None이면 전체 누적 통계가 된다.
+    공분산은 변수 쌍(i < j)별로만 보관한다.
+    """
+
+    def __init__(self, shape, num_vars, halflife=None, dtype=np.float64):
+        self.shape = tuple(shape)
+        self.num_vars = num_vars
+        self.halflife = halflife
+        self.decay = 1.0 if halflife is None else 0.5 ** (1 / halflife)
+        self.pairs = np.triu_indices(num_vars, k=1)
+        self.weight = 0.0  # 유효 표본 수 (감쇠 가중치의 합)
+        self.mean = np.zeros(self.shape + (num_vars,), dtype=dtype)
+        self.m2 = np.zeros(self.shape + (num_vars,), dtype=dtype)
+        self.co = np.zeros(self.shape + (len(self.pairs[0]),), dtype=dtype)
+        self.updates = 0
+
+    @property
+    def nbytes(self):
+        return int(self.mean.nbytes + self.m2.nbytes + self.co.nbytes)
+
+    def update(self, values):
+        """위치마다 표본 하나(shape + (num_vars,))를 반영 (표본 하나의 편차 제곱합은 0)"""
+        return self.merge(1, np.asarray(values, dtype=self.mean.dtype), 0, 0)
+
+    def update_group(self, values):
+        """같은 시점의 표본 묶음((n,) + shape + (num_vars,))을 한 번에 반영"""
+        values = np.asarray(values, dtype=self.mean.dtype)
+        if len(values) == 0:
+            return self
+        return self.merge(*group_moments(values, self.pairs))
+
+    def merge(self, n, group_mean, group_m2, group_co):
+        """group_moments로 미리 계산한 묶음 모멘트를 병합 (Chan의 병합 공식, 이전 모멘트는 감쇠)
+
+        같은 묶음을 감쇠 구간이 다른 여러 통계에 반영할 때 묶음 모멘트를 한 번만 계산하면 된다.
+        """
+        i, j = self.pairs
+        previous = self.weight * self.decay
+        total = previous + n
+        delta = group_mean - self.mean
+        self.mean += delta * (n / total)
+        scale = previous * n / total
+        self.m2 *= self.decay
+        self.m2 += group_m2 + delta ** 2 * scale
+        self.co *= self.decay
+        self.co += group_co + delta[..., i] * delta[..., j] * scale
+        self.weight = total
+        self.updates += 1
+        return self
+
+    def variance(self):
+        """위치별 변수 분산 (가중 모분산)"""
+        if self.weight == 0:
+            return np.full_like(self.m2, np.nan)
+        return self.m2 / self.weight
+
+    def std(self):
+        return np.sqrt(self.variance())
+
+    def covariance(self):
+        """위치별 공분산 행렬 (shape + (num_vars, num_vars))"""
+        cov = np.zeros(self.shape + (self.num_vars, self.num_vars), dtype=self.mean.dtype)
+        if self.weight == 0:
+            return cov * np.nan
+        i, j = self.pairs
+        diagonal = np.arange(self.num_vars)
+        cov[..., diagonal, diagonal] = self.m2 / self.weight
+        cov[..., i, j] = cov[..., j, i] = self.co / self.weight
+        return cov
+
+    def correlation(self):
+        """위치별 피어슨 상관계수 행렬"""
+        cov = self.covariance()
+        std = np.sqrt(np.diagonal(cov, axis1=-2, axis2=-1))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return cov / (std[..., :, None] * std[..., None, :])
+
+    def summary(self, names):
+        """shape이 ()인 전체 통계를 유효 표본 수, 평균, 표준편차 표로 반환"""
+        return pd.DataFrame({'count': np.full(self.num_vars, self.weight), 'mean': self.mean,
+                             'std': self.std()}, index=names).T
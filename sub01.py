@@ -1,45 +1,165 @@
 import streamlit as st
 import folium
-from streamlit_folium import folium_static
+from folium.plugins import FastMarkerCluster
+from streamlit_folium import folium_static, st_folium
 import pandas as pd
-import random
-
-def generate_safety_data(num_points=20):
-    """가상의 안전 데이터를 생성하는 함수"""
-    data = []
-    for _ in range(num_points):
-        lat = random.uniform(35.5, 35.7)  # 대한민국 중부 위도 범위
-        lon = random.uniform(128.5, 128.7)  # 대한민국 동부 경도 범위
-        safety_level = random.choice(['안전', '주의', '위험'])
-        data.append({'lat': lat, 'lon': lon, 'safety_level': safety_level})
-    return pd.DataFrame(data)
-
-def get_color(safety_level):
-    """안전 수준에 따른 색상 반환"""
-    if safety_level == '안전':
-        return 'green'
-    elif safety_level == '주의':
-        return 'orange'
-    else:
-        return 'red'
+import numpy as np
+from data_cache import cached_data
+from realtime_feed import SafetySensorFeed
+
+SAFETY_LEVELS = ['안전', '주의', '위험']
+LEVEL_COLORS = ['green', 'orange', 'red']
+BULK_THRESHOLD = 1000  # 이 개수를 넘으면 대량 렌더링 모드 사용
+REALTIME_REFRESH_SECONDS = 2  # 실시간 모드 갱신 주기 (초)
+REBASE_LIMIT = 500  # 변경 오버레이가 이 개수를 넘으면 기본 지도를 다시 그림
+SAFETY_DATA_SEED = 0  # 센서 배치와 초기 안전 수준 생성 시드
+
+@cached_data()
+def generate_safety_data(num_points=20, seed=None):
+    """가상의 안전 데이터를 생성하는 함수 (NumPy 벡터화)"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'lat': rng.uniform(35.5, 35.7, num_points),  # 대한민국 중부 위도 범위
+        'lon': rng.uniform(128.5, 128.7, num_points),  # 대한민국 동부 경도 범위
+        'safety_level': pd.Categorical.from_codes(rng.integers(0, len(SAFETY_LEVELS), num_points),
+                                                  categories=SAFETY_LEVELS)
+    })
+
+def create_safety_map(df, bulk=None):
+    """안전 지도를 생성하는 함수
 
-def create_safety_map(df):
-    """안전 지도를 생성하는 함수"""
+    bulk가 None이면 지점 수에 따라 개별 마커와 대량 렌더링 중 하나를 자동 선택한다.
+    개별 마커는 BULK_THRESHOLD 이하에서만 그리며, 그보다 많으면 항상 대량 렌더링을 사용한다.
+    """
     m = folium.Map(location=[df['lat'].mean(), df['lon'].mean()], zoom_start=10)
 
-    for _, row in df.iterrows():
+    if uses_bulk_rendering(len(df), bulk):
+        add_bulk_safety_layer(m, df)
+        return m
+
+    codes = pd.Categorical(df['safety_level'], categories=SAFETY_LEVELS).codes
+    for lat, lon, code in zip(df['lat'].tolist(), df['lon'].tolist(), codes.tolist()):
         folium.CircleMarker(
-            location=[row['lat'], row['lon']],
+            location=[lat, lon],
             radius=10,
-            popup=row['safety_level'],
-            color=get_color(row['safety_level']),
+            popup=SAFETY_LEVELS[code],
+            color=LEVEL_COLORS[code],
             fill=True,
-            fillColor=get_color(row['safety_level']),
+            fillColor=LEVEL_COLORS[code],
             fillOpacity=0.7
         ).add_to(m)
 
     return m
 
+def uses_bulk_rendering(num_points, bulk=None):
+    """선택한 렌더링 방식과 지점 수로 대량 렌더링 사용 여부를 정하는 함수"""
+    return bool(bulk) or num_points > BULK_THRESHOLD
+
+def add_bulk_safety_layer(m, df):
+    """열 배열로부터 단일 FastMarkerCluster 레이어를 만들어 지도에 추가하는 함수"""
+    lat = df['lat'].to_numpy()
+    lon = df['lon'].to_numpy()
+    codes = pd.Categorical(df['safety_level'], categories=SAFETY_LEVELS).codes
+    # 좌표 검증을 배열 단위로 수행 (folium의 행 단위 검증 대신)
+    valid = np.isfinite(lat) & np.isfinite(lon) & (codes >= 0)
+    data = np.column_stack([
+        np.round(lat[valid], 5),
+        np.round(lon[valid], 5),
+        codes[valid]
+    ]).tolist()
+    callback = """
+    function (row) {
+        var levels = %s;
+        var colors = %s;
+        var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+            radius: 6, color: colors[row[2]], fill: true,
+            fillColor: colors[row[2]], fillOpacity: 0.7
+        });
+        marker.bindPopup(levels[row[2]]);
+        return marker;
+    }
+    """ % (SAFETY_LEVELS, LEVEL_COLORS)
+    FastMarkerCluster(data, callback=callback, options={'chunkedLoading': True}).add_to(m)
+    return m
+
+@st.cache_resource(show_spinner=False)
+def get_safety_feed(num_points):
+    """세션 간에 공유되는 실시간 센서 피드를 반환하는 함수"""
+    df = generate_safety_data(num_points, SAFETY_DATA_SEED)
+    return SafetySensorFeed(df['lat'].to_numpy(), df['lon'].to_numpy(), df['safety_level'].cat.codes.to_numpy(),
+                            num_levels=len(SAFETY_LEVELS), tick_seconds=REALTIME_REFRESH_SECONDS)
+
+def levels_to_frame(feed, levels):
+    """피드의 좌표와 안전 수준 코드 배열로 DataFrame을 만드는 함수"""
+    return pd.DataFrame({
+        'lat': feed.lat,
+        'lon': feed.lon,
+        'safety_level': pd.Categorical.from_codes(levels, categories=SAFETY_LEVELS)
+    })
+
+def rebase_realtime_view(feed, num_points, bulk):
+    """현재 상태로 기본 지도를 다시 만들고 변경 오버레이를 비우는 함수"""
+    seq, levels, _ = feed.snapshot()
+    return {
+        'num_points': num_points,
+        'bulk': bulk,
+        'seq': seq,
+        'base_map': create_safety_map(levels_to_frame(feed, levels), bulk=bulk),
+        'overlay': {}
+    }
+
+def create_change_layer(feed, overlay):
+    """기본 지도 이후 수준이 바뀐 센서만 담은 레이어를 생성하는 함수"""
+    layer = folium.FeatureGroup(name="변경된 센서")
+    for sensor, level in overlay.items():
+        folium.CircleMarker(
+            location=[feed.lat[sensor], feed.lon[sensor]],
+            radius=10,
+            popup=SAFETY_LEVELS[level],
+            color=LEVEL_COLORS[level],
+            weight=3,
+            fill=True,
+            fillColor=LEVEL_COLORS[level],
+            fillOpacity=0.9
+        ).add_to(layer)
+    return layer
+
+def show_safety_summary(counts):
+    """안전 수준별 지역 수를 표시하는 함수"""
+    st.subheader("안전 현황 요약")
+    for level in SAFETY_LEVELS:
+        st.write(f"{level}: {counts.get(level, 0)}개 지역")
+
+@st.fragment(run_every=REALTIME_REFRESH_SECONDS)
+def show_realtime_updates(num_points, bulk):
+    """링 버퍼의 변경분만 지도에 반영하는 자동 갱신 영역"""
+    feed = get_safety_feed(num_points)
+    feed.advance()
+
+    view = st.session_state.get('realtime_safety_view')
+    num_changed = 0
+    if view is None or view['num_points'] != num_points or view['bulk'] != bulk:
+        view = rebase_realtime_view(feed, num_points, bulk)
+    else:
+        delta = feed.changed_since(view['seq'])
+        if delta is None:
+            # 변경 이력이 링 버퍼에서 밀려났으면 전체를 다시 그림
+            view = rebase_realtime_view(feed, num_points, bulk)
+        else:
+            view['seq'], sensors, levels = delta
+            view['overlay'].update(zip(sensors.tolist(), levels.tolist()))
+            num_changed = len(sensors)
+            if len(view['overlay']) > REBASE_LIMIT:
+                view = rebase_realtime_view(feed, num_points, bulk)
+    st.session_state['realtime_safety_view'] = view
+
+    st_folium(view['base_map'], key='realtime_safety_map', feature_group_to_add=create_change_layer(feed, view['overlay']),
+              returned_objects=[], width=700, height=500)
+    st.caption(f"틱 {feed.tick} · 이번 갱신에서 변경된 센서 {num_changed}개 · 누적 변경 표시 {len(view['overlay'])}개")
+
+    counts = feed.current_counts()
+    show_safety_summary(dict(zip(SAFETY_LEVELS, counts.tolist())))
+
 def show_realtime_safety_map():
     st.subheader("실시간 안전 지도")
 
@@ -53,21 +173,35 @@ def show_realtime_safety_map():
     with col3:
         st.color_picker("위험", "#FF0000", disabled=True)
 
+    # 센서 수 및 렌더링 방식 선택
+    col1, col2 = st.columns(2)
+    with col1:
+        num_points = st.select_slider("센서 수", options=[20, 1000, 10000, 100000, 1000000], value=20)
+    with col2:
+        render_mode = st.radio("렌더링 방식", ["자동", "개별 마커", "대량 렌더링"], horizontal=True)
+    bulk = {"자동": None, "개별 마커": False, "대량 렌더링": True}[render_mode]
+    if bulk is False and uses_bulk_rendering(num_points):
+        st.info(f"개별 마커는 센서 {BULK_THRESHOLD:,}개 이하에서만 지원되어 대량 렌더링으로 표시합니다.")
+
+    # 실시간 모드: 변경된 센서만 주기적으로 갱신
+    if st.toggle("실시간 갱신 모드"):
+        show_realtime_updates(num_points, bulk)
+        if st.checkbox("원본 데이터 보기"):
+            feed = get_safety_feed(num_points)
+            st.write(levels_to_frame(feed, feed.snapshot()[1]))
+        return
+
     # 가상의 안전 데이터 생성
-    df = generate_safety_data()
+    df = generate_safety_data(num_points, SAFETY_DATA_SEED)
 
     # 지도 생성
-    m = create_safety_map(df)
+    m = create_safety_map(df, bulk=bulk)
 
     # Streamlit에 지도 표시
     folium_static(m)
 
     # 통계 정보 표시
-    st.subheader("안전 현황 요약")
-    safety_counts = df['safety_level'].value_counts()
-    st.write(f"안전: {safety_counts.get('안전', 0)}개 지역")
-    st.write(f"주의: {safety_counts.get('주의', 0)}개 지역")
-    st.write(f"위험: {safety_counts.get('위험', 0)}개 지역")
+    show_safety_summary(df['safety_level'].value_counts())
 
     # 데이터 테이블 표시 (옵션)
     if st.checkbox("원본 데이터 보기"):
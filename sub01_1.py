@@ -1,51 +1,125 @@
 import streamlit as st
 import pydeck as pdk
 import pandas as pd
-import random
-
-def generate_safety_data(num_points=20):
-    """가상의 안전 데이터를 생성하는 함수"""
-    data = []
-    for _ in range(num_points):
-        lat = random.uniform(35.5, 35.7)  # 대한민국 중부 위도 범위
-        lon = random.uniform(128.5, 128.7)  # 대한민국 동부 경도 범위
-        safety_level = random.choice(['안전', '주의', '위험'])
-        data.append({'lat': lat, 'lon': lon, 'safety_level': safety_level})
-    return pd.DataFrame(data)
-
-def get_color(safety_level):
-    """안전 수준에 따른 색상 반환"""
-    if safety_level == '안전':
-        return [0, 255, 0, 160]
-    elif safety_level == '주의':
-        return [255, 165, 0, 160]
-    else:
-        return [255, 0, 0, 160]
+import numpy as np
+from data_cache import cached_data
+from sub01 import SAFETY_DATA_SEED, SAFETY_LEVELS, generate_safety_data
+
+LEVEL_COLORS = np.array([[0, 255, 0, 160], [255, 165, 0, 160], [255, 0, 0, 160]], dtype=np.uint8)
+GRID_ZOOM_LEVELS = (8, 10, 12, 14)  # 사전 집계하는 확대 수준
+CELL_PIXELS = 32  # 화면상 격자 셀 한 변의 크기 (픽셀)
+POINT_LAYER_MAX = 5000  # 이 개수 이하이면 개별 지점을 그대로 표시
+METERS_PER_DEGREE = 111320.0
+
+def get_colors(codes):
+    """안전 수준 코드 배열을 색상 목록으로 변환 (벡터화)"""
+    return LEVEL_COLORS[codes].tolist()
+
+def meters_per_pixel(zoom, latitude):
+    """웹 메르카토르 확대 수준에서 픽셀당 미터 수를 반환"""
+    return 156543.03392 * np.cos(np.radians(latitude)) / 2 ** zoom
+
+def aggregate_safety_grid(df, cell_size, ref_lat, ref_lon):
+    """지점을 정사각 격자 셀로 집계하는 함수
+
+    셀마다 안전 수준별 개수와 가장 나쁜 수준을 계산한다. cell_size는 미터 단위이며,
+    lon/lat은 GridCellLayer가 사용하는 셀의 남서쪽 모서리 좌표이다.
+    """
+    m_per_deg_lon = METERS_PER_DEGREE * np.cos(np.radians(ref_lat))
+    ix = np.floor((df['lon'].to_numpy() - ref_lon) * m_per_deg_lon / cell_size).astype(np.int64)
+    iy = np.floor((df['lat'].to_numpy() - ref_lat) * METERS_PER_DEGREE / cell_size).astype(np.int64)
+    codes = pd.Categorical(df['safety_level'], categories=SAFETY_LEVELS).codes.astype(np.int64)
+
+    ix_min, iy_min = ix.min(), iy.min()
+    ny = iy.max() - iy_min + 1
+    cell_keys, inverse = np.unique((ix - ix_min) * ny + (iy - iy_min), return_inverse=True)
+    counts = np.bincount(inverse * len(SAFETY_LEVELS) + codes,
+                         minlength=len(cell_keys) * len(SAFETY_LEVELS)).reshape(-1, len(SAFETY_LEVELS))
+    worst = len(SAFETY_LEVELS) - 1 - np.argmax(counts[:, ::-1] > 0, axis=1)
+
+    cell_ix = cell_keys // ny + ix_min
+    cell_iy = cell_keys % ny + iy_min
+    return pd.DataFrame({
+        'lon': ref_lon + cell_ix * cell_size / m_per_deg_lon,
+        'lat': ref_lat + cell_iy * cell_size / METERS_PER_DEGREE,
+        'safe': counts[:, 0],
+        'caution': counts[:, 1],
+        'danger': counts[:, 2],
+        'total': counts.sum(axis=1),
+        'worst_level': np.array(SAFETY_LEVELS)[worst],
+        'color': get_colors(worst)
+    })
+
+@cached_data()
+def build_safety_grid_pyramid(num_points=20, zoom_levels=GRID_ZOOM_LEVELS):
+    """확대 수준별로 사전 집계한 격자 레이어 데이터를 생성하는 함수"""
+    df = generate_safety_data(num_points, SAFETY_DATA_SEED)
+    ref_lat, ref_lon = df['lat'].min(), df['lon'].min()
+    pyramid = {}
+    for zoom in zoom_levels:
+        cell_size = CELL_PIXELS * meters_per_pixel(zoom, df['lat'].mean())
+        pyramid[zoom] = (cell_size, aggregate_safety_grid(df, cell_size, ref_lat, ref_lon))
+    return pyramid
+
+def select_grid_level(zoom, zoom_levels=GRID_ZOOM_LEVELS):
+    """현재 확대 수준에 맞는 사전 집계 수준을 선택"""
+    candidates = [z for z in zoom_levels if z <= zoom]
+    return max(candidates) if candidates else min(zoom_levels)
 
 def show_realtime_safety_map():
     st.subheader("실시간 안전 지도")
 
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        num_points = st.select_slider("센서 수", options=[20, 1000, 10000, 100000, 1000000], value=20)
+    with col2:
+        zoom = st.slider("지도 확대 수준", 6, 16, 10,
+                         help="지도의 초기 확대 수준과 격자 집계 수준을 정합니다. "
+                              "지도를 마우스로 확대/축소해도 격자 집계 수준은 바뀌지 않습니다.")
+    with col3:
+        display_mode = st.radio("표시 방식", ["자동", "개별 지점", "격자 집계"], horizontal=True)
+
     # 가상의 안전 데이터 생성
-    df = generate_safety_data()
-    
-    # 색상 데이터 추가
-    df['color'] = df['safety_level'].apply(get_color)
-
-    # pydeck 레이어 생성
-    layer = pdk.Layer(
-        "ScatterplotLayer",
-        df,
-        get_position=['lon', 'lat'],
-        get_color='color',
-        get_radius=300,
-        pickable=True
-    )
+    df = generate_safety_data(num_points, SAFETY_DATA_SEED)
+
+    use_grid = display_mode == "격자 집계" or (display_mode == "자동" and len(df) > POINT_LAYER_MAX)
+    if use_grid:
+        # 서버에서 사전 집계한 격자 중 슬라이더의 확대 수준에 맞는 레이어만 전송
+        # (st.pydeck_chart는 사용자가 조작한 지도 뷰 상태를 돌려주지 않으므로 슬라이더 값을 기준으로 함)
+        grid_zoom = select_grid_level(zoom)
+        cell_size, cells = build_safety_grid_pyramid(num_points)[grid_zoom]
+        layer = pdk.Layer(
+            "GridCellLayer",
+            cells,
+            get_position=['lon', 'lat'],
+            get_fill_color='color',
+            cell_size=cell_size,
+            extruded=False,
+            pickable=True
+        )
+        tooltip = {"text": "{worst_level}\n안전: {safe} / 주의: {caution} / 위험: {danger}"}
+        st.caption(f"격자 집계 수준: 확대 {grid_zoom} (셀 크기 {cell_size:,.0f} m, {len(cells):,}개 셀) · "
+                   "격자 수준은 '지도 확대 수준' 슬라이더로 정해지며 지도를 직접 확대/축소해도 바뀌지 않습니다.")
+    else:
+        # 색상 데이터 추가
+        df['color'] = get_colors(df['safety_level'].cat.codes.to_numpy())
+
+        # pydeck 레이어 생성
+        layer = pdk.Layer(
+            "ScatterplotLayer",
+            df,
+            get_position=['lon', 'lat'],
+            get_color='color',
+            get_radius=300,
+            pickable=True
+        )
+        tooltip = {"text": "{safety_level}"}
 
     # 뷰 상태 설정
     view_state = pdk.ViewState(
         latitude=df['lat'].mean(),
         longitude=df['lon'].mean(),
-        zoom=10,
+        zoom=zoom,
         pitch=0
     )
 
@@ -53,7 +127,7 @@ def show_realtime_safety_map():
     chart = pdk.Deck(
         layers=[layer],
         initial_view_state=view_state,
-        tooltip={"text": "{safety_level}"}
+        tooltip=tooltip
     )
 
     # Streamlit에 차트 표시
@@ -3,34 +3,120 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
+import zlib
 from datetime import datetime, timedelta
+from data_cache import cached_data
+from forecast_models import FittedModelStore, MovingAverageModel, MODEL_LABELS, KOREAN_FIXED_HOLIDAYS
+
+SITES = ['울산 미포 국가산단', '여수 국가산단', '시화 반월 국가산단', '구미 국가산단', '창원 국가산단']
+WEEKDAY_FACTORS = np.array([1.1, 1.0, 1.0, 1.0, 1.05, 0.6, 0.5])  # 월~일 사고 발생 배율
+SERIES_EPOCH = '1990-01-01'  # 사업장별 일별 난수열의 기준일
+
+@cached_data()
+def generate_accident_data(days=365, site=None, end_date=None):
+    """가상의 사고 데이터 생성
+
+    site가 주어지면 사업장별로 재현 가능한 발생률과 요일·공휴일 패턴을 갖는 데이터를 생성한다.
+    사업장별 난수열은 SERIES_EPOCH부터 이어지므로 end_date가 뒤로 밀려도 과거 날짜의 값은 그대로이다.
+    데이터 버전(attrs['version'])은 내용으로 정한다. 사업장 데이터는 생성 조건(사업장, 기간)이 같으면
+    같은 버전이라 학습된 모델이 새 날짜만 증분 반영하고, site가 없으면 사고 건수의 해시를 쓴다.
+    """
+    end_date = end_date or datetime.now().date()
+    dates = [end_date - timedelta(days=i) for i in range(days)]
+    if site is None:
+        accidents = np.random.poisson(lam=2, size=days)  # 평균 2건의 사고가 발생한다고 가정
+        version = zlib.crc32(accidents.astype(np.int64).tobytes())
+    else:
+        rng = np.random.default_rng(zlib.crc32(site.encode('utf-8')))
+        base_rate = rng.uniform(1, 3)
+        # 기준일부터 end_date까지 하루씩 순서대로 뽑아 날짜마다 항상 같은 값이 나오게 함
+        series = pd.date_range(SERIES_EPOCH, end_date, freq='D')
+        holiday = np.isin(series.month * 100 + series.day, [m * 100 + d for m, d in KOREAN_FIXED_HOLIDAYS])
+        lam = base_rate * WEEKDAY_FACTORS[series.dayofweek] * np.where(holiday, 0.5, 1.0)
+        accidents = rng.poisson(lam)[::-1][:days]
+        version = zlib.crc32(f'{site}|{days}'.encode('utf-8'))
+    df = pd.DataFrame({'date': dates, 'accidents': accidents})
+    df.attrs['version'] = version
+    return df
+
+@st.cache_resource(show_spinner=False)
+def get_model_store():
+    """세션 간에 공유되는 학습된 예측 모델 캐시를 반환"""
+    return FittedModelStore()
+
+def simulate_accident_paths(expected, num_paths=1000, rate_shape=None, seed=None):
+    """일별 기대 사고 건수로부터 포아송 사고 경로를 일괄 시뮬레이션하는 함수
+
+    rate_shape가 주어지면 경로마다 평균 1인 감마 배율을 곱해 발생률 추정의 불확실성을 반영한다.
+    반환값은 (num_paths, 예측 일수) 크기의 정수 배열이다.
+    """
+    rng = np.random.default_rng(seed)
+    expected = np.asarray(expected, dtype=np.float64)
+    if rate_shape is not None:
+        multiplier = rng.gamma(rate_shape, 1 / rate_shape, size=(num_paths, 1))
+        lam = multiplier * expected[None, :]
+    else:
+        lam = np.broadcast_to(expected, (num_paths, len(expected)))
+    return rng.poisson(lam).astype(np.int32)
+
+def summarize_paths(paths, threshold):
+    """시뮬레이션 경로의 일별 P10/P50/P90, 평균, 임계치 초과 확률을 계산하는 함수"""
+    p10, p50, p90 = np.percentile(paths, [10, 50, 90], axis=0)
+    return {
+        'p10': p10,
+        'p50': p50,
+        'p90': p90,
+        'mean': paths.mean(axis=0),
+        'exceed_prob': (paths > threshold).mean(axis=0)
+    }
+
+def predict_accidents(data, future_days=30, num_paths=1000, threshold=4, seed=None, model=None):
+    """발생률 모델 기반 몬테카를로 예측
+
+    model이 없으면 최근 7일 이동 평균 모델을 사용한다. 모델의 기대 사고 건수를 발생률로,
+    유효 관측 사고 건수를 불확실성으로 반영한다.
+    """
+    data = data.sort_values('date')
+    if model is None:
+        model = MovingAverageModel(window=7).update_many(data['date'], data['accidents'])
 
-def generate_accident_data(days=365):
-    """가상의 사고 데이터 생성"""
-    dates = [datetime.now().date() - timedelta(days=i) for i in range(days)]
-    accidents = np.random.poisson(lam=2, size=days)  # 평균 2건의 사고가 발생한다고 가정
-    return pd.DataFrame({'date': dates, 'accidents': accidents})
-
-def predict_accidents(data, future_days=30):
-    """간단한 예측 모델"""
-    # 이동 평균을 사용한 간단한 예측
-    window = 7
-    rolling_mean = data['accidents'].rolling(window=window).mean()
-    last_mean = rolling_mean.iloc[-1]
-    
     future_dates = [data['date'].iloc[-1] + timedelta(days=i+1) for i in range(future_days)]
-    future_accidents = [max(0, int(np.random.normal(last_mean, 1))) for _ in range(future_days)]
-    
-    return pd.DataFrame({'date': future_dates, 'predicted_accidents': future_accidents})
+    expected = model.forecast(future_dates)
+    paths = simulate_accident_paths(expected, num_paths, rate_shape=model.rate_shape(), seed=seed)
+    summary = summarize_paths(paths, threshold)
+
+    return pd.DataFrame({
+        'date': future_dates,
+        'predicted_accidents': summary['p50'],
+        'p10': summary['p10'],
+        'p90': summary['p90'],
+        'mean': summary['mean'],
+        'exceed_prob': summary['exceed_prob']
+    })
 
 def show_accident_prediction():
     st.subheader("사고 예측 시뮬레이션")
 
+    # 시뮬레이션 설정
+    col1, col2, col3 = st.columns(3)
+    future_days = col1.slider("예측 기간 (일)", 7, 365, 30)
+    num_paths = col2.select_slider("시뮬레이션 경로 수", options=[100, 1000, 5000, 10000], value=1000)
+    threshold = col3.number_input("경보 임계치 (일일 사고 건수)", min_value=0, value=4)
+
+    col1, col2 = st.columns(2)
+    site = col1.selectbox("사업장 선택", SITES)
+    model_name = col2.selectbox("예측 모델", list(MODEL_LABELS.keys()), format_func=MODEL_LABELS.get)
+
     # 과거 데이터 생성
-    data = generate_accident_data()
+    data = generate_accident_data(site=site)
+
+    # 사업장·데이터 버전별로 캐시된 모델을 사용 (새 날짜만 증분 반영)
+    model, fit_status = get_model_store().get(site, model_name, data, data.attrs.get('version'))
+    st.caption({'cached': "캐시된 모델 사용", 'updated': "추가된 날짜만 증분 학습",
+                'fitted': "모델 새로 학습"}[fit_status])
 
     # 미래 예측
-    future_data = predict_accidents(data)
+    future_data = predict_accidents(data, future_days, num_paths, threshold, model=model)
 
     # 데이터 시각화
     fig = go.Figure()
@@ -43,12 +129,31 @@ def show_accident_prediction():
         name='과거 사고 데이터'
     ))
 
+    # 예측 구간 (P10~P90)
+    fig.add_trace(go.Scatter(
+        x=future_data['date'],
+        y=future_data['p90'],
+        mode='lines',
+        line=dict(width=0),
+        name='P90',
+        showlegend=False
+    ))
+    fig.add_trace(go.Scatter(
+        x=future_data['date'],
+        y=future_data['p10'],
+        mode='lines',
+        line=dict(width=0),
+        fill='tonexty',
+        fillcolor='rgba(255, 127, 14, 0.2)',
+        name='예측 구간 (P10~P90)'
+    ))
+
     # 예측 데이터
     fig.add_trace(go.Scatter(
         x=future_data['date'], 
         y=future_data['predicted_accidents'],
         mode='lines+markers',
-        name='예측 사고 데이터',
+        name='예측 사고 데이터 (P50)',
         line=dict(dash='dash')
     ))
 
@@ -62,8 +167,15 @@ def show_accident_prediction():
     st.plotly_chart(fig, use_container_width=True)
 
     # 예측 결과 요약
-    avg_predicted = future_data['predicted_accidents'].mean()
-    st.write(f"향후 30일 동안 예상되는 일일 평균 사고 건수: {avg_predicted:.2f}")
+    avg_predicted = future_data['mean'].mean()
+    st.write(f"향후 {future_days}일 동안 예상되는 일일 평균 사고 건수: {avg_predicted:.2f}")
+
+    # 임계치 초과 확률
+    st.subheader("일별 임계치 초과 확률")
+    fig_exceed = go.Figure(go.Bar(x=future_data['date'], y=future_data['exceed_prob'] * 100))
+    fig_exceed.update_layout(xaxis_title='날짜', yaxis_title=f'{threshold}건 초과 확률 (%)',
+                             yaxis=dict(range=[0, 100]))
+    st.plotly_chart(fig_exceed, use_container_width=True)
 
     # 주의사항
     st.warning("이 예측은 가상의 데이터를 바탕으로 한 간단한 시뮬레이션입니다. 실제 상황에서는 더 복잡한 모델과 실제 데이터가 필요합니다.")
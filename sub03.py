@@ -1,42 +1,277 @@
+import threading
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
-
-def generate_safety_performance_data(num_days=30, num_departments=5):
-    """가상의 안전 성과 데이터를 생성하는 함수"""
-    departments = [f'부서 {i+1}' for i in range(num_departments)]
-    dates = [datetime.now().date() - timedelta(days=i) for i in range(num_days)]
-    
-    data = []
-    for dept in departments:
-        incident_rate = np.random.uniform(0, 5)
-        compliance_rate = np.random.uniform(80, 100)
-        for date in dates:
-            incidents = max(0, int(np.random.normal(incident_rate, 1)))
-            compliance = min(100, max(0, compliance_rate + np.random.normal(0, 2)))
-            data.append({
-                'Date': date,
-                'Department': dept,
-                'Incidents': incidents,
-                'Compliance_Rate': compliance,
-                'Training_Hours': np.random.randint(0, 8)
-            })
-    
-    return pd.DataFrame(data)
+from data_cache import cached_data
+from downsampling import downsample_rows
+
+ROLLUP_FREQS = {'일별': 'D', '주별': 'W', '월별': 'M'}
+POINTS_PER_TRACE = 200  # 라인 차트 트레이스당 최대 지점 수
+CHART_MAX_DEPARTMENTS = 10  # 추이 차트에 그릴 준수율 상위/하위 부서 수 (각각)
+
+ROLLUP_CHUNK_ROWS = 2_000_000  # 사전 집계 시 한 번에 생성하는 원본 행 수 상한
+RAW_PAGE_ROWS = 1000  # 원본 데이터 보기의 페이지당 행 수
+SERIES_EPOCH = '2000-01-01'  # 일자 번호 0의 날짜 (새 일자가 추가되어도 기존 일자의 값이 유지되는 기준)
+# splitmix64 상수 (카운터 기반 난수)
+GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+MIX2 = np.uint64(0x94D049BB133111EB)
+
+def mix64(z):
+    """splitmix64 마무리 함수로 uint64 배열의 비트를 섞는 함수"""
+    z = (z ^ (z >> np.uint64(30))) * MIX1
+    z = (z ^ (z >> np.uint64(27))) * MIX2
+    return z ^ (z >> np.uint64(31))
+
+def counter_uniform(seed, stream, departments, days):
+    """(seed, stream, 부서 번호, 일자 번호) 카운터로 [0, 1) 균등 난수를 만드는 함수
+
+    상태가 없는 카운터 기반 난수라서 부서 × 일자 배열을 브로드캐스팅으로 한 번에 만들어도
+    어떤 부서 묶음이나 기간으로 나눠 만들든 같은 (부서, 일자)의 값은 같다.
+    """
+    with np.errstate(over='ignore'):
+        key = mix64(np.uint64(seed) * GOLDEN + np.uint64(stream))
+        z = mix64(key ^ (np.asarray(departments, dtype=np.uint64) * GOLDEN))
+        z = mix64(z ^ (np.asarray(days, dtype=np.uint64) * MIX1))
+    return (z >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+def counter_normal(seed, stream, departments, days, loc=0.0, scale=1.0):
+    """Box-Muller 변환으로 카운터 기반 정규 난수를 만드는 함수 (stream과 stream + 1 사용)"""
+    u1 = counter_uniform(seed, stream, departments, days)
+    u2 = counter_uniform(seed, stream + 1, departments, days)
+    return loc + scale * np.sqrt(-2 * np.log1p(-u1)) * np.cos(2 * np.pi * u2)
+
+def day_number(date):
+    """SERIES_EPOCH부터의 일자 번호"""
+    return (pd.Timestamp(date).normalize() - pd.Timestamp(SERIES_EPOCH)).days
+
+def generate_department_rows(departments, num_departments, end_date, num_days, seed=0):
+    """부서 번호 목록(departments)의 end_date까지 num_days일 안전 성과 행을 생성하는 함수
+
+    부서별 기준값 (부서 × 1)을 일자 축으로 브로드캐스팅하고 잡음은 (부서 × 일자) 배열로 한 번에 만든다.
+    값은 (seed, 부서, 일자)로만 정해지므로 새 일자가 추가되어도 기존 행은 바뀌지 않는다.
+    행은 부서, 일자(최근순) 순서다.
+    """
+    departments = np.asarray(departments)[:, None]
+    days = day_number(end_date) - np.arange(num_days)[None, :]
+    incident_rate = 5 * counter_uniform(seed, 0, departments, 0)
+    compliance_rate = 80 + 20 * counter_uniform(seed, 1, departments, 0)
+    incidents = np.maximum(0, np.trunc(counter_normal(seed, 2, departments, days, incident_rate))).astype(np.int32)
+    compliance = np.clip(counter_normal(seed, 4, departments, days, compliance_rate, 2), 0, 100)
+    training_hours = (8 * counter_uniform(seed, 6, departments, days)).astype(np.int32)
+    dates = pd.Timestamp(SERIES_EPOCH) + pd.to_timedelta(days[0], unit='D')
+
+    return pd.DataFrame({
+        'Date': np.tile(dates.to_numpy(), len(departments)),
+        'Department': pd.Categorical.from_codes(np.repeat(departments[:, 0], num_days),
+                                                categories=[f'부서 {i+1}' for i in range(num_departments)]),
+        'Incidents': incidents.ravel(),
+        'Compliance_Rate': compliance.ravel(),
+        'Training_Hours': training_hours.ravel()
+    })
+
+@cached_data()
+def generate_safety_performance_data(num_days=30, num_departments=5, end_date=None, seed=0):
+    """가상의 안전 성과 데이터 전체를 생성하는 함수 (큰 규모에서는 build_safety_rollup과 페이지 단위 조회를 사용)"""
+    end_date = pd.Timestamp.now().normalize() if end_date is None else end_date
+    return generate_department_rows(np.arange(num_departments), num_departments, end_date, num_days, seed)
+
+def generate_safety_performance_page(num_days, num_departments, page, end_date, seed=0, page_rows=RAW_PAGE_ROWS):
+    """원본 데이터의 page번째 페이지 행만 생성하는 함수 (해당 페이지에 걸친 부서만 생성)"""
+    start = page * page_rows
+    stop = min(start + page_rows, num_days * num_departments)
+    first, last = start // num_days, (stop - 1) // num_days
+    rows = generate_department_rows(np.arange(first, last + 1), num_departments, end_date, num_days, seed)
+    offset = first * num_days
+    return rows.iloc[start - offset:stop - offset].set_axis(pd.RangeIndex(start, stop))
+
+class SafetyPerformanceRollup:
+    """부서 × 기간(일/주/월)별 합계를 유지하는 사전 집계 큐브
+
+    합계와 일수만 보관하므로 새 일자가 추가되면 해당 행만 집계해 기존 큐브에 더하고,
+    기간 창에서 밀려난 일자는 같은 방식으로 뺀다. 큐브가 바뀔 때마다 version이 올라간다.
+    """
+
+    def __init__(self):
+        self.cubes = {}  # 집계 주기 -> (Department, Period) 인덱스의 합계 DataFrame
+        self.first_date = None
+        self.last_date = None
+        self.version = 0
+        self.lock = threading.RLock()
+        self._trends = {}  # (version, 집계 주기, 부서 수, 지점 수) -> 차트용 추이
+
+    def append(self, df):
+        """아직 반영되지 않은 일자의 행만 집계에 추가 (df는 해당 일자의 모든 부서 행)"""
+        if self.last_date is not None:
+            df = df[df['Date'] > self.last_date]
+        if df.empty:
+            return self
+        for freq, part in self._aggregate(df).items():
+            cube = self.cubes.get(freq)
+            self.cubes[freq] = part if cube is None else self._combine(cube, part, 1)
+        self.first_date = df['Date'].min() if self.first_date is None else min(self.first_date, df['Date'].min())
+        self.last_date = df['Date'].max()
+        self.version += 1
+        return self
+
+    def remove(self, df):
+        """가장 오래된 일자들의 행을 집계에서 빼고 일수가 0이 된 기간은 삭제 (df는 해당 일자의 모든 부서 행)"""
+        if df.empty:
+            return self
+        for freq, part in self._aggregate(df).items():
+            self.cubes[freq] = self._combine(self.cubes[freq], part, -1)
+        self.first_date = df['Date'].max() + pd.Timedelta(days=1)
+        self.version += 1
+        return self
+
+    @classmethod
+    def from_department_chunks(cls, chunks):
+        """서로 다른 부서 묶음의 행 DataFrame들을 차례로 집계해 큐브를 만듦 (원본 전체를 한꺼번에 두지 않음)"""
+        rollup = cls()
+        parts = {freq: [] for freq in ROLLUP_FREQS.values()}
+        for df in chunks:
+            for freq, part in rollup._aggregate(df).items():
+                parts[freq].append(part)
+            first_date, last_date = df['Date'].min(), df['Date'].max()
+            rollup.first_date = first_date if rollup.first_date is None else min(rollup.first_date, first_date)
+            rollup.last_date = last_date if rollup.last_date is None else max(rollup.last_date, last_date)
+        # 부서 묶음이 겹치지 않으므로 이어 붙이기만 하면 된다
+        rollup.cubes = {freq: pd.concat(frames) for freq, frames in parts.items() if frames}
+        return rollup
+
+    @staticmethod
+    def _aggregate(df):
+        """행 DataFrame을 집계 주기별 (Department, Period) 합계로 묶음"""
+        parts = {}
+        for freq in ROLLUP_FREQS.values():
+            period = df['Date'].dt.to_period(freq).dt.start_time.rename('Period')
+            parts[freq] = df.groupby(['Department', period], observed=True).agg(
+                Incidents=('Incidents', 'sum'),
+                Training_Hours=('Training_Hours', 'sum'),
+                Compliance_Sum=('Compliance_Rate', 'sum'),
+                Days=('Compliance_Rate', 'size')
+            )
+        return parts
+
+    @staticmethod
+    def _combine(cube, part, sign):
+        """part의 기간과 겹치는 큐브 행에만 part를 더하거나(sign=1) 빼고(sign=-1), 일수가 0이 된 행은 삭제
+
+        전체 큐브를 인덱스 정렬로 더하면 큐브 크기에 비례하므로 기간 코드로 겹치는 행만 골라 계산한다.
+        """
+        periods = part.index.get_level_values('Period')
+        position = cube.index.names.index('Period')
+        level = cube.index.levels[position]
+        touched = ((level >= periods.min()) & (level <= periods.max()))[cube.index.codes[position]]
+        merged = cube[touched].add(part * sign, fill_value=0)
+        return pd.concat([cube[~touched], merged[merged['Days'] > 0]])
+
+    @property
+    def nbytes(self):
+        return sum(int(cube.memory_usage(deep=True).sum()) for cube in self.cubes.values())
+
+    def department_totals(self):
+        """부서별 전체 합계 (월별 큐브에서 계산)"""
+        return self.cubes['M'].groupby(level='Department', observed=True).sum()
+
+    def trend_lines(self, freq, max_departments=CHART_MAX_DEPARTMENTS, points=POINTS_PER_TRACE):
+        """차트용 규정 준수율 추이 (이름 목록, x, y)
+
+        평균 준수율 상위/하위 max_departments개 부서와 전체 평균 계열을 LTTB로 한 번에 다운샘플링한다.
+        x, y는 (계열 수 × 지점 수) 배열이며, 큐브 version과 집계 주기별로 한 번만 계산한다.
+        """
+        key = (self.version, freq, max_departments, points)
+        with self.lock:
+            if key not in self._trends:
+                self._trends = {k: v for k, v in self._trends.items() if k[0] == self.version}
+                self._trends[key] = self._compute_trend_lines(freq, max_departments, points)
+            return self._trends[key]
+
+    def _compute_trend_lines(self, freq, max_departments, points):
+        cube = self.cubes[freq]
+        totals = self.department_totals()
+        ranking = (totals['Compliance_Sum'] / totals['Days']).sort_values(ascending=False).index
+        if len(ranking) > 2 * max_departments:
+            ranking = ranking[:max_departments].append(ranking[-max_departments:])
+        departments = cube.index.get_level_values('Department')
+        selected = cube[departments.isin(ranking)]
+        rates = (selected['Compliance_Sum'] / selected['Days']).unstack('Period').reindex(ranking)
+        overall = cube.groupby(level='Period').sum()
+        overall = (overall['Compliance_Sum'] / overall['Days']).reindex(rates.columns)
+        x, y = downsample_rows(rates.columns.to_numpy(), np.vstack([overall.to_numpy(), rates.to_numpy()]), points)
+        return ['전체 평균'] + [str(dept) for dept in ranking], x, y
+
+def build_safety_rollup(num_days=30, num_departments=5, end_date=None, seed=0):
+    """안전 성과 데이터의 사전 집계 큐브를 생성하는 함수 (원본은 부서 묶음 단위로 생성 후 버림)"""
+    end_date = pd.Timestamp.now().normalize() if end_date is None else end_date
+    chunk = max(1, ROLLUP_CHUNK_ROWS // num_days)
+    return SafetyPerformanceRollup.from_department_chunks(
+        generate_department_rows(np.arange(start, min(start + chunk, num_departments)), num_departments,
+                                 end_date, num_days, seed)
+        for start in range(0, num_departments, chunk))
+
+def generate_day_blocks(num_departments, end_date, num_days, seed=0):
+    """end_date까지 num_days일의 모든 부서 행을 일자 묶음 단위로 생성 (묶음당 최대 ROLLUP_CHUNK_ROWS행)"""
+    block = max(1, ROLLUP_CHUNK_ROWS // num_departments)
+    for offset in range(0, num_days, block):
+        yield generate_department_rows(np.arange(num_departments), num_departments,
+                                       end_date - pd.Timedelta(days=offset), min(block, num_days - offset), seed)
+
+def advance_safety_rollup(rollup, num_days, num_departments, end_date, seed=0):
+    """사전 집계를 end_date까지 진행: 새 일자의 행만 더하고 num_days일 창에서 밀려난 일자의 행은 뺌"""
+    end_date = pd.Timestamp(end_date).normalize()
+    with rollup.lock:
+        new_days = (end_date - rollup.last_date).days
+        if new_days <= 0:
+            return rollup
+        if new_days >= num_days:
+            # 창 전체가 바뀌었으면 처음부터 다시 집계
+            rebuilt = build_safety_rollup(num_days, num_departments, end_date, seed)
+            rollup.cubes, rollup.first_date, rollup.last_date = rebuilt.cubes, rebuilt.first_date, rebuilt.last_date
+            rollup.version += 1
+            return rollup
+        for df in generate_day_blocks(num_departments, end_date, new_days, seed):
+            rollup.append(df)
+        expired_end = rollup.first_date + pd.Timedelta(days=new_days - 1)
+        for df in generate_day_blocks(num_departments, expired_end, new_days, seed):
+            rollup.remove(df)
+    return rollup
+
+@st.cache_resource(show_spinner="안전 성과 집계를 준비하는 중...", max_entries=4)
+def get_safety_rollup(num_days, num_departments, seed=0):
+    """세션 간에 공유하며 새 일자만 반영해 갱신하는 사전 집계"""
+    return build_safety_rollup(num_days, num_departments, pd.Timestamp.now().normalize(), seed)
+
+def create_compliance_trend_chart(names, x, y):
+    """trend_lines로 다운샘플링한 부서별 규정 준수율 추이를 그리는 함수 (첫 계열은 전체 평균)"""
+    fig = go.Figure()
+    for i, name in enumerate(names):
+        line = dict(color='black', width=3) if i == 0 else None
+        fig.add_trace(go.Scattergl(x=x[i], y=y[i], mode='lines', name=name, line=line))
+    fig.update_layout(title='부서별 규정 준수율 추이', xaxis_title='Date', yaxis_title='Compliance_Rate')
+    return fig
 
 def show_safety_performance_dashboard():
     st.subheader("안전 성과 대시보드")
 
-    # 데이터 생성
-    df = generate_safety_performance_data()
+    # 데이터 규모 설정
+    col1, col2 = st.columns(2)
+    num_days = col1.number_input("기간 (일)", min_value=1, max_value=3650, value=30)
+    num_departments = col2.number_input("부서 수", min_value=1, max_value=5000, value=5)
+
+    # 사전 집계 (원본 행은 원본 데이터 보기에서 페이지 단위로만 생성)
+    num_days, num_departments = int(num_days), int(num_departments)
+    end_date = pd.Timestamp.now().normalize()
+    rollup = advance_safety_rollup(get_safety_rollup(num_days, num_departments), num_days, num_departments, end_date)
+    dept_totals = rollup.department_totals()
 
     # 전체 통계
-    total_incidents = df['Incidents'].sum()
-    avg_compliance = df['Compliance_Rate'].mean()
-    total_training_hours = df['Training_Hours'].sum()
+    total_incidents = int(dept_totals['Incidents'].sum())
+    avg_compliance = dept_totals['Compliance_Sum'].sum() / dept_totals['Days'].sum()
+    total_training_hours = int(dept_totals['Training_Hours'].sum())
 
     col1, col2, col3 = st.columns(3)
     col1.metric("총 사고 건수", f"{total_incidents}건")
@@ -45,21 +280,20 @@ def show_safety_performance_dashboard():
 
     # 부서별 사고 건수 (Streamlit 내장 차트)
     st.subheader("부서별 사고 건수")
-    dept_incidents = df.groupby('Department')['Incidents'].sum().sort_values(ascending=False)
+    dept_incidents = dept_totals['Incidents'].sort_values(ascending=False)
     st.bar_chart(dept_incidents)
 
     # 시간에 따른 규정 준수율 변화 (Plotly 라인 차트)
     st.subheader("시간에 따른 규정 준수율 변화")
-    fig_compliance = px.line(df, x='Date', y='Compliance_Rate', color='Department',
-                             title='부서별 규정 준수율 추이')
-    st.plotly_chart(fig_compliance)
+    freq_label = st.radio("집계 주기", list(ROLLUP_FREQS.keys()), horizontal=True)
+    names, x, y = rollup.trend_lines(ROLLUP_FREQS[freq_label])
+    if len(names) - 1 < num_departments:
+        st.caption(f"부서 {num_departments:,}개 중 평균 준수율 상위/하위 {CHART_MAX_DEPARTMENTS}개 부서와 전체 평균을 표시합니다.")
+    st.plotly_chart(create_compliance_trend_chart(names, x, y))
 
     # 교육 시간과 사고 건수의 상관관계 (Plotly 산점도)
     st.subheader("교육 시간과 사고 건수의 상관관계")
-    df_corr = df.groupby('Department').agg({
-        'Training_Hours': 'sum',
-        'Incidents': 'sum'
-    }).reset_index()
+    df_corr = dept_totals[['Training_Hours', 'Incidents']].reset_index()
     fig_correlation = px.scatter(df_corr, x='Training_Hours', y='Incidents', 
                                  text='Department', title='교육 시간 vs 사고 건수')
     fig_correlation.update_traces(textposition='top center')
@@ -67,7 +301,10 @@ def show_safety_performance_dashboard():
 
     # 원본 데이터 표시 (옵션)
     if st.checkbox("원본 데이터 보기"):
-        st.write(df)
+        num_pages = -(-num_days * num_departments // RAW_PAGE_ROWS)
+        page = st.number_input(f"페이지 (전체 {num_pages:,}쪽, 쪽당 {RAW_PAGE_ROWS:,}행)", min_value=1,
+                               max_value=num_pages, value=1)
+        st.write(generate_safety_performance_page(num_days, num_departments, int(page) - 1, end_date))
 
 if __name__ == "__main__":
     show_safety_performance_dashboard()
@@ -1,38 +1,211 @@
+import hashlib
+import os
+import tempfile
+from datetime import timedelta
 import streamlit as st
 import pydeck as pdk
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from data_cache import cached_data
+from trajectory_store import TrajectoryStore
+from movement_analytics import compute_movement_metrics, find_dwell_segments
+from geofence import GeofenceIndex, load_zones, compute_zone_dwell, find_zone_events
+from trajectory_archive import open_or_ingest
 
-def generate_worker_movement_data(num_workers=5, num_points=100):
+PATH_VERTEX_BUDGET = 200000  # 브라우저로 보내는 전체 경로 꼭짓점 수 상한
+SIMPLIFY_PIXELS = 2  # 경로 단순화 허용 오차 (화면 픽셀)
+# 작업자 경로 색 (작업자 번호 순으로 반복) - 재실행해도 작업자마다 같은 색
+WORKER_PALETTE = np.array([[31, 119, 180], [255, 127, 14], [44, 160, 44], [214, 39, 40], [148, 103, 189],
+                           [140, 86, 75], [227, 119, 194], [188, 189, 34], [23, 190, 207], [255, 187, 120]])
+
+# 리더보드 열 이름 (지표 -> 표시 이름)
+LEADERBOARD_COLUMNS = {
+    'total_distance_m': '총 이동 거리 (m)',
+    'avg_speed_mps': '평균 속도 (m/s)',
+    'max_speed_mps': '최고 속도 (m/s)',
+    'idle_ratio': '정지 비율',
+    'dwell_count': '체류 횟수',
+    'longest_dwell_minutes': '최장 체류 (분)',
+    'max_altitude_m': '최고 고도 (m)',
+    'high_altitude_minutes': '고소 노출 (분)'
+}
+
+DWELL_BUCKETS = {'15분': '15min', '1시간': '1h', '1일': '1D'}
+
+# 궤적 파일 재생 설정
+ARCHIVE_ROOT = os.path.join(tempfile.gettempdir(), 'isbdp_trajectories')
+REPLAY_WINDOWS = {'1시간': '1h', '6시간': '6h', '1일': '1D'}
+REPLAY_TRAIL_SECONDS = 1800  # TripsLayer 꼬리 길이 (초)
+REPLAY_STEP_SECONDS = 300  # 자동 재생 시 한 번에 진행하는 시간 (초)
+SIMULATION_SEED = 0  # 시뮬레이션 동선 생성 시드
+
+@cached_data(copy=False)
+def generate_worker_trajectories(num_workers=5, num_points=100, seed=None):
+    """가상의 작업자 동선을 무작위 보행 누적합으로 한 번에 생성하여 저장소로 반환하는 함수"""
+    rng = np.random.default_rng(seed)
+    shape = (num_workers, num_points)
+    start_lat = 35.6 + rng.random((num_workers, 1)) * 0.1
+    start_lon = 128.5 + rng.random((num_workers, 1)) * 0.1
+    lat = start_lat + np.cumsum(rng.normal(0, 0.0001, size=shape), axis=1)
+    lon = start_lon + np.cumsum(rng.normal(0, 0.0001, size=shape), axis=1)
+
+    # 0 아래로 내려가지 않는 고도: alt[i] = max(0, alt[i-1] + e[i]) 를 린들리 공식으로 계산
+    steps = np.cumsum(rng.normal(0, 0.5, size=shape), axis=1)
+    alt = steps - np.minimum.accumulate(np.minimum(steps, 0), axis=1)
+
+    start_time = pd.Timestamp.now().normalize().value
+    timestamps = start_time + np.arange(num_points, dtype=np.int64) * pd.Timedelta(minutes=5).value
+    return TrajectoryStore(
+        [f'Worker {i+1}' for i in range(num_workers)],
+        np.arange(num_workers + 1) * num_points,
+        np.tile(timestamps, num_workers),
+        lat.ravel(), lon.ravel(), alt.ravel()
+    )
+
+@cached_data()
+def generate_worker_movement_data(num_workers=5, num_points=100, seed=None):
     """가상의 작업자 동선 데이터를 생성하는 함수"""
-    data = []
-    for worker in range(num_workers):
-        lat, lon, alt = 35.6 + np.random.random() * 0.1, 128.5 + np.random.random() * 0.1, 0
-        for i in range(num_points):
-            lat += np.random.normal(0, 0.0001)
-            lon += np.random.normal(0, 0.0001)
-            alt = max(0, alt + np.random.normal(0, 0.5))
-            timestamp = (datetime.now() + timedelta(minutes=i*5)).isoformat()
-            data.append({
-                'worker_id': f'Worker {worker+1}',
-                'timestamp': timestamp,
-                'latitude': float(lat),
-                'longitude': float(lon),
-                'altitude': float(alt)
-            })
-    return pd.DataFrame(data)
-
-def create_pydeck_chart(df):
-    """PyDeck을 사용하여 3D 동선 차트를 생성하는 함수"""
-    worker_colors = {worker: [int(r), int(g), 0] for worker, (r, g) in 
-                     zip(df['worker_id'].unique(), np.random.randint(0, 255, size=(len(df['worker_id'].unique()), 2)))}
-    df['color'] = df['worker_id'].map(worker_colors)
+    return generate_worker_trajectories(num_workers, num_points, seed).to_frame()
+
+def simplify_tolerance(zoom, latitude, pixels=SIMPLIFY_PIXELS):
+    """확대 수준에서 화면 pixels 픽셀에 해당하는 허용 오차(위도 단위 도)를 반환"""
+    return pixels * 360 * np.cos(np.radians(latitude)) / (256 * 2 ** zoom)
+
+def douglas_peucker(x, y, tolerance):
+    """Douglas-Peucker 알고리즘으로 남길 지점의 인덱스를 반환하는 함수"""
+    n = len(x)
+    if n <= 2:
+        return np.arange(n)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        # 구간 내 모든 지점과 시작-끝 선분 사이의 거리를 한 번에 계산
+        dx, dy = x[end] - x[start], y[end] - y[start]
+        px, py = x[start + 1:end] - x[start], y[start + 1:end] - y[start]
+        norm = np.hypot(dx, dy)
+        distance = np.abs(dy * px - dx * py) / norm if norm > 0 else np.hypot(px, py)
+        i = int(np.argmax(distance))
+        if distance[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return np.flatnonzero(keep)
+
+def stride_indices(n, count):
+    """양 끝점을 포함하여 n개 중 count개를 균등 간격으로 고르는 인덱스"""
+    return np.unique(np.linspace(0, n - 1, count).astype(np.int64))
+
+def build_worker_paths(store, zoom=14, max_vertices=PATH_VERTEX_BUDGET, origin=None):
+    """작업자별 경로 레코드(좌표 배열과 타임스탬프)를 생성하는 함수
+
+    경로는 현재 확대 수준의 화면 해상도에 맞춰 단순화되고, 전체 꼭짓점 수는
+    max_vertices를 넘지 않는다. 타임스탬프는 origin(기본: 최초 표본 시각) 기준 초 단위이다.
+    """
+    if len(store) == 0:
+        return []
+    origin = store.timestamps.min() if origin is None else pd.Timestamp(origin).value
+    seconds = (store.timestamps - origin) / 1e9
+    lat_all = store.latitude.astype(np.float64)
+    lon_all = store.longitude.astype(np.float64)
+    alt_all = store.altitude.astype(np.float64)
+    lat0 = lat_all.mean()
+    tolerance = simplify_tolerance(zoom, lat0)
+    per_path_budget = max(2, max_vertices // max(1, store.num_workers))
+
+    records = []
+    for i, worker in enumerate(store.workers):
+        rows = np.arange(store.offsets[i], store.offsets[i + 1])
+        if len(rows) == 0:
+            continue
+        # 단순화 비용을 제한하기 위해 너무 긴 경로는 먼저 균등 간격으로 줄임
+        if len(rows) > 4 * per_path_budget:
+            rows = rows[stride_indices(len(rows), 4 * per_path_budget)]
+        idx = douglas_peucker(lon_all[rows] * np.cos(np.radians(lat0)), lat_all[rows], tolerance)
+        if len(idx) > per_path_budget:
+            idx = idx[stride_indices(len(idx), per_path_budget)]
+        rows = rows[idx]
+        records.append({
+            'worker_id': worker,
+            'path': np.column_stack([lon_all[rows], lat_all[rows], alt_all[rows]]).round(6).tolist(),
+            'timestamps': seconds[rows].round(1).tolist(),
+            'num_samples': len(rows)
+        })
+    return records
+
+@st.cache_resource(show_spinner=False)
+def get_geofence_index():
+    """위험 구역 GeoJSON을 읽어 만든 구역 판정 인덱스 (프로세스 단위로 공유)"""
+    return GeofenceIndex(load_zones())
+
+def create_zone_layer(zones):
+    """위험 구역 다각형 레이어를 생성하는 함수"""
+    records = [{'name': zone['name'], 'polygon': polygon} for zone in zones for polygon in zone['polygons']]
+    return pdk.Layer(
+        "PolygonLayer",
+        records,
+        get_polygon="polygon",
+        get_fill_color=[255, 80, 0, 60],
+        get_line_color=[255, 80, 0, 200],
+        line_width_min_pixels=1,
+        pickable=False
+    )
+
+@cached_data(copy=False)
+def load_trajectory_source(source):
+    """데이터 원본 설명(source)의 동선 저장소를 반환하는 함수
+
+    source는 ('simulation', 작업자 수, 표본 수) 또는 ('archive', 파일 경로, 수정 시각, 구간 시작, 구간 끝)이다.
+    파생 지표와 경로는 저장소 객체 대신 이 설명을 캐시 키로 사용한다.
+    """
+    if source[0] == 'simulation':
+        _, num_workers, num_points = source
+        return generate_worker_trajectories(num_workers, num_points, SIMULATION_SEED)
+    _, path, mtime_ns, start, end = source
+    return get_trajectory_archive(path, mtime_ns).load_window(start, end)
+
+@cached_data(copy=False)
+def compute_source_metrics(source):
+    """데이터 원본의 작업자별 이동 지표"""
+    return compute_movement_metrics(load_trajectory_source(source))
+
+@cached_data(copy=False)
+def build_source_paths(source, zoom=14, origin=None):
+    """데이터 원본의 작업자별 경로 레코드 (확대 수준별, 작업자 번호 순 고정 색 포함)"""
+    store = load_trajectory_source(source)
+    paths = build_worker_paths(store, zoom, origin=origin)
+    worker_index = store.workers.get_indexer([record['worker_id'] for record in paths])
+    for record, color in zip(paths, WORKER_PALETTE[worker_index % len(WORKER_PALETTE)].tolist()):
+        record['color'] = color
+    return paths
+
+@cached_data(copy=False)
+def locate_source_zones(source):
+    """데이터 원본의 표본별 위험 구역 판정 (표본 번호, 구역 번호)"""
+    store = load_trajectory_source(source)
+    return get_geofence_index().locate(store.latitude, store.longitude)
+
+@cached_data(copy=False)
+def compute_source_zone_exposure(source, bucket):
+    """데이터 원본의 위험 구역 (시간대별 체류, 진입/이탈 기록)"""
+    store = load_trajectory_source(source)
+    geofence = get_geofence_index()
+    pairs = locate_source_zones(source)
+    return compute_zone_dwell(store, geofence, bucket, pairs), find_zone_events(store, geofence, pairs)
+
+def create_pydeck_chart(source, zoom=14, zones=None):
+    """PyDeck을 사용하여 3D 동선 차트를 생성하는 함수 (작업자당 경로 1개)"""
+    store = load_trajectory_source(source)
+    paths = build_source_paths(source, zoom)
 
     layer = pdk.Layer(
         "PathLayer",
-        df.to_dict('records'),
-        get_path=["longitude", "latitude", "altitude"],
+        paths,
+        get_path="path",
         get_color="color",
         width_scale=20,
         width_min_pixels=2,
@@ -42,42 +215,201 @@ def create_pydeck_chart(df):
     )
 
     view_state = pdk.ViewState(
-        latitude=df['latitude'].mean(),
-        longitude=df['longitude'].mean(),
-        zoom=14,
+        latitude=float(store.latitude.mean()),
+        longitude=float(store.longitude.mean()),
+        zoom=zoom,
         pitch=45,
         bearing=0
     )
 
+    layers = [layer] if zones is None else [create_zone_layer(zones), layer]
     return pdk.Deck(
-        layers=[layer],
+        layers=layers,
         initial_view_state=view_state,
-        tooltip={"text": "{worker_id}\nTime: {timestamp}"},
+        tooltip={"text": "{worker_id}\n표시 지점: {num_samples}"},
         map_style="mapbox://styles/mapbox/dark-v9"
     )
 
+def create_trips_chart(source, origin, current_seconds, zoom=14, zones=None,
+                       trail_seconds=REPLAY_TRAIL_SECONDS):
+    """TripsLayer로 current_seconds 시점까지의 동선 꼬리를 그리는 함수"""
+    store = load_trajectory_source(source)
+    paths = build_source_paths(source, zoom, origin)
+    layer = pdk.Layer(
+        "TripsLayer",
+        paths,
+        get_path="path",
+        get_timestamps="timestamps",
+        get_color=[253, 128, 93],
+        opacity=0.8,
+        width_min_pixels=3,
+        rounded=True,
+        trail_length=trail_seconds,
+        current_time=current_seconds
+    )
+    layers = [layer] if zones is None else [create_zone_layer(zones), layer]
+    return pdk.Deck(
+        layers=layers,
+        initial_view_state=pdk.ViewState(
+            latitude=float(store.latitude.mean()),
+            longitude=float(store.longitude.mean()),
+            zoom=zoom,
+            pitch=45
+        ),
+        map_style="mapbox://styles/mapbox/dark-v9"
+    )
+
+def write_sample_export(path, num_workers=50, num_points=2016):
+    """시뮬레이션 동선 데이터를 추적기 내보내기 형식의 CSV 파일로 저장하는 함수"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    generate_worker_movement_data(num_workers, num_points, SIMULATION_SEED).to_csv(path, index=False)
+
+def create_sample_export():
+    """예제 궤적 파일을 만들고 파일 경로 입력란에 채우는 콜백"""
+    path = os.path.join(ARCHIVE_ROOT, 'sample_trajectories.csv')
+    write_sample_export(path)
+    st.session_state['trajectory_path'] = path
+
+@st.cache_resource(show_spinner="궤적 파일을 적재하는 중...")
+def get_trajectory_archive(path, mtime_ns):
+    """궤적 파일의 시간 분할 저장소를 열거나 새로 적재하는 함수 (원본 수정 시각별로 공유)"""
+    archive_dir = os.path.join(ARCHIVE_ROOT, hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:16])
+    return open_or_ingest(path, archive_dir)
+
+def select_archive_window():
+    """궤적 파일을 적재하고 분석할 시간 구간을 골라 (데이터 원본 설명, 구간 시작)을 반환하는 함수"""
+    path = st.text_input("궤적 파일 경로 (CSV/Parquet)", key='trajectory_path')
+    st.button("시뮬레이션 데이터로 예제 파일 만들기", on_click=create_sample_export)
+    if not path:
+        st.info("worker_id, timestamp, latitude, longitude, altitude 열을 가진 파일 경로를 입력하세요.")
+        return None, None
+    if not os.path.exists(path):
+        st.error(f"파일을 찾을 수 없습니다: {path}")
+        return None, None
+    mtime_ns = os.stat(path).st_mtime_ns
+    try:
+        archive = get_trajectory_archive(path, mtime_ns)
+    except (ImportError, KeyError, ValueError) as e:
+        st.error(f"궤적 파일 적재 오류: {e}")
+        return None, None
+
+    first, last = archive.time_range()
+    if first is None:
+        st.warning("궤적 파일에 표본이 없습니다.")
+        return None, None
+    st.caption(f"표본 {archive.num_rows:,}개, 작업자 {len(archive.workers):,}명, "
+               f"시간 파티션 {len(archive.partitions):,}개")
+
+    window_label = st.radio("분석 구간 길이", list(REPLAY_WINDOWS), horizontal=True)
+    length = pd.Timedelta(REPLAY_WINDOWS[window_label])
+    start = first
+    if last - length > first:
+        start = pd.Timestamp(st.slider("분석 구간 시작", min_value=first.to_pydatetime(),
+                                       max_value=(last - length).to_pydatetime(),
+                                       value=first.to_pydatetime(), step=timedelta(minutes=5),
+                                       format="MM/DD HH:mm"))
+    return ('archive', path, mtime_ns, start, start + length), start
+
+def render_trajectory_replay(source, origin, zoom, zones):
+    """재생 시점 슬라이더와 TripsLayer 지도를 그리는 함수"""
+    store = load_trajectory_source(source)
+    duration = int((store.timestamps.max() - pd.Timestamp(origin).value) // 10**9) if len(store) else 0
+    st.session_state.setdefault('replay_seconds', 0)
+    st.session_state['replay_seconds'] = min(st.session_state['replay_seconds'], duration)
+    current = st.slider("재생 시점 (구간 시작 후 초)", 0, max(duration, 1), step=60, key='replay_seconds')
+    st.caption(f"현재 시각: {pd.Timestamp(origin) + pd.Timedelta(seconds=current):%Y-%m-%d %H:%M}")
+    st.pydeck_chart(create_trips_chart(source, origin, current, zoom, zones))
+
+@st.fragment(run_every=1)
+def play_trajectory_replay(source, origin, zoom, zones):
+    """재생 시점을 주기적으로 진행시키며 동선을 다시 그리는 함수"""
+    store = load_trajectory_source(source)
+    duration = int((store.timestamps.max() - pd.Timestamp(origin).value) // 10**9) if len(store) else 0
+    current = st.session_state.get('replay_seconds', 0) + REPLAY_STEP_SECONDS
+    st.session_state['replay_seconds'] = current if current <= duration else 0
+    render_trajectory_replay(source, origin, zoom, zones)
+
 def show_worker_movement_analysis():
     st.subheader("작업자 동선 분석")
 
-    df = generate_worker_movement_data()
-    chart = create_pydeck_chart(df)
-    st.pydeck_chart(chart)
+    geofence = get_geofence_index()
+    source = st.radio("데이터 원본", ["시뮬레이션", "궤적 파일 (CSV/Parquet)"], horizontal=True)
+    zoom = st.slider("지도 확대 수준", 10, 18, 14)
 
-    selected_worker = st.selectbox("작업자 선택", df['worker_id'].unique())
-    filtered_df = df[df['worker_id'] == selected_worker]
+    if source == "시뮬레이션":
+        col1, col2 = st.columns(2)
+        num_workers = col1.select_slider("작업자 수", options=[5, 50, 500, 5000], value=5)
+        num_points = col2.select_slider("작업자별 표본 수 (5분 간격)", options=[100, 288, 2016], value=100)
+        source = ('simulation', num_workers, num_points)
+        chart = create_pydeck_chart(source, zoom, geofence.zones)
+        st.pydeck_chart(chart)
+    else:
+        # 선택한 구간과 겹치는 시간 파티션만 읽어 재생
+        source, origin = select_archive_window()
+        if source is None:
+            return
+        if len(load_trajectory_source(source)) == 0:
+            st.warning("선택한 구간에 표본이 없습니다.")
+            return
+        if st.toggle("자동 재생"):
+            play_trajectory_replay(source, origin, zoom, geofence.zones)
+        else:
+            render_trajectory_replay(source, origin, zoom, geofence.zones)
 
-    distances = np.sqrt(
-        np.diff(filtered_df['latitude'])**2 + 
-        np.diff(filtered_df['longitude'])**2 +
-        np.diff(filtered_df['altitude'])**2
-    )
-    total_distance = float(np.sum(distances) * 111000)  # Convert to float
+    # 저장소와 파생 지표는 데이터 원본 설명별로 캐시
+    store = load_trajectory_source(source)
+    metrics = compute_source_metrics(source)
+
+    # 전체 작업자 지표 리더보드
+    st.subheader("작업자별 이동 지표")
+    col1, col2 = st.columns(2)
+    sort_label = col1.selectbox("정렬 기준", list(LEADERBOARD_COLUMNS.values()))
+    top_n = col2.number_input("표시할 작업자 수", min_value=1, max_value=len(metrics), value=min(20, len(metrics)))
+    leaderboard = metrics[list(LEADERBOARD_COLUMNS)].rename(columns=LEADERBOARD_COLUMNS)
+    st.dataframe(leaderboard.nlargest(int(top_n), sort_label), column_config={
+        '정지 비율': st.column_config.ProgressColumn(format='percent', min_value=0, max_value=1)
+    })
+
+    # 위험 구역 체류 분석
+    st.subheader("위험 구역 체류 분석")
+    bucket_label = st.radio("집계 단위", list(DWELL_BUCKETS), index=1, horizontal=True)
+    zone_dwell, zone_events = compute_source_zone_exposure(source, DWELL_BUCKETS[bucket_label])
+    if zone_dwell.empty:
+        st.info("위험 구역에 진입한 작업자가 없습니다.")
+    else:
+        col1, col2 = st.columns(2)
+        col1.write("구역별 누적 체류 시간 (분)")
+        col1.bar_chart(zone_dwell.groupby('zone', observed=True)['minutes'].sum())
+        col2.write("시간대별 구역 체류 시간 (분)")
+        col2.area_chart(zone_dwell.pivot_table(index='bucket', columns='zone', values='minutes',
+                                               aggfunc='sum', observed=True))
+        worker_zone = zone_dwell.pivot_table(index='worker_id', columns='zone', values='minutes',
+                                             aggfunc='sum', fill_value=0, observed=True)
+        st.write("구역 체류 시간 상위 작업자 (분)")
+        st.dataframe(worker_zone.loc[worker_zone.sum(axis=1).nlargest(20).index])
+
+    selected_worker = st.selectbox("작업자 선택", store.workers)
+    filtered_df = store.worker(selected_worker).to_frame()
+    worker_metrics = metrics.loc[selected_worker]
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric(f"{selected_worker}의 총 이동 거리", f"{worker_metrics['total_distance_m']:.2f} 미터")
+    col2.metric("평균 속도", f"{worker_metrics['avg_speed_mps'] * 60:.1f} m/분")
+    col3.metric("체류 횟수", f"{int(worker_metrics['dwell_count'])}회")
+
+    dwell = find_dwell_segments(store.worker(selected_worker))
+    if not dwell.empty:
+        st.write(f"{selected_worker}의 체류 구간")
+        st.dataframe(dwell, hide_index=True)
 
-    st.metric(f"{selected_worker}의 총 이동 거리", f"{total_distance:.2f} 미터")
+    worker_events = zone_events[zone_events['worker_id'] == selected_worker]
+    if not worker_events.empty:
+        st.write(f"{selected_worker}의 위험 구역 진입/이탈 기록")
+        st.dataframe(worker_events, hide_index=True)
 
     st.subheader(f"{selected_worker}의 시간대별 고도 변화")
     chart_data = pd.DataFrame({
-        'timestamp': pd.to_datetime(filtered_df['timestamp']),
+        'timestamp': filtered_df['timestamp'],
         'altitude': filtered_df['altitude']
     }).set_index('timestamp')
     st.line_chart(chart_data)
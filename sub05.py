@@ -2,35 +2,260 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+import threading
+from scipy.signal import lfilter
+from datetime import datetime
+from data_cache import cached_data
+from sensor_store import SensorHistoryStore
+from anomaly_detection import FleetAnomalyDetector, classify_thresholds, STATUS_LABELS
+from maintenance_scheduler import MaintenanceScheduler, degradation_scores, linear_slopes
 
-def generate_equipment_data(num_equipment=6):
-    """가상의 설비 상태 데이터를 생성하는 함수"""
+SENSOR_COLUMNS = ['Temperature', 'Pressure', 'Vibration', 'Efficiency']
+SENSOR_LABELS = {'Temperature': '온도 (°C)', 'Pressure': '압력 (bar)', 'Vibration': '진동 (mm/s)', 'Efficiency': '효율 (%)'}
+SENSOR_NOISE = np.array([0.7, 0.07, 0.07, 0.4])  # 센서별 1초당 변동 폭
+SENSOR_RANGES = {'Temperature': (0, 100), 'Pressure': (0, 10), 'Vibration': (0, 5), 'Efficiency': (0, 100)}
+SENSOR_LIMITS = np.array([SENSOR_RANGES[c][1] for c in SENSOR_COLUMNS])
+
+# 센서별 임계값 (주의, 경고)과 방향 (1: 클수록 나쁨, -1: 작을수록 나쁨)
+SENSOR_THRESHOLDS = {'Temperature': (60, 75), 'Pressure': (3, 6), 'Vibration': (1, 3), 'Efficiency': (90, 80)}
+SENSOR_CAUTION = np.array([SENSOR_THRESHOLDS[c][0] for c in SENSOR_COLUMNS])
+SENSOR_WARNING = np.array([SENSOR_THRESHOLDS[c][1] for c in SENSOR_COLUMNS])
+SENSOR_DIRECTIONS = np.array([-1 if c == 'Efficiency' else 1 for c in SENSOR_COLUMNS])
+
+# 설비 생성 분포: 정상 범위 중심값과 편차, 열화 설비 비율과 편차
+SENSOR_MEANS = np.array([52, 2.4, 0.55, 93])
+SENSOR_SPREADS = np.array([5, 0.4, 0.25, 2])
+DEGRADED_RATIO = 0.1
+DEGRADED_SHIFT = np.array([15, 1.5, 1.5, -10])
+
+# 고장 진행 시뮬레이션: 설비당 발생률(초당), 지속 시간 범위(초), 진행 속도(초당 기준값 변화)
+FAULT_RATE = 1 / (30 * 86400)
+FAULT_DURATION = (1800, 6 * 3600)
+FAULT_DRIFT = np.array([2.0, 0.1, 0.3, -1.5]) / 3600
+SENSOR_REVERSION_SECONDS = 1  # 센서값이 기준값으로 되돌아가는 시간 상수 (초)
+HISTORY_SECONDS = 7 * 24 * 3600  # 최초 생성 시 채우는 과거 이력 길이
+# 원본 보관 구간 이전 이력의 표본 간격: (현재로부터의 경과 시간 상한, 표본 간격) - 오래된 순
+BACKFILL_STEPS = ((HISTORY_SECONDS, 300), (6 * 3600, 60))
+TREND_WINDOWS = {'5분': 300, '1시간': 3600, '6시간': 6 * 3600, '1일': 86400, '1주': 7 * 86400}
+TIER_LABELS = {'raw': '원본 (1초)', '1min': '1분 집계', '1h': '1시간 집계'}
+HEATMAP_MAX_ROWS = 100  # 전체 현황 히트맵에 표시할 최대 설비 수
+# 정비 계획: 열화 점수 산정 구간(1분 계층), 점수 재계산 허용 오차
+DEGRADATION_WINDOW_SECONDS = 6 * 3600
+SCORE_TOLERANCE = 0.02
+EQUIPMENT_SEED = 0  # 설비 구성(기준 센서값, 마지막 정비 일자) 생성 시드
+STATUS_COLORSCALE = [[0, '#2ca02c'], [1/3, '#2ca02c'], [1/3, '#ffbf00'], [2/3, '#ffbf00'], [2/3, '#d62728'], [1, '#d62728']]
+
+@cached_data()
+def generate_equipment_data(num_equipment=6, seed=None):
+    """가상의 설비 상태 데이터를 생성하는 함수 (상태는 센서값의 임계값 분류로 결정)"""
+    rng = np.random.default_rng(seed)
     equipment_types = ['Pump', 'Compressor', 'Motor', 'Valve', 'Tank', 'Heat Exchanger']
-    data = []
-    for i in range(num_equipment):
-        equipment_type = equipment_types[i % len(equipment_types)]
-        temperature = np.random.uniform(50, 80)
-        pressure = np.random.uniform(2, 5)
-        vibration = np.random.uniform(0, 2)
-        efficiency = np.random.uniform(70, 95)
-        last_maintenance = datetime.now() - timedelta(days=np.random.randint(0, 365))
-        status = np.random.choice(['정상', '주의', '경고'], p=[0.7, 0.2, 0.1])
-        data.append({
-            'Equipment_ID': f'EQ-{i+1:03d}',
-            'Type': equipment_type,
-            'Temperature': temperature,
-            'Pressure': pressure,
-            'Vibration': vibration,
-            'Efficiency': efficiency,
-            'Last_Maintenance': last_maintenance,
-            'Status': status
-        })
-    return pd.DataFrame(data)
-
-def create_gauge(value, title, min_value, max_value, threshold_values):
-    """게이지 차트를 생성하는 함수"""
-    color = 'green' if value < threshold_values[0] else 'yellow' if value < threshold_values[1] else 'red'
+    # 정상 범위 중심의 센서값에 일부 열화 설비의 편차를 더함
+    values = rng.normal(SENSOR_MEANS, SENSOR_SPREADS, size=(num_equipment, len(SENSOR_COLUMNS)))
+    degraded = rng.random(num_equipment) < DEGRADED_RATIO
+    values[degraded] += DEGRADED_SHIFT * rng.uniform(0.5, 1.5, size=(degraded.sum(), 1))
+    values = np.clip(values, 0, SENSOR_LIMITS)
+    levels = classify_thresholds(values, SENSOR_CAUTION, SENSOR_WARNING, SENSOR_DIRECTIONS)
+
+    df = pd.DataFrame(values, columns=SENSOR_COLUMNS)
+    df.insert(0, 'Equipment_ID', [f'EQ-{i+1:03d}' for i in range(num_equipment)])
+    df.insert(1, 'Type', np.array(equipment_types)[np.arange(num_equipment) % len(equipment_types)])
+    df['Last_Maintenance'] = (pd.Timestamp.now().normalize() -
+                              pd.to_timedelta(rng.integers(0, 365, num_equipment), unit='D')).to_pydatetime()
+    df['Status'] = STATUS_LABELS[levels.max(axis=1)]
+    return df
+
+def current_epoch_seconds():
+    """현재 시각(현지 시간 기준)을 epoch 초로 반환"""
+    return pd.Timestamp.now().value // 10**9
+
+class EquipmentSensorFeed:
+    """설비별 센서값을 1초 간격으로 시뮬레이션하여 이력 저장소에 기록하는 피드
+
+    센서값은 기준값 주변에서 평균 회귀하는 무작위 과정으로 생성하고, 가끔 고장이 발생하면
+    일정 시간 동안 기준값이 나쁜 방향으로 이동한다. 표본은 이상 탐지기에도 반영된다. 여러 세션이 같은
+    피드를 공유하며 실제 경과 시간만큼만 진행된다. 원본 보관 구간보다 오래된 구간은
+    BACKFILL_STEP_SECONDS 간격으로 채운다. 마지막 정비 일자는 피드가 만들어질 때 고정되는 설비 상태다.
+    """
+
+    def __init__(self, baseline, last_maintenance, seed=None, history_seconds=HISTORY_SECONDS):
+        self.baseline = np.asarray(baseline, dtype=np.float64)
+        self.last_maintenance = pd.DatetimeIndex(last_maintenance)
+        self.values = self.baseline.copy()
+        self.store = SensorHistoryStore(len(self.baseline), SENSOR_COLUMNS)
+        self.detector = FleetAnomalyDetector(len(self.baseline), SENSOR_CAUTION, SENSOR_WARNING, SENSOR_DIRECTIONS)
+        self.fault_remaining = np.zeros(len(self.baseline))  # 설비별 남은 고장 진행 시간 (초)
+        self.fault_drift = np.zeros_like(self.baseline)
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        now = current_epoch_seconds()
+        self._fill(now - history_seconds, now)
+
+    def advance(self):
+        """마지막 표본 이후 경과한 시간만큼 표본을 생성하고 생성한 시점 수를 반환"""
+        with self._lock:
+            now = current_epoch_seconds()
+            last = self.store.last_time
+            if now <= last:
+                return 0
+            return self._fill(last, now)
+
+    def _fill(self, start, end):
+        """(start, end] 구간의 표본을 생성 (원본 보관 구간 이전은 성긴 간격)"""
+        schedule = BACKFILL_STEPS + ((self.store.raw_capacity, 1),)
+        pieces = []
+        last = start
+        for i, (age, step) in enumerate(schedule):
+            stop = end - schedule[i + 1][0] if i + 1 < len(schedule) else end
+            piece = np.arange(max(last + step, end - age), stop + 1, step)
+            if len(piece):
+                pieces.append(piece)
+                last = piece[-1]
+        times = np.concatenate(pieces) if pieces else np.empty(0, dtype=np.int64)
+        block = self.store.raw_capacity
+        previous = start
+        for i in range(0, len(times), block):
+            chunk = times[i:i + block]
+            values = self._simulate(chunk, previous)
+            self.store.extend(chunk, values)
+            self.detector.update_many(values, np.diff(np.r_[previous, chunk]))
+            previous = chunk[-1]
+        return len(times)
+
+    def _simulate(self, times, previous):
+        """평균 회귀 과정(Ornstein-Uhlenbeck)으로 times 시점의 센서값을 생성
+
+        기준값과의 편차는 AR(1) 과정이므로 표본 간격이 같은 구간마다 선형 필터로 한 번에 계산한다.
+        """
+        dt = np.diff(np.r_[previous, times])
+        out = np.empty((len(times),) + self.baseline.shape)
+        deviation = self.values - self.baseline
+        run_starts = np.flatnonzero(np.r_[True, dt[1:] != dt[:-1]])
+        for start, end in zip(run_starts, np.r_[run_starts[1:], len(dt)]):
+            phi = np.exp(-dt[start] / SENSOR_REVERSION_SECONDS)
+            # 정상 분산이 SENSOR_NOISE² × 시간상수 / 2 가 되도록 간격별 잡음 크기를 맞춤
+            scale = np.sqrt((1 - phi ** 2) * SENSOR_REVERSION_SECONDS / 2) * SENSOR_NOISE
+            noise = self._rng.standard_normal((end - start,) + self.baseline.shape, dtype=np.float32) * scale
+            out[start:end], _ = lfilter([1.0], [1.0, -phi], noise, axis=0, zi=phi * deviation[None])
+            deviation = out[end - 1]
+
+        # 블록 동안의 고장 진행: 기준값이 진행 시간만큼 선형으로 이동
+        elapsed = (times - previous).astype(np.float64)
+        self._start_faults(elapsed[-1])
+        ramp = np.minimum(elapsed[:, None], self.fault_remaining[None, :])
+        baseline_path = self.baseline + ramp[:, :, None] * self.fault_drift
+        self.baseline = baseline_path[-1]
+        self.fault_remaining = np.maximum(self.fault_remaining - elapsed[-1], 0)
+
+        self.values = self.baseline + deviation
+        return np.clip(out + baseline_path, 0, SENSOR_LIMITS)
+
+    def _start_faults(self, seconds):
+        """seconds 동안 새로 고장이 시작되는 설비를 골라 진행 속도와 지속 시간을 정함"""
+        idle = self.fault_remaining == 0
+        starts = idle & (self._rng.random(len(idle)) < -np.expm1(-FAULT_RATE * seconds))
+        count = int(starts.sum())
+        if count:
+            self.fault_remaining[starts] = self._rng.uniform(*FAULT_DURATION, size=count)
+            self.fault_drift[starts] = FAULT_DRIFT * self._rng.uniform(0.5, 2.0, size=(count, 1))
+
+@st.cache_resource(show_spinner="설비 센서 이력을 준비하는 중...")
+def get_sensor_feed(num_equipment=6):
+    """설비 수별로 프로세스 단위로 공유되는 센서 피드"""
+    df = generate_equipment_data(num_equipment, EQUIPMENT_SEED)
+    return EquipmentSensorFeed(df[SENSOR_COLUMNS].to_numpy(), df['Last_Maintenance'])
+
+def compute_degradation_scores(feed):
+    """최근 진동 추세, 설계 대비 효율 손실, 마지막 정비 후 경과 일수로 설비별 열화 점수를 계산하는 함수"""
+    end = feed.store.last_time + 1
+    times, _, _, means = feed.store.tier('1min').read(slice(None), end - DEGRADATION_WINDOW_SECONDS, end)
+    vibration = SENSOR_COLUMNS.index('Vibration')
+    efficiency = SENSOR_COLUMNS.index('Efficiency')
+    vibration_trend = linear_slopes(times / 3600, means[:, :, vibration])  # mm/s per 시간
+    efficiency_loss = SENSOR_MEANS[efficiency] - np.nanmean(means[-60:, :, efficiency], axis=0)
+    days_since = (pd.Timestamp.now() - feed.last_maintenance).days.to_numpy()
+    return degradation_scores(vibration_trend, efficiency_loss, days_since, feed.detector.status_codes())
+
+@st.cache_resource(show_spinner=False)
+def get_maintenance_scheduler(num_equipment, horizon_weeks, crew_capacity, start_date):
+    """설비 수와 계획 조건별로 공유되는 정비 일정 계획기 (시작일이 바뀌면 새로 만듦)"""
+    return MaintenanceScheduler(start_date, horizon_weeks * 7, crew_capacity)
+
+def create_trend_chart(trend, sensor):
+    """센서 추세를 평균선과 최솟값-최댓값 범위로 그리는 함수"""
+    data = trend[trend['sensor'] == sensor]
+    fig = go.Figure()
+    if (data['max'] > data['min']).any():
+        fig.add_trace(go.Scatter(x=data['time'], y=data['max'], mode='lines', line=dict(width=0),
+                                 showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=data['time'], y=data['min'], mode='lines', line=dict(width=0),
+                                 fill='tonexty', fillcolor='rgba(31, 119, 180, 0.2)', name='최소-최대'))
+    fig.add_trace(go.Scatter(x=data['time'], y=data['mean'], mode='lines', name='평균'))
+    fig.update_layout(height=300, margin=dict(l=10, r=10, t=30, b=10), yaxis_title=SENSOR_LABELS[sensor])
+    return fig
+
+def build_fleet_table(df, values, levels, anomalies):
+    """설비별 최신 센서값, 상태, 경보 센서 수, 이상 신호 수를 담은 전체 설비 현황 표"""
+    table = df[['Equipment_ID', 'Type']].copy()
+    table[SENSOR_COLUMNS] = values
+    table['Status'] = STATUS_LABELS[levels.max(axis=1)]
+    table['Alert_Sensors'] = (levels > 0).sum(axis=1)
+    table['Anomalies'] = anomalies.sum(axis=1)
+    return table
+
+def sort_fleet_rows(levels, values, sort_by):
+    """정렬 기준에 따른 설비 행 순서를 배열 연산으로 계산하는 함수
+
+    sort_by가 None이면 최악 상태, 경보 센서 수, 수준 합계 순(심각도 순)이고,
+    센서 이름이면 그 센서의 나쁜 방향 값이 큰 순서이다.
+    """
+    if sort_by is None:
+        return np.lexsort((-levels.sum(axis=1), -(levels > 0).sum(axis=1), -levels.max(axis=1)))
+    column = SENSOR_COLUMNS.index(sort_by)
+    return np.argsort(-values[:, column] * SENSOR_DIRECTIONS[column], kind='stable')
+
+def remember_fleet_selection():
+    """표에서 고른 행을 그 표를 그릴 때의 설비 ID로 바꿔 세션에 저장하는 콜백
+
+    표의 선택은 행 위치이고, 정렬·필터와 센서 갱신으로 행 순서가 매번 바뀌므로
+    위치 대신 설비 ID를 기억해 두었다가 다음 실행의 표에서 다시 찾는다.
+    """
+    rows = st.session_state['fleet_table'].selection.rows
+    ids = st.session_state.get('fleet_table_ids', [])
+    if rows and rows[0] < len(ids):
+        st.session_state['fleet_selected_id'] = ids[rows[0]]
+    else:
+        st.session_state.pop('fleet_selected_id', None)
+
+def create_fleet_heatmap(table, levels):
+    """설비 × 센서 수준을 한 장의 히트맵으로 그리는 함수 (표의 순서를 따름)"""
+    fig = go.Figure(go.Heatmap(
+        z=levels,
+        x=[SENSOR_LABELS[c] for c in SENSOR_COLUMNS],
+        y=table['Equipment_ID'],
+        customdata=table[SENSOR_COLUMNS].to_numpy(),
+        hovertemplate='%{y} · %{x}: %{customdata:.2f}<extra></extra>',
+        colorscale=STATUS_COLORSCALE,
+        zmin=0,
+        zmax=2,
+        showscale=False,
+        xgap=1,
+        ygap=1
+    ))
+    fig.update_layout(height=max(250, 18 * len(table) + 60), margin=dict(l=10, r=10, t=30, b=10),
+                      yaxis=dict(autorange='reversed'))
+    return fig
+
+@cached_data(copy=False)
+def create_gauge_spec(value, title, min_value, max_value, threshold_values, direction=1):
+    """게이지 차트의 figure 사양(dict)을 생성하는 함수 (표시 정밀도로 반올림한 값 기준으로 캐시)"""
+    return create_gauge(value, title, min_value, max_value, threshold_values, direction).to_plotly_json()
+
+def create_gauge(value, title, min_value, max_value, threshold_values, direction=1):
+    """게이지 차트를 생성하는 함수 (direction이 -1이면 값이 작을수록 나쁨)"""
+    level = classify_thresholds(value, threshold_values[0], threshold_values[1], direction)
+    color = ['green', 'yellow', 'red'][int(level)]
+    threshold_values = sorted(threshold_values)
     fig = go.Figure(go.Indicator(
         mode = "gauge+number",
         value = value,
@@ -46,7 +271,7 @@ def create_gauge(value, title, min_value, max_value, threshold_values):
             'threshold': {
                 'line': {'color': "red", 'width': 4},
                 'thickness': 0.75,
-                'value': threshold_values[1]
+                'value': threshold_values[1] if direction > 0 else threshold_values[0]
             }
         }
     ))
@@ -57,12 +282,66 @@ def show_equipment_status_dashboard():
     st.subheader("설비 상태 모니터링 대시보드")
 
     # 데이터 생성
-    df = generate_equipment_data()
+    num_equipment = st.select_slider("설비 수", options=[6, 60, 600, 3000], value=6)
+    df = generate_equipment_data(num_equipment, EQUIPMENT_SEED)
+    feed = get_sensor_feed(num_equipment)
+    feed.advance()
+    # 상태는 스트리밍 이상 탐지기의 최신 판정, 마지막 정비 일자는 피드의 고정 상태를 사용
+    df['Status'] = feed.detector.status_labels()
+    df['Last_Maintenance'] = feed.last_maintenance
+
+    # 정비 계획 조건: 계획 기간(주)과 근무일당 정비 가능 설비 수
+    col1, col2 = st.columns(2)
+    horizon_weeks = col1.slider("정비 계획 기간 (주)", 1, 12, 4)
+    crew_capacity = col2.number_input("일일 정비 가능 설비 수", 1, 500, max(1, num_equipment // 50))
+    scheduler = get_maintenance_scheduler(num_equipment, horizon_weeks, int(crew_capacity), datetime.now().date())
+    # 점수가 바뀐 설비만 일정에서 다시 배치
+    scores = compute_degradation_scores(feed)
+    replanned = scheduler.replan(dict(zip(df['Equipment_ID'], scores.tolist())), SCORE_TOLERANCE)
 
-    # 설비 선택
-    equipment_id = st.selectbox("설비 선택", df['Equipment_ID'])
-    equipment_data = df[df['Equipment_ID'] == equipment_id].iloc[0]
+    values = feed.store.latest().astype(np.float64)
+    levels = feed.detector.levels
+    table = build_fleet_table(df, values, levels, feed.detector.anomalies())
 
+    # 전체 설비 현황: 서버에서 정렬/필터링한 뒤 상위 행만 한 장의 히트맵으로 표시
+    st.subheader("전체 설비 현황")
+    col1, col2 = st.columns(2)
+    statuses = col1.multiselect("상태 필터", list(STATUS_LABELS), default=list(STATUS_LABELS))
+    sort_options = {'심각도 순': None, **{f"{SENSOR_LABELS[c]} 순": c for c in SENSOR_COLUMNS}}
+    sort_by = sort_options[col2.selectbox("정렬 기준", list(sort_options))]
+    order = sort_fleet_rows(levels, values, sort_by)
+    order = order[np.isin(table['Status'].to_numpy()[order], statuses)]
+    if len(order) == 0:
+        st.info("조건에 맞는 설비가 없습니다.")
+        return
+    view = table.iloc[order].reset_index(drop=True)
+    st.caption(f"{len(view):,} / {len(table):,}개 설비 · 히트맵은 상위 {min(len(view), HEATMAP_MAX_ROWS)}개")
+    st.plotly_chart(create_fleet_heatmap(view.head(HEATMAP_MAX_ROWS), levels[order[:HEATMAP_MAX_ROWS]]),
+                    use_container_width=True)
+
+    # 표에서 선택한 설비만 상세 게이지를 생성 (선택은 설비 ID로 세션에 보관)
+    st.session_state['fleet_table_ids'] = view['Equipment_ID'].tolist()
+    st.dataframe(view, hide_index=True, on_select=remember_fleet_selection, selection_mode="single-row",
+                 key='fleet_table', column_config={
+                     c: st.column_config.NumberColumn(SENSOR_LABELS[c], format='%.2f') for c in SENSOR_COLUMNS
+                 })
+    equipment_id = st.session_state.get('fleet_selected_id')
+    if equipment_id is not None and equipment_id not in st.session_state['fleet_table_ids']:
+        # 필터에서 빠진 설비는 선택을 해제
+        st.info(f"선택한 설비 {equipment_id}이(가) 현재 필터에 없어 선택을 해제했습니다.")
+        del st.session_state['fleet_selected_id']
+        equipment_id = None
+    if equipment_id is None:
+        # 선택이 없으면 필터 안에서 가장 심각한 설비를 표시
+        severity = sort_fleet_rows(levels, values, None)
+        severity = severity[np.isin(table['Status'].to_numpy()[severity], statuses)]
+        equipment_id = table['Equipment_ID'].iloc[severity[0]]
+        st.caption("표에서 설비를 선택하면 상세 정보를 볼 수 있습니다. 현재는 가장 심각한 설비를 표시합니다.")
+    asset = int(np.flatnonzero(df['Equipment_ID'].to_numpy() == equipment_id)[0])
+    equipment_data = df.iloc[asset].copy()
+    equipment_data[SENSOR_COLUMNS] = values[asset]
+
+    st.subheader(f"{equipment_id} 상세")
     # 설비 정보 표시
     col1, col2, col3 = st.columns(3)
     col1.metric("설비 ID", equipment_data['Equipment_ID'])
@@ -73,19 +352,51 @@ def show_equipment_status_dashboard():
 
     # 게이지 차트 생성
     col1, col2 = st.columns(2)
-    with col1:
-        st.plotly_chart(create_gauge(equipment_data['Temperature'], '온도 (°C)', 0, 100, [60, 75]), use_container_width=True)
-        st.plotly_chart(create_gauge(equipment_data['Pressure'], '압력 (bar)', 0, 10, [3, 6]), use_container_width=True)
-    with col2:
-        st.plotly_chart(create_gauge(equipment_data['Vibration'], '진동 (mm/s)', 0, 5, [1, 3]), use_container_width=True)
-        st.plotly_chart(create_gauge(equipment_data['Efficiency'], '효율 (%)', 0, 100, [80, 90]), use_container_width=True)
-
-    # 마지막 정비 일자 및 다음 정비 예정일
-    last_maintenance = equipment_data['Last_Maintenance']
-    next_maintenance = last_maintenance + timedelta(days=90)  # 예: 3개월마다 정비
+    for i, sensor in enumerate(SENSOR_COLUMNS):
+        with (col1 if i % 2 == 0 else col2):
+            st.plotly_chart(create_gauge_spec(round(float(equipment_data[sensor]), 1), SENSOR_LABELS[sensor],
+                                              *SENSOR_RANGES[sensor], SENSOR_THRESHOLDS[sensor],
+                                              int(SENSOR_DIRECTIONS[i])),
+                            use_container_width=True)
+
+    # 이상 신호 (EWMA z 점수, CUSUM)
+    anomalies = feed.detector.anomalies()[asset]
+    if anomalies.any():
+        st.warning("이상 신호 감지: " + ", ".join(
+            f"{SENSOR_LABELS[sensor]} (z={feed.detector.z[asset, i]:.1f}, CUSUM={feed.detector.cusum[asset, i]:.1f})"
+            for i, sensor in enumerate(SENSOR_COLUMNS) if anomalies[i]))
+
+    # 센서 추세 (조회 구간에 맞는 해상도 계층에서 읽음)
+    st.subheader("센서 추세")
     col1, col2 = st.columns(2)
+    window_label = col1.radio("조회 구간", list(TREND_WINDOWS), index=1, horizontal=True)
+    sensor = col2.selectbox("센서", SENSOR_COLUMNS, format_func=SENSOR_LABELS.get)
+    end = feed.store.last_time + 1
+    tier, trend = feed.store.read(asset, end - TREND_WINDOWS[window_label], end)
+    st.plotly_chart(create_trend_chart(trend, sensor), use_container_width=True)
+    st.caption(f"해상도: {TIER_LABELS[tier]} · 시점 {len(trend) // len(SENSOR_COLUMNS):,}개 · "
+               f"이력 저장소 {feed.store.nbytes / 1024**2:.1f} MB")
+
+    # 마지막 정비 일자 및 다음 정비 예정일 (열화 점수 기반 정비 일정)
+    last_maintenance = equipment_data['Last_Maintenance']
+    next_maintenance = scheduler.scheduled_date(equipment_id)
+    col1, col2, col3 = st.columns(3)
     col1.metric("마지막 정비 일자", last_maintenance.strftime('%Y-%m-%d'))
-    col2.metric("다음 정비 예정일", next_maintenance.strftime('%Y-%m-%d'))
+    col2.metric("다음 정비 예정일", next_maintenance.strftime('%Y-%m-%d') if next_maintenance is not None else "계획 기간 이후")
+    col3.metric("열화 점수", f"{scheduler.scores[equipment_id]:.2f}")
+
+    # 정비 일정
+    st.subheader("정비 일정")
+    schedule = scheduler.schedule()
+    st.caption(f"{horizon_weeks}주 동안 {len(schedule):,}개 설비 배정 · 계획 기간 이후 {scheduler.unscheduled():,}개 · "
+               f"이번 갱신에서 다시 배치한 설비 {replanned:,}개")
+    daily = schedule.groupby('date').size()
+    fig_schedule = go.Figure(go.Bar(x=daily.index, y=daily.values))
+    fig_schedule.update_layout(height=250, margin=dict(l=10, r=10, t=10, b=10), yaxis_title="정비 설비 수")
+    st.plotly_chart(fig_schedule, use_container_width=True)
+    st.dataframe(schedule.rename(columns={'date': '정비일', 'asset': '설비 ID', 'score': '열화 점수'}),
+                 hide_index=True, column_config={'열화 점수': st.column_config.NumberColumn(format='%.2f'),
+                                                 '정비일': st.column_config.DateColumn()})
 
     # 전체 설비 상태 요약
     st.subheader("전체 설비 상태 요약")
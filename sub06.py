@@ -3,83 +3,173 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from data_cache import cached_data
+import time
+import threading
+from environmental_field import EnvironmentalField
+from spatial_interpolation import IDWInterpolator
+from streaming_stats import StreamingMoments, group_moments
+from dispersion import STABILITY_CLASSES, plume_concentration, exceedance_areas
 
-def generate_environmental_data(num_points=400):
-    """가상의 환경 데이터를 생성하는 함수"""
-    x = np.linspace(0, 100, 20)
-    y = np.linspace(0, 100, 20)
-    x, y = np.meshgrid(x, y)
-    
-    data = []
-    temperature = 20 + 5 * np.sin(x/10) + 5 * np.cos(y/10) + np.random.rand(20, 20)
-    humidity = 50 + 20 * np.sin(x/15) + 20 * np.cos(y/15) + np.random.rand(20, 20)
-    co2 = 400 + 50 * np.sin(x/20) + 50 * np.cos(y/20) + np.random.rand(20, 20)
-    
-    for i in range(20):
-        for j in range(20):
-            data.append({
-                'x': x[i, j],
-                'y': y[i, j],
-                'Temperature': temperature[i, j],
-                'Humidity': humidity[i, j],
-                'CO2': co2[i, j]
-            })
-    
-    return pd.DataFrame(data)
-
-def create_3d_surface(df, z_column, title):
-    """3D 표면 그래프를 생성하는 함수"""
-    try:
-        z_data = df[z_column].values.reshape(20, 20)
-        fig = go.Figure(data=[go.Surface(z=z_data,
-                                         x=df['x'].unique(),
-                                         y=df['y'].unique())])
-        fig.update_layout(title=title, autosize=False,
-                          width=500, height=500,
-                          scene=dict(
-                              xaxis_title='X',
-                              yaxis_title='Y',
-                              zaxis_title=z_column
-                          ),
-                          margin=dict(l=65, r=50, b=65, t=90))
-        return fig
-    except ValueError as e:
-        st.error(f"데이터 형식 오류: {e}")
-        return go.Figure()
+FIELD_COLUMNS = ['Temperature', 'Humidity', 'CO2']
+FIELD_RESOLUTIONS = [20, 100, 250, 500, 1000]
+SURFACE_MAX_POINTS = 100  # 3D 표면에 표시할 최대 격자 수 (가로세로)
+HEATMAP_MAX_POINTS = 500  # 히트맵에 표시할 최대 격자 수 (가로세로)
+RAW_VIEW_MAX_POINTS = 100  # 원본 데이터 표에 펼칠 최대 격자 수 (가로세로)
+DATA_SOURCES = ['해석 격자', '센서 보간']
+SENSOR_COUNTS = [50, 200, 500]
+READING_INTERVAL_SECONDS = 10  # 센서 측정 주기
+READING_NOISE = np.array([0.3, 1.0, 5.0])  # 변수별 측정 잡음 (표준편차)
+SENSOR_DROPOUT = 0.02  # 측정 주기마다 값이 빠지는 센서 비율
+# 스트리밍 통계: 전체 통계 창별 반감기(측정 주기 수), 셀별 통계 반감기, 한 번에 따라잡을 최대 주기 수
+STREAM_WINDOWS = {'최근 1분': 6, '최근 10분': 60, '누적': None}
+CELL_STATS_HALFLIFE = 60
+STREAM_MAX_CATCHUP = 6
+CELL_VIEWS = ['현재값', '이동 평균', '이동 표준편차']
+# 가스 누출 확산: 격자 좌표 1 단위의 실제 거리(m), 농도 기준(mg/m³)과 등고선 색
+GRID_METERS = 10
+PLUME_THRESHOLDS = {'주의': 1.0, '경고': 10.0, '위험': 50.0}
+PLUME_COLORS = {'주의': '#ffbf00', '경고': '#ff7f0e', '위험': '#d62728'}
+COMPASS_DIRECTIONS = {'북': 0, '북동': 45, '동': 90, '남동': 135, '남': 180, '남서': 225, '서': 270, '북서': 315}
 
-def show_environmental_data_visualization():
-    st.subheader("환경 데이터 시각화")
+def environmental_model(x, y):
+    """좌표에서의 온도/습도/CO2 기준값을 계산하는 함수 (x, y는 브로드캐스트 가능한 배열)"""
+    return {
+        'Temperature': 20 + 5 * np.sin(x / 10) + 5 * np.cos(y / 10),
+        'Humidity': 50 + 20 * np.sin(x / 15) + 20 * np.cos(y / 15),
+        'CO2': 400 + 50 * np.sin(x / 20) + 50 * np.cos(y / 20)
+    }
 
-    # 데이터 생성
-    df = generate_environmental_data()
+def generate_environmental_data(resolution=20, seed=None):
+    """가상의 환경 데이터를 resolution × resolution 격자로 생성하는 함수
 
-    # 3D 그래프 생성
-    col1, col2 = st.columns(2)
-    with col1:
-        st.plotly_chart(create_3d_surface(df, 'Temperature', '온도 분포 (°C)'))
-    with col2:
-        st.plotly_chart(create_3d_surface(df, 'Humidity', '습도 분포 (%)'))
+    측정 주기마다 새로 만드는 격자이므로 표시용 피라미드는 화면에 그릴 때 level_for에서 만든다.
+    """
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 100, resolution)
+    y = np.linspace(0, 100, resolution)
+    shape = (resolution, resolution)
 
-    st.plotly_chart(create_3d_surface(df, 'CO2', 'CO2 농도 분포 (ppm)'), use_container_width=True)
+    # 행은 y, 열은 x 좌표이므로 x는 열 방향, y는 행 방향으로 브로드캐스트
+    layers = {name: values + rng.random(shape, dtype=np.float32)
+              for name, values in environmental_model(x[None, :], y[:, None]).items()}
 
-    # 2D 히트맵
-    st.subheader("2D 히트맵")
-    heatmap_type = st.selectbox("데이터 선택", ['Temperature', 'Humidity', 'CO2'])
-    
-    fig = go.Figure(data=go.Heatmap(
-                    z=df[heatmap_type].values.reshape(20, 20),
-                    x=df['x'].unique(),
-                    y=df['y'].unique()),
-                    )
-    fig.update_layout(title=f'{heatmap_type} 히트맵', 
-                      xaxis_title='X 좌표', 
-                      yaxis_title='Y 좌표')
-    st.plotly_chart(fig, use_container_width=True)
+    return EnvironmentalField(x, y, layers)
+
+@cached_data(copy=False)
+def generate_sensor_layout(num_sensors=200, seed=0):
+    """고정 설치된 환경 센서의 위치 (2 × 센서 수: x, y)를 생성하는 함수"""
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0, 100, size=(2, num_sensors))
+
+def generate_sensor_readings(sensor_x, sensor_y, cycle, seed=0):
+    """측정 주기 cycle의 센서값 (센서 수 × 변수 수)을 생성하는 함수 (일부 센서는 결측)"""
+    rng = np.random.default_rng((seed, cycle))
+    base = np.column_stack(list(environmental_model(sensor_x, sensor_y).values()))
+    # 주기마다 전체 수준이 천천히 변하고 센서마다 측정 잡음이 더해짐
+    drift = 3 * READING_NOISE * np.sin(cycle / 30 + np.arange(len(FIELD_COLUMNS)))
+    readings = base + drift + rng.normal(0, READING_NOISE, size=base.shape)
+    readings[rng.random(len(readings)) < SENSOR_DROPOUT] = np.nan
+    return readings
+
+@st.cache_resource(show_spinner="보간 가중치를 계산하는 중...")
+def get_interpolator(num_sensors, resolution):
+    """센서 배치와 격자 해상도별로 보간 가중치 행렬을 한 번만 계산해 공유"""
+    sensor_x, sensor_y = generate_sensor_layout(num_sensors)
+    grid = np.linspace(0, 100, resolution)
+    return IDWInterpolator(sensor_x, sensor_y, grid, grid)
+
+def interpolate_environmental_data(num_sensors, resolution, cycle):
+    """센서 측정값을 격자로 보간해 (EnvironmentalField, 측정값)으로 반환하는 함수"""
+    interpolator = get_interpolator(num_sensors, resolution)
+    readings = generate_sensor_readings(interpolator.sensor_x, interpolator.sensor_y, cycle)
+    grid = interpolator.interpolate(readings)
+    field = EnvironmentalField(interpolator.grid_x, interpolator.grid_y,
+                               {name: grid[:, :, i] for i, name in enumerate(FIELD_COLUMNS)})
+    return field, readings
+
+def generate_field_cycle(source, resolution, num_sensors, cycle):
+    """측정 주기 cycle의 환경 격자를 생성하는 함수 (해석 격자는 주기마다 잡음만 새로 뽑음)"""
+    if source == '해석 격자':
+        return generate_environmental_data(resolution, seed=cycle)
+    return interpolate_environmental_data(num_sensors, resolution, cycle)[0]
+
+class EnvironmentStream:
+    """측정 주기마다 들어오는 환경 격자를 셀별/전체 스트리밍 통계에 반영하는 스트림
+
+    주기마다 셀별 지수 가중 통계를 한 번 갱신하고, 격자 전체의 묶음 모멘트를 한 번 계산해
+    통계 창(STREAM_WINDOWS)마다 병합하므로 조회할 때 과거 이력을 다시 읽지 않는다.
+    여러 세션이 같은 스트림을 공유하며 실제 경과한 주기만큼만 진행된다.
+    마지막으로 반영한 주기의 격자는 latest_field로 남겨 화면의 현재값 표시에 그대로 쓴다.
+    """
+
+    def __init__(self, source, resolution, num_sensors):
+        self.source = source
+        self.resolution = resolution
+        self.num_sensors = num_sensors
+        self.cells = StreamingMoments((resolution, resolution), len(FIELD_COLUMNS), CELL_STATS_HALFLIFE,
+                                      dtype=np.float32)
+        self.overall = {label: StreamingMoments((), len(FIELD_COLUMNS), halflife)
+                        for label, halflife in STREAM_WINDOWS.items()}
+        self.last_cycle = None
+        self.latest_field = None
+        self.latest_min = self.latest_max = np.full(len(FIELD_COLUMNS), np.nan)
+        self._lock = threading.Lock()
+
+    def advance(self, cycle):
+        """마지막 주기 이후 cycle까지의 격자를 통계에 반영하고 반영한 주기 수를 반환"""
+        with self._lock:
+            if self.last_cycle is not None and cycle <= self.last_cycle:
+                return 0
+            first = cycle - STREAM_MAX_CATCHUP + 1
+            if self.last_cycle is not None:
+                first = max(first, self.last_cycle + 1)
+            for c in range(first, cycle + 1):
+                field = generate_field_cycle(self.source, self.resolution, self.num_sensors, c)
+                values = np.stack([field[name] for name in FIELD_COLUMNS], axis=-1)
+                self.cells.update(values)
+                flat = values.reshape(-1, len(FIELD_COLUMNS)).astype(np.float64)
+                moments = group_moments(flat, self.cells.pairs)
+                for stats in self.overall.values():
+                    stats.merge(*moments)
+                self.latest_min, self.latest_max = flat.min(axis=0), flat.max(axis=0)
+                self.latest_field = field
+            self.last_cycle = cycle
+            return cycle - first + 1
+
+    def cell_field(self, view):
+        """셀별 이동 평균 또는 이동 표준편차를 EnvironmentalField로 반환"""
+        grid = np.linspace(0, 100, self.resolution)
+        values = self.cells.mean if view == '이동 평균' else self.cells.std()
+        return EnvironmentalField(grid, grid, {name: values[..., i] for i, name in enumerate(FIELD_COLUMNS)})
+
+    def summary(self, window):
+        """통계 창의 전체 통계표 (유효 표본 수, 평균, 표준편차, 최근 주기의 최솟값/최댓값)"""
+        table = self.overall[window].summary(FIELD_COLUMNS)
+        table.loc['min (최근 주기)'] = self.latest_min
+        table.loc['max (최근 주기)'] = self.latest_max
+        return table
+
+@st.cache_resource(show_spinner="환경 스트림을 준비하는 중...")
+def get_environment_stream(source, resolution, num_sensors):
+    """데이터 원천과 격자 조건별로 프로세스 단위로 공유되는 환경 스트림"""
+    return EnvironmentStream(source, resolution, num_sensors)
+
+def current_cycle():
+    """현재 측정 주기 번호"""
+    return int(time.time() // READING_INTERVAL_SECONDS)
+
+@st.fragment(run_every=READING_INTERVAL_SECONDS)
+def show_streaming_statistics(stream):
+    """상관 관계와 통계표를 스트리밍 통계에서 읽어 표시 (측정 주기마다 이 부분만 다시 실행)"""
+    stream.advance(current_cycle())
+    window = st.radio("통계 창", list(STREAM_WINDOWS), index=1, horizontal=True)
+    stats = stream.overall[window]
 
     # 상관 관계 분석
     st.subheader("환경 요소 간 상관 관계")
-    corr = df[['Temperature', 'Humidity', 'CO2']].corr()
-    
+    corr = pd.DataFrame(stats.correlation(), index=FIELD_COLUMNS, columns=FIELD_COLUMNS)
+
     fig = go.Figure(data=go.Heatmap(
                     z=corr.values,
                     x=corr.index,
@@ -92,11 +182,149 @@ def show_environmental_data_visualization():
 
     # 데이터 통계
     st.subheader("데이터 통계")
-    st.write(df[['Temperature', 'Humidity', 'CO2']].describe())
+    st.write(stream.summary(window))
+    st.caption(f"측정 주기 {stats.updates:,}회 반영 · 셀별 통계 {stream.cells.nbytes / 1024**2:.1f} MB")
+
+@cached_data(copy=False)
+def generate_leak_sources(num_sources=3, release_rate=10.0, seed=0):
+    """가스 누출원 (누출원 수 × 4: x, y, 배출률 g/s, 높이 m)을 생성하는 함수 (x, y는 격자 좌표)"""
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.uniform(20, 80, num_sources),
+        rng.uniform(20, 80, num_sources),
+        release_rate * rng.uniform(0.5, 1.5, num_sources),
+        rng.uniform(1, 10, num_sources)
+    ])
+
+def compute_leak_scenarios(level, sources, wind_speed, wind_directions, stability):
+    """풍향 시나리오별 지표면 농도장(mg/m³)을 격자 단계 level 위에서 한 번에 계산하는 함수"""
+    meters = sources * [GRID_METERS, GRID_METERS, 1, 1]
+    concentration = plume_concentration(level.x * GRID_METERS, level.y * GRID_METERS, meters,
+                                        np.full(len(wind_directions), wind_speed), wind_directions,
+                                        np.full(len(wind_directions), stability))
+    return concentration * 1000
+
+def add_plume_contours(fig, level, concentration):
+    """히트맵에 농도 기준 초과 경계를 등고선으로 겹쳐 그리는 함수"""
+    for label, threshold in PLUME_THRESHOLDS.items():
+        fig.add_trace(go.Contour(z=concentration, x=level.x, y=level.y, name=f"{label} ({threshold:g} mg/m³)",
+                                 contours=dict(start=threshold, end=threshold, size=threshold, coloring='none'),
+                                 line=dict(color=PLUME_COLORS[label], width=2), showscale=False,
+                                 showlegend=True, hoverinfo='skip'))
+    return fig
+
+def create_3d_surface(field, z_column, title):
+    """3D 표면 그래프를 생성하는 함수 (화면에 맞는 피라미드 단계 사용)"""
+    level = field.level_for(SURFACE_MAX_POINTS)
+    fig = go.Figure(data=[go.Surface(z=level[z_column], x=level.x, y=level.y)])
+    fig.update_layout(title=title, autosize=False,
+                      width=500, height=500,
+                      scene=dict(
+                          xaxis_title='X',
+                          yaxis_title='Y',
+                          zaxis_title=z_column
+                      ),
+                      margin=dict(l=65, r=50, b=65, t=90))
+    return fig
+
+def show_environmental_data_visualization():
+    st.subheader("환경 데이터 시각화")
+
+    # 데이터 생성: 해석 격자 또는 고정 센서 측정값의 보간
+    col1, col2 = st.columns(2)
+    source = col1.radio("데이터 원천", DATA_SOURCES, horizontal=True)
+    resolution = col2.select_slider("격자 해상도", options=FIELD_RESOLUTIONS, value=20)
+    readings = None
+    cycle = current_cycle()
+    if source == '해석 격자':
+        num_sensors = 0
+    else:
+        num_sensors = st.select_slider("센서 수", options=SENSOR_COUNTS, value=200)
+        field, readings = interpolate_environmental_data(num_sensors, resolution, cycle)
+        interpolator = get_interpolator(num_sensors, resolution)
+        st.caption(f"센서 {num_sensors}개 · 결측 {int(np.isnan(readings[:, 0]).sum())}개 · "
+                   f"보간 가중치 {interpolator.weights.nnz:,}개 ({interpolator.nbytes / 1024**2:.1f} MB) · "
+                   f"{READING_INTERVAL_SECONDS}초마다 갱신")
+    stream = get_environment_stream(source, resolution, num_sensors)
+    stream.advance(cycle)
+    if source == '해석 격자':
+        # 통계에 반영된 최근 주기의 격자를 그대로 표시해 히트맵과 통계가 같은 데이터를 보게 함
+        field, cycle = stream.latest_field, stream.last_cycle
+    surface_shape = field.level_for(SURFACE_MAX_POINTS).shape
+    st.caption(f"측정 주기 {cycle} · 격자 {resolution:,} × {resolution:,} · 표면 표시 {surface_shape[0]} × {surface_shape[1]} · "
+               f"메모리 {field.nbytes / 1024**2:.1f} MB")
+
+    # 3D 그래프 생성
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(create_3d_surface(field, 'Temperature', '온도 분포 (°C)'))
+    with col2:
+        st.plotly_chart(create_3d_surface(field, 'Humidity', '습도 분포 (%)'))
+
+    st.plotly_chart(create_3d_surface(field, 'CO2', 'CO2 농도 분포 (ppm)'), use_container_width=True)
+
+    # 2D 히트맵
+    st.subheader("2D 히트맵")
+    col1, col2 = st.columns(2)
+    heatmap_type = col1.selectbox("데이터 선택", FIELD_COLUMNS)
+    cell_view = col2.radio("표시 값", CELL_VIEWS, horizontal=True)
+    shown = field if cell_view == '현재값' else stream.cell_field(cell_view)
+    level = shown.level_for(HEATMAP_MAX_POINTS)
+
+    # 가스 누출 확산 (가우시안 플룸): 선택한 풍향과 8방위 비교 시나리오를 함께 계산
+    show_plume = st.checkbox("가스 누출 확산 표시")
+    if show_plume:
+        col1, col2, col3 = st.columns(3)
+        num_sources = col1.slider("누출원 수", 1, 10, 3)
+        release_rate = col1.number_input("배출률 (g/s)", 0.1, 1000.0, 10.0)
+        wind_speed = col2.slider("풍속 (m/s)", 0.5, 15.0, 3.0)
+        wind_direction = col2.select_slider("풍향 (불어오는 방향)", options=list(COMPASS_DIRECTIONS), value='서')
+        stability = col3.selectbox("대기 안정도", STABILITY_CLASSES, index=3)
+        sources = generate_leak_sources(num_sources, release_rate)
+        started = time.perf_counter()
+        plume = compute_leak_scenarios(level, sources, wind_speed,
+                                       [COMPASS_DIRECTIONS[wind_direction]] + list(COMPASS_DIRECTIONS.values()),
+                                       STABILITY_CLASSES.index(stability))
+        plume_seconds = time.perf_counter() - started
+
+    fig = go.Figure(data=go.Heatmap(
+                    z=level[heatmap_type],
+                    x=level.x,
+                    y=level.y),
+                    )
+    if readings is not None:
+        # 센서 위치 표시 (결측 센서는 빈 원)
+        observed = ~np.isnan(readings[:, 0])
+        fig.add_trace(go.Scatter(x=interpolator.sensor_x, y=interpolator.sensor_y, mode='markers', name='센서',
+                                 marker=dict(size=6, color='white', line=dict(width=1, color='black'),
+                                             symbol=np.where(observed, 'circle', 'circle-open'))))
+    fig.update_layout(title=f'{heatmap_type} 히트맵 ({cell_view})', 
+                      xaxis_title='X 좌표', 
+                      yaxis_title='Y 좌표')
+    if show_plume:
+        add_plume_contours(fig, level, plume[0])
+        fig.add_trace(go.Scatter(x=sources[:, 0], y=sources[:, 1], mode='markers', name='누출원',
+                                 marker=dict(size=10, color='black', symbol='x')))
+    st.plotly_chart(fig, use_container_width=True)
+
+    if show_plume:
+        # 같은 풍속/안정도에서 8방위 풍향별 기준 초과 면적 (한 번의 배치 계산 결과)
+        areas = exceedance_areas(plume[1:], PLUME_THRESHOLDS.values(), (np.diff(level.x).mean() * GRID_METERS) ** 2)
+        st.write("풍향별 기준 초과 면적 (m²)")
+        st.dataframe(pd.DataFrame(areas, index=pd.Index(list(COMPASS_DIRECTIONS), name='풍향'),
+                                  columns=list(PLUME_THRESHOLDS)).round(0))
+        st.caption(f"계산 격자 {level.shape[0]} × {level.shape[1]} · 누출원 {len(sources)}개 × "
+                   f"풍향 시나리오 {len(plume)}개 · {plume_seconds * 1000:.0f} ms")
+
+    # 상관 관계와 통계는 스트리밍 통계에서 읽음
+    show_streaming_statistics(stream)
 
     # 원본 데이터 표시 (옵션)
     if st.checkbox("원본 데이터 보기"):
-        st.write(df)
+        raw = field.level_for(RAW_VIEW_MAX_POINTS)
+        if raw is not field:
+            st.caption(f"격자가 커서 {raw.shape[0]} × {raw.shape[1]} 블록 평균으로 표시합니다.")
+        st.write(raw.to_frame())
 
 if __name__ == "__main__":
     show_environmental_data_visualization()
@@ -3,28 +3,57 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
+import time
+from data_cache import cached_data
+from compliance_tensor import ComplianceTensor, pack_days, WORD_DAYS
 
-def generate_compliance_data(num_departments=10, num_rules=15):
-    """가상의 안전 규정 준수 데이터를 생성하는 함수"""
+# 조직 규모: (부서 수, 규정 수, 점검 일수)
+COMPLIANCE_SCALES = {
+    '기본 (10개 부서 × 15개 규정, 1년)': (10, 15, 365),
+    '사업부 (500개 부서 × 100개 규정, 1년)': (500, 100, 365),
+    '그룹 (3,000개 부서 × 300개 규정, 3년)': (3000, 300, 1095)
+}
+PERIODS = {'최근 점검': None, '최근 7일': 7, '최근 30일': 30, '최근 1년': 365}
+GENERATE_CHUNK_BYTES = 64 * 1024**2  # 생성 시 한 번에 만드는 일별 난수 바이트 수
+CHART_MAX_ITEMS = 50  # 막대 그래프에 표시할 최대 부서/규정 수 (넘으면 준수율 하위 항목)
+RAW_VIEW_MAX_ROWS = 5000  # 원본 데이터 표에 펼칠 최대 행 수
+ROW_FRAME_BYTES = 50  # 일별 점검 한 건을 DataFrame 행(부서, 규정, 준수 여부, 점검일)으로 둘 때의 메모리
+COMPLIANCE_SEED = 0  # 점검 데이터 생성 시드
+
+@cached_data(copy=False)
+def generate_compliance_data(num_departments=10, num_rules=15, num_days=365, seed=None):
+    """가상의 안전 규정 일일 점검 데이터를 부서 × 규정 × 일자 비트 텐서로 생성하는 함수"""
+    rng = np.random.default_rng(seed)
     departments = [f'부서 {i+1}' for i in range(num_departments)]
     rules = [f'규정 {i+1}' for i in range(num_rules)]
-    
-    data = []
-    for dept in departments:
-        for rule in rules:
-            compliance = np.random.choice([0, 1], p=[0.1, 0.9])  # 90% 확률로 준수
-            data.append({
-                'Department': dept,
-                'Rule': rule,
-                'Compliance': compliance,
-                'LastChecked': pd.Timestamp.now() - pd.Timedelta(days=np.random.randint(0, 30))
-            })
-    
-    return pd.DataFrame(data)
-
-def create_compliance_bar_chart(df):
+
+    # 부서/규정별 준수 확률 (평균 90%)을 0~256 바이트 기준값으로 바꿔 난수 바이트와 비교
+    probability = np.clip(0.9 + rng.normal(0, 0.04, (num_departments, 1)) + rng.normal(0, 0.03, (1, num_rules)),
+                          0.5, 0.99)
+    thresholds = np.round(probability * 256).astype(np.uint16)
+    # 마지막 점검일은 최근 30일 이내, 그 이후 일자는 점검 전
+    last_checked = num_days - 1 - rng.integers(0, 30, (num_departments, num_rules))
+
+    words = np.empty((num_departments, num_rules, -(-num_days // WORD_DAYS)), dtype='<u8')
+    days = np.arange(num_days)
+    chunk = max(1, GENERATE_CHUNK_BYTES // (num_rules * num_days))
+    for start in range(0, num_departments, chunk):
+        end = min(start + chunk, num_departments)
+        compliant = rng.integers(0, 256, (end - start, num_rules, num_days), dtype=np.uint8) < thresholds[start:end, :, None]
+        compliant &= days <= last_checked[start:end, :, None]
+        words[start:end] = pack_days(compliant)
+
+    start_date = pd.Timestamp.now().normalize() - pd.Timedelta(days=num_days - 1)
+    return ComplianceTensor(departments, rules, start_date, num_days, words, last_checked)
+
+def select_for_chart(labels, rates):
+    """막대 그래프용 (이름, 준수율)을 준수율 내림차순으로 고름 (항목이 많으면 하위 CHART_MAX_ITEMS개)"""
+    order = np.argsort(rates, kind='stable')[:CHART_MAX_ITEMS][::-1] if len(rates) > CHART_MAX_ITEMS \
+        else np.argsort(-rates, kind='stable')
+    return pd.Series(rates[order], index=np.asarray(labels)[order])
+
+def create_compliance_bar_chart(dept_compliance):
     """부서별 준수율 막대 그래프를 생성하는 함수"""
-    dept_compliance = df.groupby('Department')['Compliance'].mean().sort_values(ascending=False)
     fig = go.Figure(data=[
         go.Bar(x=dept_compliance.index, y=dept_compliance.values * 100,
                text=[f'{val:.1f}%' for val in dept_compliance.values * 100],
@@ -40,18 +69,36 @@ def show_safety_compliance_dashboard():
     st.subheader("안전 규정 준수율 대시보드")
 
     # 데이터 생성
-    df = generate_compliance_data()
+    col1, col2 = st.columns(2)
+    scale = col1.selectbox("조직 규모", list(COMPLIANCE_SCALES))
+    period = col2.radio("집계 기간", list(PERIODS), horizontal=True)
+    tensor = generate_compliance_data(*COMPLIANCE_SCALES[scale], seed=COMPLIANCE_SEED)
+
+    # 기간 집계: 부서 × 규정별 (준수 수, 점검 수)를 비트 popcount로 한 번 계산하고 축별로 합침
+    started = time.perf_counter()
+    compliant, checked = tensor.recent_counts(PERIODS[period])
+    dept_rates = tensor.rates(compliant, checked, axis=1)
+    rule_rates = tensor.rates(compliant, checked, axis=0)
+    overall_compliance = tensor.rates(compliant, checked) * 100
+    elapsed = time.perf_counter() - started
+    num_departments, num_rules, num_days = tensor.shape
+    st.caption(f"부서 {num_departments:,} × 규정 {num_rules:,} × {num_days:,}일 · "
+               f"비트 텐서 {tensor.nbytes / 1024**2:.1f} MB "
+               f"(일별 행 DataFrame 추정 {num_departments * num_rules * num_days * ROW_FRAME_BYTES / 1024**2:,.1f} MB) · "
+               f"집계 {elapsed * 1000:.1f} ms")
 
     # 전체 준수율 계산
-    overall_compliance = df['Compliance'].mean() * 100
     st.metric("전체 안전 규정 준수율", f"{overall_compliance:.1f}%")
 
     # 부서별 준수율 막대 그래프
-    st.plotly_chart(create_compliance_bar_chart(df), use_container_width=True)
+    dept_compliance = select_for_chart(tensor.departments, dept_rates)
+    if len(dept_compliance) < num_departments:
+        st.caption(f"준수율 하위 {len(dept_compliance)}개 부서만 표시합니다.")
+    st.plotly_chart(create_compliance_bar_chart(dept_compliance), use_container_width=True)
 
     # 규정별 준수율
     st.subheader("규정별 준수율")
-    rule_compliance = df.groupby('Rule')['Compliance'].mean().sort_values(ascending=False)
+    rule_compliance = select_for_chart(tensor.rules, rule_rates)
     fig = px.bar(x=rule_compliance.index, y=rule_compliance.values * 100,
                  labels={'x': '규정', 'y': '준수율 (%)'},
                  title='규정별 준수율')
@@ -60,28 +107,33 @@ def show_safety_compliance_dashboard():
     st.plotly_chart(fig, use_container_width=True)
 
     # 부서 선택
-    selected_dept = st.selectbox("부서 선택", df['Department'].unique())
+    selected_dept = st.selectbox("부서 선택", tensor.departments)
+    dept = tensor.departments.get_loc(selected_dept)
 
     # 선택된 부서의 규정 준수 현황
     st.subheader(f"{selected_dept} 규정 준수 현황")
-    dept_data = df[df['Department'] == selected_dept]
+    status = tensor.latest_status()[dept]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        period_rates = compliant[dept] / checked[dept] * 100
     fig = go.Figure(data=[
         go.Table(
-            header=dict(values=['규정', '준수 여부', '마지막 점검일'],
+            header=dict(values=['규정', '준수 여부', f'준수율 ({period})', '마지막 점검일'],
                         fill_color='paleturquoise',
                         align='left'),
-            cells=dict(values=[dept_data['Rule'], 
-                               dept_data['Compliance'].map({1: '준수', 0: '미준수'}),
-                               dept_data['LastChecked'].dt.strftime('%Y-%m-%d')],
-                       fill_color=['white', 
-                                   dept_data['Compliance'].map({1: 'lightgreen', 0: 'lightsalmon'})],
+            cells=dict(values=[tensor.rules,
+                               np.where(status, '준수', '미준수'),
+                               [f'{val:.1f}%' for val in period_rates],
+                               pd.DatetimeIndex(tensor.last_checked_dates()[dept]).strftime('%Y-%m-%d')],
+                       fill_color=['white',
+                                   np.where(status, 'lightgreen', 'lightsalmon')],
                        align='left'))
     ])
     st.plotly_chart(fig, use_container_width=True)
 
     # 미준수 항목 분석
     st.subheader("미준수 항목 분석")
-    non_compliance = df[df['Compliance'] == 0].groupby('Rule').size().sort_values(ascending=False)
+    non_compliance = pd.Series((checked - compliant).sum(axis=0), index=tensor.rules)
+    non_compliance = non_compliance[non_compliance > 0].nlargest(CHART_MAX_ITEMS)
     if not non_compliance.empty:
         fig = px.bar(x=non_compliance.index, y=non_compliance.values,
                      labels={'x': '규정', 'y': '미준수 횟수'},
@@ -90,9 +142,12 @@ def show_safety_compliance_dashboard():
     else:
         st.write("모든 규정이 준수되었습니다.")
 
-    # 원본 데이터 표시 (옵션)
+    # 원본 데이터 표시 (옵션): 마지막 점검 현황을 앞쪽 부서부터 펼침
     if st.checkbox("원본 데이터 보기"):
-        st.write(df)
+        shown = min(num_departments, max(1, RAW_VIEW_MAX_ROWS // num_rules))
+        if shown < num_departments:
+            st.caption(f"앞쪽 {shown}개 부서의 마지막 점검 현황만 표시합니다.")
+        st.write(tensor.to_frame(np.arange(shown)))
 
 if __name__ == "__main__":
-    show_safety_compliance_dashboard()
\ No newline at end of file
+    show_safety_compliance_dashboard()
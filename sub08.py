@@ -3,7 +3,9 @@ import folium
 from streamlit_folium import folium_static
 import random
 import numpy as np
+from data_cache import cached_data
 
+@cached_data()
 def generate_emergency_scenarios():
     """비상 상황 시나리오를 생성하는 함수"""
     return {
@@ -14,15 +16,19 @@ def generate_emergency_scenarios():
         "태풍": {"위험도": "중간", "대피시간": "30분", "영향범위": "전체"}
     }
 
-def generate_evacuation_routes(center_lat, center_lon):
+ROUTE_SEED = 0  # 대피 경로 생성 시드
+
+@cached_data()
+def generate_evacuation_routes(center_lat, center_lon, seed=None):
     """가상의 대피 경로를 생성하는 함수"""
+    rng = random.Random(seed)
     routes = []
     for _ in range(3):  # 3개의 대피 경로 생성
         route = []
         current_lat, current_lon = center_lat, center_lon
         for _ in range(5):  # 각 경로는 5개의 지점으로 구성
-            current_lat += random.uniform(-0.001, 0.001)
-            current_lon += random.uniform(-0.001, 0.001)
+            current_lat += rng.uniform(-0.001, 0.001)
+            current_lon += rng.uniform(-0.001, 0.001)
             route.append((current_lat, current_lon))
         routes.append(route)
     return routes
@@ -67,7 +73,7 @@ def show_emergency_response_simulator():
     center_lat, center_lon = 35.5383773, 129.3113596
 
     # 대피 경로 생성
-    routes = generate_evacuation_routes(center_lat, center_lon)
+    routes = generate_evacuation_routes(center_lat, center_lon, ROUTE_SEED)
 
     # 지도 생성
     m = create_emergency_map(center_lat, center_lon, selected_scenario, routes)
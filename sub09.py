@@ -4,20 +4,25 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
+from data_cache import cached_data
 
-def generate_ppe_data(num_workers=100, num_days=30):
+PPE_DATA_SEED = 0  # 작업자 구성과 착용 기록 생성 시드
+
+@cached_data()
+def generate_ppe_data(num_workers=100, num_days=30, seed=None):
     """가상의 PPE 착용 데이터를 생성하는 함수"""
+    rng = np.random.default_rng(seed)
     ppe_types = ['안전모', '안전화', '보안경', '장갑', '마스크']
     departments = ['생산부', '정비부', '품질관리부', '연구개발부', '물류부']
     
     data = []
     for _ in range(num_workers):
-        worker_id = f'W{np.random.randint(1000, 9999)}'
-        department = np.random.choice(departments)
+        worker_id = f'W{rng.integers(1000, 9999)}'
+        department = rng.choice(departments)
         for day in range(num_days):
             date = datetime.now().date() - timedelta(days=num_days-day-1)
             for ppe in ppe_types:
-                wearing = np.random.choice([True, False], p=[0.95, 0.05])  # 95% 확률로 착용
+                wearing = bool(rng.choice([True, False], p=[0.95, 0.05]))  # 95% 확률로 착용
                 data.append({
                     'Date': date,
                     'Worker_ID': worker_id,
@@ -32,7 +37,7 @@ def show_ppe_monitoring_dashboard():
     st.subheader("PPE 착용 현황 모니터링 대시보드")
 
     # 데이터 생성
-    df = generate_ppe_data()
+    df = generate_ppe_data(seed=PPE_DATA_SEED)
 
     # 최신 날짜의 데이터만 선택
     latest_date = df['Date'].max()
@@ -4,7 +4,9 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from scipy import stats
+from data_cache import cached_data
 
+@cached_data()
 def generate_safety_training_data(num_departments=20, num_months=12):
     """가상의 안전 교육 및 사고 데이터를 생성하는 함수"""
     np.random.seed(42)  # 재현 가능성을 위한 시드 설정
@@ -0,0 +1,122 @@
+import streamlit as st
+import pydeck as pdk
+import pandas as pd
+import numpy as np
+import time
+from sub01 import SAFETY_DATA_SEED, generate_safety_data
+from sub04 import SIMULATION_SEED, generate_worker_movement_data
+from spatial_index import SpatialIndex
+
+def get_hazard_points(num_points=1000):
+    """안전 지도 데이터에서 '위험' 지점만 추출하는 함수"""
+    df = generate_safety_data(num_points, SAFETY_DATA_SEED)
+    hazards = df[df['safety_level'] == '위험'].reset_index(drop=True)
+    hazards['hazard_id'] = [f'H-{i+1:05d}' for i in range(len(hazards))]
+    return hazards
+
+def get_worker_positions(df, step):
+    """각 작업자의 step번째 위치를 추출하는 함수"""
+    return df.groupby('worker_id', sort=False).nth(step).reset_index(drop=True)
+
+def find_proximity_alerts(index, hazards, workers, radius):
+    """위험 지점 반경 안에 있는 작업자를 찾아 경보 목록을 생성하는 함수"""
+    worker_idx, hazard_idx, distance = index.query_radius_pairs(workers['latitude'], workers['longitude'], radius)
+    alerts = pd.DataFrame({
+        'worker_id': workers['worker_id'].to_numpy()[worker_idx],
+        'hazard_id': hazards['hazard_id'].to_numpy()[hazard_idx],
+        'distance_m': distance
+    })
+    return alerts.sort_values('distance_m').reset_index(drop=True)
+
+def find_nearest_hazards(index, hazards, workers, k=1):
+    """작업자별로 가장 가까운 위험 지점을 찾는 함수"""
+    distance, idx = index.query_knn(workers['latitude'], workers['longitude'], k=k)
+    distance, idx = distance.reshape(len(workers), -1), idx.reshape(len(workers), -1)
+    return pd.DataFrame({
+        'worker_id': np.repeat(workers['worker_id'].to_numpy(), distance.shape[1]),
+        'hazard_id': hazards['hazard_id'].to_numpy()[idx.ravel()],
+        'distance_m': distance.ravel()
+    })
+
+def create_proximity_chart(hazards, workers, alert_workers, radius):
+    """위험 지점 반경과 작업자 위치를 표시하는 지도를 생성하는 함수"""
+    workers = workers.assign(alert=workers['worker_id'].isin(alert_workers))
+    workers['color'] = np.where(workers['alert'].to_numpy()[:, None],
+                                [[255, 0, 0, 220]], [[0, 128, 255, 200]]).tolist()
+    hazard_layer = pdk.Layer(
+        "ScatterplotLayer",
+        hazards[['lat', 'lon']].assign(label=hazards['hazard_id']),
+        get_position=['lon', 'lat'],
+        get_fill_color=[255, 0, 0, 40],
+        get_line_color=[255, 0, 0, 160],
+        stroked=True,
+        get_radius=radius,
+        pickable=True
+    )
+    worker_layer = pdk.Layer(
+        "ScatterplotLayer",
+        workers[['latitude', 'longitude', 'color']].assign(label=workers['worker_id']),
+        get_position=['longitude', 'latitude'],
+        get_fill_color='color',
+        get_radius=30,
+        radius_min_pixels=3,
+        pickable=True
+    )
+    view_state = pdk.ViewState(
+        latitude=workers['latitude'].mean(),
+        longitude=workers['longitude'].mean(),
+        zoom=12,
+        pitch=0
+    )
+    return pdk.Deck(
+        layers=[hazard_layer, worker_layer],
+        initial_view_state=view_state,
+        tooltip={"text": "{label}"}
+    )
+
+def show_proximity_alert_panel():
+    st.subheader("위험 지역 근접 경보")
+
+    col1, col2, col3, col4 = st.columns(4)
+    num_sensors = col1.select_slider("안전 센서 수", options=[100, 1000, 10000, 100000], value=1000)
+    num_workers = col2.select_slider("작업자 수", options=[5, 50, 500, 5000], value=50)
+    radius = col3.slider("경보 반경 (m)", 50, 2000, 300, step=50)
+    num_samples = 100
+    step = col4.slider("시점 (샘플 순번)", 0, num_samples - 1, 0)
+
+    # 위험 지점 인덱스 생성 및 작업자 위치 추출
+    hazards = get_hazard_points(num_sensors)
+    if hazards.empty:
+        st.write("현재 '위험' 지점이 없습니다.")
+        return
+    movement = generate_worker_movement_data(num_workers, num_samples, SIMULATION_SEED)
+    workers = get_worker_positions(movement, step)
+
+    start = time.perf_counter()
+    index = SpatialIndex(hazards['lat'], hazards['lon'])
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    alerts = find_proximity_alerts(index, hazards, workers, radius)
+    nearest = find_nearest_hazards(index, hazards, workers)
+    query_time = time.perf_counter() - start
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("위험 지점 수", f"{len(hazards):,}개")
+    col2.metric("경보 대상 작업자", f"{alerts['worker_id'].nunique():,}명")
+    col3.metric("근접 경보 건수", f"{len(alerts):,}건")
+    st.caption(f"인덱스 생성 {build_time * 1000:.1f} ms · 전체 작업자 일괄 질의 {query_time * 1000:.1f} ms")
+
+    st.pydeck_chart(create_proximity_chart(hazards, workers, alerts['worker_id'].unique(), radius))
+
+    st.subheader("근접 경보 목록")
+    if alerts.empty:
+        st.write(f"반경 {radius}m 안에 있는 작업자가 없습니다.")
+    else:
+        st.dataframe(alerts, hide_index=True)
+
+    st.subheader("작업자별 최근접 위험 지점")
+    st.dataframe(nearest.sort_values('distance_m'), hide_index=True)
+
+if __name__ == "__main__":
+    show_proximity_alert_panel()
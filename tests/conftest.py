@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 페이지 모듈은 저장소 루트의 평면 모듈이므로 루트를 import 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from compliance_tensor import ComplianceTensor, pack_days, popcount
+
+START_DATE = '2024-01-01'
+
+def random_tensor(rng, num_departments=6, num_rules=5, num_days=200):
+    dense = rng.random((num_departments, num_rules, num_days)) < 0.7
+    last_checked = rng.integers(0, num_days, size=(num_departments, num_rules))
+    tensor = ComplianceTensor.from_dense(range(num_departments), range(num_rules), START_DATE, dense, last_checked)
+    checked = np.arange(num_days) <= last_checked[..., None]
+    return tensor, dense & checked, checked
+
+def test_popcount_matches_dense_sum(monkeypatch):
+    rng = np.random.default_rng(0)
+    flags = rng.random((4, 3, 300)) < 0.5
+    assert (popcount(pack_days(flags)) == flags.sum(axis=-1)).all()
+    # bitwise_count가 없는 NumPy의 바이트 조회표 경로
+    monkeypatch.delattr(np, 'bitwise_count', raising=False)
+    assert (popcount(pack_days(flags)) == flags.sum(axis=-1)).all()
+
+def test_window_counts_match_dense_sum():
+    rng = np.random.default_rng(1)
+    tensor, dense, checked = random_tensor(rng)
+    for _ in range(200):
+        start, end = np.sort(rng.integers(-10, tensor.num_days + 10, size=2))
+        compliant, num_checked = tensor.window_counts(start, end)
+        window = slice(max(start, 0), max(min(end, tensor.num_days), 0))
+        assert (compliant == dense[..., window].sum(axis=-1)).all()
+        assert (num_checked == checked[..., window].sum(axis=-1)).all()
+
+def test_status_lookups_match_dense():
+    rng = np.random.default_rng(2)
+    tensor, dense, _ = random_tensor(rng)
+    for day in rng.integers(0, tensor.num_days, size=20):
+        assert (tensor.status_on(day) == dense[..., day]).all()
+        assert tensor.day_index(pd.Timestamp(START_DATE) + pd.Timedelta(days=int(day))) == day
+    latest = np.take_along_axis(dense, tensor.last_checked[..., None], axis=-1)[..., 0]
+    assert (tensor.latest_status() == latest).all()
+    compliant, num_checked = tensor.recent_counts(30)
+    assert (compliant == dense[..., -30:].sum(axis=-1)).all()
+    assert np.isclose(ComplianceTensor.rates(compliant, num_checked), compliant.sum() / num_checked.sum())
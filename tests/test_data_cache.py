@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_cache import cached_data
+
+@cached_data(copy=True)
+def total(values):
+    return float(np.sum(values))
+
+@cached_data(copy=True)
+def split(num_rows):
+    frame = pd.DataFrame({'a': np.arange(num_rows)})
+    return frame, {'values': np.arange(num_rows)}
+
+def test_large_arrays_differing_in_elided_middle_get_separate_keys():
+    first = np.zeros(5000)
+    second = first.copy()
+    second[2500] = 1.0
+    assert repr(first) == repr(second)
+    assert total(first) == 0.0
+    assert total(second) == 1.0
+
+def test_frames_are_keyed_by_content():
+    first = pd.DataFrame({'a': np.zeros(5000)})
+    second = first.copy()
+    second.loc[2500, 'a'] = 1.0
+    assert total(first['a']) == 0.0
+    assert total(second['a']) == 1.0
+    assert total(first.rename(columns={'a': 'b'})['b']) == 0.0
+
+def test_object_arrays_are_rejected():
+    with pytest.raises(TypeError):
+        total(np.array([1, 'a'], dtype=object))
+
+def test_values_inside_containers_are_copied():
+    frame, extra = split(10)
+    frame['b'] = 1
+    extra['values'][:] = -1
+    frame, extra = split(10)
+    assert list(frame.columns) == ['a']
+    assert (extra['values'] == np.arange(10)).all()
+
+class Holder:
+    def __init__(self, values):
+        self.values = values
+
+@cached_data(copy=True)
+def holder(num_rows):
+    return Holder(np.arange(num_rows))
+
+def test_shared_objects_have_read_only_arrays():
+    with pytest.raises(ValueError):
+        holder(10).values[0] = -1
+    assert (holder(10).values == np.arange(10)).all()
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from maintenance_scheduler import MaintenanceScheduler
+
+START_DATE = '2026-10-19'  # 월요일
+
+def random_fleet(rng, num_assets):
+    return {f'EQ-{i:03d}': float(score) for i, score in enumerate(rng.random(num_assets).round(3))}
+
+def assert_valid(scheduler):
+    # 날짜별 인원 한도
+    for day, heap in enumerate(scheduler.days):
+        assert len(heap) <= scheduler.capacity[day]
+    # 앞 날짜의 최저 점수가 뒤 날짜의 최고 점수 이상이고, 대기열은 마지막 배정보다 낮음
+    scores = [[score for score, _ in heap] for heap in scheduler.days if heap]
+    for earlier, later in zip(scores, scores[1:]):
+        assert min(earlier) >= max(later)
+    if scheduler.backlog and scores:
+        assert -scheduler.backlog[0][0] <= min(scores[-1])
+    # 빈자리가 있으면 대기열이 비어 있음
+    if sum(map(len, scheduler.days)) < scheduler.capacity.sum():
+        assert not scheduler.backlog
+
+def test_build_respects_capacity_weekends_and_order():
+    rng = np.random.default_rng(0)
+    scheduler = MaintenanceScheduler(START_DATE, 14, 3).build(random_fleet(rng, 40))
+    assert_valid(scheduler)
+    assert scheduler.capacity.sum() == 30
+    assert scheduler.unscheduled() == 10
+    schedule = scheduler.schedule()
+    assert (schedule.groupby('date').size() <= 3).all()
+    assert (pd.DatetimeIndex(schedule['date']).dayofweek < 5).all()
+
+def test_single_update_matches_full_build():
+    rng = np.random.default_rng(1)
+    for num_assets in [5, 30, 80]:
+        scores = random_fleet(rng, num_assets)
+        scheduler = MaintenanceScheduler(START_DATE, 14, 4).build(scores)
+        for _ in range(30):
+            asset = f'EQ-{rng.integers(num_assets):03d}'
+            scores[asset] = round(float(rng.random()), 3)
+            scheduler.update(asset, scores[asset])
+            assert_valid(scheduler)
+            expected = MaintenanceScheduler(START_DATE, 14, 4).build(scores)
+            pd.testing.assert_frame_equal(scheduler.schedule(), expected.schedule())
+            assert scheduler.unscheduled() == expected.unscheduled()
+
+def test_remove_pulls_backlog_forward():
+    rng = np.random.default_rng(2)
+    scores = random_fleet(rng, 40)
+    scheduler = MaintenanceScheduler(START_DATE, 14, 3).build(scores)
+    first = scheduler.schedule()['asset'].iloc[0]
+    scheduler.remove(first)
+    del scores[first]
+    assert_valid(scheduler)
+    pd.testing.assert_frame_equal(scheduler.schedule(),
+                                  MaintenanceScheduler(START_DATE, 14, 3).build(scores).schedule())
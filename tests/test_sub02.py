@@ -0,0 +1,40 @@
+from datetime import date, timedelta
+
+from forecast_models import FittedModelStore, MODEL_LABELS
+from sub02 import SITES, generate_accident_data
+
+def test_appended_day_keeps_history_and_version():
+    today = date(2026, 10, 17)
+    first = generate_accident_data.uncached(365, SITES[0], today)
+    second = generate_accident_data.uncached(365, SITES[0], today + timedelta(days=1))
+    assert first.attrs['version'] == second.attrs['version']
+    overlap = first.merge(second, on='date', suffixes=('_first', '_second'))
+    assert len(overlap) == 364
+    assert (overlap['accidents_first'] == overlap['accidents_second']).all()
+
+def test_appended_data_updates_model_instead_of_refitting():
+    site = SITES[1]
+    today = date(2026, 10, 17)
+    store = FittedModelStore()
+    for model_name in MODEL_LABELS:
+        first = generate_accident_data.uncached(365, site, today)
+        _, status = store.get(site, model_name, first, first.attrs['version'])
+        assert status == 'fitted'
+
+        second = generate_accident_data.uncached(365, site, today + timedelta(days=1))
+        model, status = store.get(site, model_name, second, second.attrs['version'])
+        assert status == 'updated'
+        assert model.last_date == today + timedelta(days=1)
+
+        _, status = store.get(site, model_name, second, second.attrs['version'])
+        assert status == 'cached'
+
+def test_other_site_or_period_refits():
+    today = date(2026, 10, 17)
+    store = FittedModelStore()
+    data = generate_accident_data.uncached(365, SITES[2], today)
+    store.get(SITES[2], 'ewma', data, data.attrs['version'])
+    longer = generate_accident_data.uncached(730, SITES[2], today)
+    assert longer.attrs['version'] != data.attrs['version']
+    _, status = store.get(SITES[2], 'ewma', longer, longer.attrs['version'])
+    assert status == 'fitted'
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from sub03 import advance_safety_rollup, build_safety_rollup, generate_department_rows
+
+END_DATE = pd.Timestamp('2026-10-17')
+
+def test_department_chunks_match_full_generation():
+    full = generate_department_rows(np.arange(7), 7, END_DATE, 40)
+    chunk = generate_department_rows(np.arange(2, 5), 7, END_DATE, 40)
+    pd.testing.assert_frame_equal(full.iloc[2 * 40:5 * 40].reset_index(drop=True), chunk)
+
+def test_appended_day_keeps_existing_rows():
+    first = generate_department_rows(np.arange(7), 7, END_DATE, 40)
+    second = generate_department_rows(np.arange(7), 7, END_DATE + pd.Timedelta(days=1), 40)
+    overlap = first.merge(second, on=['Date', 'Department'], suffixes=('_first', '_second'))
+    assert len(overlap) == 7 * 39
+    for column in ['Incidents', 'Compliance_Rate', 'Training_Hours']:
+        assert (overlap[f'{column}_first'] == overlap[f'{column}_second']).all()
+
+def assert_rollups_equal(actual, expected):
+    assert (actual.first_date, actual.last_date) == (expected.first_date, expected.last_date)
+    for freq, cube in expected.cubes.items():
+        pd.testing.assert_frame_equal(actual.cubes[freq].sort_index(), cube.sort_index(),
+                                      check_dtype=False, check_index_type=False)
+
+def test_appending_days_matches_full_rebuild():
+    for new_days in [1, 3]:
+        rollup = build_safety_rollup(60, 7, END_DATE)
+        version = rollup.version
+        end_date = END_DATE + pd.Timedelta(days=new_days)
+        advance_safety_rollup(rollup, 60, 7, end_date)
+        assert rollup.version > version
+        assert_rollups_equal(rollup, build_safety_rollup(60, 7, end_date))
+
+def test_advancing_past_the_window_rebuilds():
+    rollup = build_safety_rollup(10, 3, END_DATE)
+    end_date = END_DATE + pd.Timedelta(days=30)
+    advance_safety_rollup(rollup, 10, 3, end_date)
+    assert_rollups_equal(rollup, build_safety_rollup(10, 3, end_date))
+
+def test_trend_lines_cap_departments_and_follow_version():
+    rollup = build_safety_rollup(400, 30, END_DATE)
+    names, x, y = rollup.trend_lines('D', max_departments=4, points=50)
+    assert names[0] == '전체 평균' and len(names) == 9
+    assert x.shape == y.shape == (9, 50)
+    assert rollup.trend_lines('D', max_departments=4, points=50)[1] is x
+    advance_safety_rollup(rollup, 400, 30, END_DATE + pd.Timedelta(days=1))
+    assert rollup.trend_lines('D', max_departments=4, points=50)[1][0, -1] == np.datetime64(END_DATE + pd.Timedelta(days=1))
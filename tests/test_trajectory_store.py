@@ -0,0 +1,22 @@
+import numpy as np
+
+from trajectory_store import TrajectoryStore
+
+def random_store(rng, num_workers=30):
+    counts = rng.integers(0, 50, num_workers)
+    timestamps = np.concatenate([np.sort(rng.integers(0, 1000, count)) for count in counts])
+    coords = [rng.random(len(timestamps)) for _ in range(3)]
+    return TrajectoryStore(range(num_workers), np.r_[0, np.cumsum(counts)], timestamps, *coords)
+
+def test_window_matches_per_worker_slices():
+    rng = np.random.default_rng(0)
+    store = random_store(rng)
+    for start, end in [(0, 1000), (100, 400), (500, 500), (990, 2000)]:
+        window = store.window(start, end)
+        for i, worker in enumerate(store.workers):
+            expected = store.worker(worker)
+            inside = (expected.timestamps >= start) & (expected.timestamps < end)
+            actual = window.worker(worker)
+            assert (actual.timestamps == expected.timestamps[inside]).all()
+            assert (actual.latitude == expected.latitude[inside]).all()
+        assert window.offsets[-1] == len(window)
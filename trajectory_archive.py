@@ -0,0 +1,163 @@
+"""대용량 궤적 파일의 청크 단위 적재와 시간 분할 디스크 저장소
+
+CSV/Parquet 파일을 청크 단위로 읽어 시간 구간(파티션)별 .npy 열 파일로 저장하고,
+JSON 인덱스로 파티션 시간 범위를 기록한다. 조회할 때는 요청한 시간 구간과 겹치는
+파티션만 메모리 맵으로 열어 TrajectoryStore로 합친다.
+"""
+import glob
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from trajectory_store import TrajectoryStore
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+INDEX_FILE = 'index.json'
+COLUMNS = {'timestamps': np.int64, 'worker': np.int32, 'latitude': np.float32,
+           'longitude': np.float32, 'altitude': np.float32}
+DEFAULT_PARTITION = '1h'
+DEFAULT_CHUNKSIZE = 500000
+
+def iter_source_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    """CSV 또는 Parquet 파일을 chunksize 행씩 DataFrame으로 읽는 생성기"""
+    if path.lower().endswith(('.parquet', '.pq')):
+        if pq is None:
+            raise ImportError("Parquet 파일을 읽으려면 pyarrow가 필요합니다.")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+def _source_signature(path):
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def ingest_trajectories(source, archive_dir, partition=DEFAULT_PARTITION, chunksize=DEFAULT_CHUNKSIZE):
+    """궤적 파일(worker_id, timestamp, latitude, longitude[, altitude])을 시간 분할 저장소로 적재하는 함수
+
+    청크마다 파티션별 조각 파일을 쓰고, 마지막에 파티션 단위로 합쳐 작업자·시간순으로 정렬한다.
+    한 번에 메모리에 올라가는 양은 청크 하나 또는 파티션 하나 크기로 제한된다.
+    """
+    partition_ns = pd.Timedelta(partition).value
+    parts_dir = os.path.join(archive_dir, 'parts')
+    if os.path.exists(archive_dir):
+        shutil.rmtree(archive_dir)
+    os.makedirs(parts_dir)
+
+    worker_codes = {}
+    for chunk_no, chunk in enumerate(iter_source_chunks(source, chunksize)):
+        timestamps = pd.to_datetime(chunk['timestamp'])
+        if timestamps.dt.tz is not None:
+            timestamps = timestamps.dt.tz_convert(None)
+        timestamps = timestamps.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        for name in pd.unique(chunk['worker_id'].astype(str)):
+            worker_codes.setdefault(name, len(worker_codes))
+        columns = {
+            'timestamps': timestamps,
+            'worker': chunk['worker_id'].astype(str).map(worker_codes).to_numpy(dtype=np.int32),
+            'latitude': chunk['latitude'].to_numpy(dtype=np.float32),
+            'longitude': chunk['longitude'].to_numpy(dtype=np.float32),
+            'altitude': (chunk['altitude'].to_numpy(dtype=np.float32) if 'altitude' in chunk
+                         else np.zeros(len(chunk), dtype=np.float32))
+        }
+        keys = timestamps // partition_ns
+        order = np.argsort(keys, kind='stable')
+        unique_keys, starts = np.unique(keys[order], return_index=True)
+        for key, rows in zip(unique_keys, np.split(order, starts[1:])):
+            key_dir = os.path.join(parts_dir, str(key))
+            os.makedirs(key_dir, exist_ok=True)
+            np.savez(os.path.join(key_dir, f'{chunk_no:06d}.npz'), **{c: v[rows] for c, v in columns.items()})
+
+    partitions = []
+    for key in sorted(int(k) for k in os.listdir(parts_dir)):
+        pieces = [np.load(f) for f in sorted(glob.glob(os.path.join(parts_dir, str(key), '*.npz')))]
+        columns = {c: np.concatenate([p[c] for p in pieces]) for c in COLUMNS}
+        order = np.lexsort((columns['timestamps'], columns['worker']))
+        partition_dir = os.path.join(archive_dir, f'p{key}')
+        os.makedirs(partition_dir)
+        for c, dtype in COLUMNS.items():
+            np.save(os.path.join(partition_dir, f'{c}.npy'), columns[c][order].astype(dtype, copy=False))
+        partitions.append({
+            'key': key,
+            'dir': f'p{key}',
+            'start': int(columns['timestamps'].min()),
+            'end': int(columns['timestamps'].max()),
+            'rows': int(len(order))
+        })
+    shutil.rmtree(parts_dir)
+
+    index = {
+        'source': _source_signature(source),
+        'partition_ns': partition_ns,
+        'workers': list(worker_codes),
+        'partitions': partitions
+    }
+    with open(os.path.join(archive_dir, INDEX_FILE), 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False)
+    return TrajectoryArchive(archive_dir)
+
+def open_or_ingest(source, archive_dir, partition=DEFAULT_PARTITION, chunksize=DEFAULT_CHUNKSIZE):
+    """원본 파일이 바뀌지 않았으면 기존 저장소를 열고, 아니면 새로 적재하는 함수"""
+    index_path = os.path.join(archive_dir, INDEX_FILE)
+    if os.path.exists(index_path):
+        with open(index_path, encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('source') == _source_signature(source) and index['partition_ns'] == pd.Timedelta(partition).value:
+            return TrajectoryArchive(archive_dir)
+    return ingest_trajectories(source, archive_dir, partition, chunksize)
+
+class TrajectoryArchive:
+    """시간 분할된 궤적 저장소를 메모리 맵으로 조회하는 클래스"""
+
+    def __init__(self, archive_dir):
+        self.archive_dir = archive_dir
+        with open(os.path.join(archive_dir, INDEX_FILE), encoding='utf-8') as f:
+            self.index = json.load(f)
+        self.workers = pd.Index(self.index['workers'])
+        self.partitions = self.index['partitions']
+        self._starts = np.array([p['start'] for p in self.partitions], dtype=np.int64)
+        self._ends = np.array([p['end'] for p in self.partitions], dtype=np.int64)
+
+    @property
+    def num_rows(self):
+        return sum(p['rows'] for p in self.partitions)
+
+    def time_range(self):
+        """저장된 전체 표본의 (최초, 최종) 시각"""
+        if not self.partitions:
+            return None, None
+        return pd.Timestamp(int(self._starts.min())), pd.Timestamp(int(self._ends.max()))
+
+    def _open_partition(self, partition):
+        directory = os.path.join(self.archive_dir, partition['dir'])
+        return {c: np.load(os.path.join(directory, f'{c}.npy'), mmap_mode='r') for c in COLUMNS}
+
+    def load_window(self, start, end):
+        """[start, end) 시간 구간과 겹치는 파티션만 읽어 TrajectoryStore로 반환하는 함수"""
+        start, end = pd.Timestamp(start).value, pd.Timestamp(end).value
+        overlapping = np.flatnonzero((self._starts < end) & (self._ends >= start))
+
+        pieces = []
+        for i in overlapping:
+            columns = self._open_partition(self.partitions[i])
+            timestamps = columns['timestamps']
+            mask = (timestamps >= start) & (timestamps < end)
+            pieces.append({c: np.asarray(v[mask]) for c, v in columns.items()})
+        if not pieces:
+            return TrajectoryStore(self.workers, np.zeros(len(self.workers) + 1, dtype=np.int64), [], [], [], [])
+
+        # 파티션은 시간순이고 각 파티션은 작업자·시간순이므로 작업자 기준 안정 정렬로 병합된다
+        columns = {c: np.concatenate([p[c] for p in pieces]) for c in COLUMNS}
+        order = np.argsort(columns['worker'], kind='stable')
+        counts = np.bincount(columns['worker'], minlength=len(self.workers))
+        return TrajectoryStore(
+            self.workers, np.concatenate([[0], np.cumsum(counts)]), columns['timestamps'][order],
+            columns['latitude'][order], columns['longitude'][order], columns['altitude'][order]
+        )
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+class TrajectoryStore:
+    """작업자 동선을 작업자·시간순으로 정렬된 연속 배열에 보관하는 열 지향 저장소
+
+    작업자 i의 표본은 offsets[i]:offsets[i+1] 구간에 있으므로 한 작업자를 꺼내는 것은
+    배열 슬라이스(복사 없음)이고, 시간 구간은 전체 표본 마스크의 누적합으로 작업자별 개수를 구한다.
+    타임스탬프는 epoch 기준 int64 나노초, 좌표는 float32로 저장한다.
+    """
+
+    def __init__(self, workers, offsets, timestamps, latitude, longitude, altitude):
+        self.workers = pd.Index(workers)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.latitude = np.asarray(latitude, dtype=np.float32)
+        self.longitude = np.asarray(longitude, dtype=np.float32)
+        self.altitude = np.asarray(altitude, dtype=np.float32)
+
+    @classmethod
+    def from_frame(cls, df):
+        """worker_id, timestamp, latitude, longitude, altitude 열을 가진 DataFrame으로 생성"""
+        worker_ids = pd.Categorical(df['worker_id'])
+        codes = worker_ids.codes.astype(np.int64)
+        timestamps = pd.to_datetime(df['timestamp']).to_numpy(dtype='datetime64[ns]').view(np.int64)
+        order = np.lexsort((timestamps, codes))
+        counts = np.bincount(codes, minlength=len(worker_ids.categories))
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        return cls(worker_ids.categories, offsets, timestamps[order],
+                   df['latitude'].to_numpy()[order], df['longitude'].to_numpy()[order],
+                   df['altitude'].to_numpy()[order])
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def num_workers(self):
+        return len(self.workers)
+
+    @property
+    def nbytes(self):
+        return int(self.offsets.nbytes + self.timestamps.nbytes + self.latitude.nbytes +
+                   self.longitude.nbytes + self.altitude.nbytes)
+
+    def counts(self):
+        """작업자별 표본 수"""
+        return np.diff(self.offsets)
+
+    def worker_codes(self):
+        """표본별 작업자 번호 (workers의 위치)"""
+        return np.repeat(np.arange(self.num_workers), self.counts())
+
+    def worker(self, worker_id):
+        """한 작업자의 동선 (원본 배열의 뷰)"""
+        i = self.workers.get_loc(worker_id)
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return TrajectoryStore(self.workers[i:i + 1], [0, end - start], self.timestamps[start:end],
+                               self.latitude[start:end], self.longitude[start:end], self.altitude[start:end])
+
+    def window(self, start, end):
+        """[start, end) 시간 구간의 표본만 담은 저장소 (start, end는 Timestamp 또는 epoch 나노초)"""
+        start, end = (pd.Timestamp(t).value if not isinstance(t, (int, np.integer)) else int(t) for t in (start, end))
+        inside = (self.timestamps >= start) & (self.timestamps < end)
+        # 구간 안 표본 수의 누적합을 offsets에서 읽으면 작업자별 새 offsets가 된다
+        offsets = np.concatenate([[0], np.cumsum(inside)])[self.offsets]
+        rows = np.flatnonzero(inside)
+        return TrajectoryStore(self.workers, offsets, self.timestamps[rows],
+                               self.latitude[rows], self.longitude[rows], self.altitude[rows])
+
+    def time_range(self):
+        """전체 표본의 (최초, 최종) 시각"""
+        if len(self) == 0:
+            return None, None
+        return pd.Timestamp(self.timestamps.min()), pd.Timestamp(self.timestamps.max())
+
+    def to_frame(self):
+        """worker_id(범주형), timestamp(datetime64) 열을 가진 DataFrame으로 변환"""
+        return pd.DataFrame({
+            'worker_id': pd.Categorical.from_codes(self.worker_codes(), categories=self.workers),
+            'timestamp': self.timestamps.view('datetime64[ns]'),
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'altitude': self.altitude
+        })